@@ -5,12 +5,16 @@ from PyQt6.QtGui import QPen, QColor, QIcon, QPixmap
 from PyQt6.QtCore import QDate, Qt, QTimer, QDateTime, QTime, QEvent
 from PyQt6.QtSvgWidgets import QSvgWidget
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import pyvisa
 from matplotlib.figure import Figure
 import psutil
 from matplotlib.ticker import FuncFormatter
 import os
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 
 class CPU_Display(FigureCanvas):
     def __init__(self, parent=None, cpu=False):
@@ -610,9 +614,8 @@ class Dash(QMainWindow):
 
     def update_gpib_status(self):
         # Update the status of the GPIB connections
-        rm = pyvisa.ResourceManager('')
         try:
-            resources = rm.list_resources()
+            resources = visa_registry.list_resources()
 
             self.gpib_ports = [instr for instr in resources if 'GPIB' in instr]
             self.usb_ports = [instr for instr in resources if 'USB' in instr]
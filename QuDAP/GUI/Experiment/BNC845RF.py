@@ -13,6 +13,12 @@ from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as Navigatio
 from matplotlib.figure import Figure
 import random
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
+
 class COMMAND:
     def get_id(self, instrument) -> str:
         id = instrument.query('*IDN?')
@@ -189,8 +195,7 @@ class BNC845RF(QWidget):
 
     def refresh_gpib_list(self):
         # Access GPIB ports using PyVISA
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.gpib_ports = [instr for instr in instruments]
         self.current_gpib_label.setText(f"Current Connection: None")
         # Clear existing items and add new ones
@@ -207,7 +212,6 @@ class BNC845RF(QWidget):
         self.counter_array = []
 
     def connect_current_gpib(self):
-        rm = visa.ResourceManager()
         if self.connect_btn_clicked == False:
             self.connect_btn.setText('Disconnect')
             self.connect_btn_clicked = True
@@ -233,7 +237,7 @@ class BNC845RF(QWidget):
                         self.current_gpib_label.setText(f"Current Connection: Emulation")
 
                     else:
-                        self.bnc845 = rm.open_resource(self.current_connection, timeout=10000)
+                        self.bnc845 = visa_registry.open(self.current_connection, timeout=10000)
                         time.sleep(2)
                         bnc846 = self.bnc845.query('ID')
                         self.isConnect = True
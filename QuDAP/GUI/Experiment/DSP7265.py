@@ -14,6 +14,11 @@ from matplotlib.figure import Figure
 import random
 import time
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 class COMMAND:
     None
 
@@ -304,8 +309,7 @@ class Lockin(QMainWindow):
 
     def refresh_gpib_list(self):
         # Access GPIB ports using PyVISA
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.gpib_ports = [instr for instr in instruments]
         self.current_gpib_label.setText(f"Current Connection: None")
         # Clear existing items and add new ones
@@ -326,7 +330,6 @@ class Lockin(QMainWindow):
             self.rst()
 
     def connect_current_gpib(self):
-        rm = visa.ResourceManager()
         if self.connect_btn_clicked == False:
             self.connect_btn.setText('Disconnect')
             self.connect_btn_clicked = True
@@ -357,7 +360,7 @@ class Lockin(QMainWindow):
                             self.emulation.update_data.connect(self.update_lockin)
                             self.emulation.start()
                     else:
-                        self.DSP7265 = rm.open_resource(self.current_connection, timeout=10000)
+                        self.DSP7265 = visa_registry.open(self.current_connection, timeout=10000)
                         time.sleep(2)
                         DSP7265_device = self.DSP7265.query('ID')
                         self.isConnect = True
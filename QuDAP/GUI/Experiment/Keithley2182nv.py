@@ -14,6 +14,11 @@ from matplotlib.figure import Figure
 import random
 import time
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 
 class THREAD(QThread):
     update_data = pyqtSignal(float, float)  # Signal to emit the temperature and field values
@@ -301,8 +306,7 @@ class NV(QWidget):
 
     def refresh_gpib_list(self):
         # Access GPIB ports using PyVISA
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.gpib_ports = [instr for instr in instruments]
         self.current_gpib_label.setText(f"Current Connection: None")
         # Clear existing items and add new ones
@@ -322,7 +326,6 @@ class NV(QWidget):
             self.rst()
 
     def connect_current_gpib(self):
-        rm = visa.ResourceManager()
         if self.connect_btn_clicked == False:
             self.connect_btn.setText('Disconnect')
             self.connect_btn_clicked = True
@@ -352,7 +355,7 @@ class NV(QWidget):
                             self.emulation.update_data.connect(self.update_voltage)
                             self.emulation.start()
                     else:
-                        self.keithley_2182A_NV = rm.open_resource(self.current_connection, timeout=10000)
+                        self.keithley_2182A_NV = visa_registry.open(self.current_connection, timeout=10000)
                         time.sleep(2)
                         keithley_2182A_NV = self.keithley_2182A_NV.query('*IDN?')
                         self.isConnect = True
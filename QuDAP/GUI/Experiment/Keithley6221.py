@@ -7,6 +7,11 @@ import time
 import sys
 import pyvisa as visa
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 
 class CurrentSource6221(QWidget):
 
@@ -280,8 +285,7 @@ class CurrentSource6221(QWidget):
 
     def refresh_gpib_list(self):
         # Access GPIB ports using PyVISA
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.gpib_ports = [instr for instr in instruments]
         self.current_gpib_label.setText(f"Current Connection: None")
         # Clear existing items and add new ones
@@ -296,7 +300,6 @@ class CurrentSource6221(QWidget):
         self.isCheckedBox2 = False
 
     def connect_current_gpib(self):
-        rm = visa.ResourceManager()
         if self.connect_btn_clicked == False:
             self.connect_btn.setText('Disonnect')
             self.connect_btn_clicked = True
@@ -320,7 +323,7 @@ class CurrentSource6221(QWidget):
                         time.sleep(1)
                         self.current_gpib_label.setText(f"Current Connection: Emulation")
                     else:
-                        self.keithley_6221 = rm.open_resource(self.current_connection, timeout=10000)
+                        self.keithley_6221 = visa_registry.open(self.current_connection, timeout=10000)
                         time.sleep(2)
                         Model_6221 = self.keithley_6221.query('*IDN?')
                         self.isConnect = True
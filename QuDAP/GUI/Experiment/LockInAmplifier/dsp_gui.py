@@ -14,8 +14,10 @@ import numpy as np
 # Import the standalone connection class
 try:
     from instrument.instrument_connection import InstrumentConnection
+    from instrument.DSP7265 import SR7265_COMMAND
 except ImportError:
     from QuDAP.instrument.instrument_connection import InstrumentConnection
+    from QuDAP.instrument.DSP7265 import SR7265_COMMAND
 
 # Time Constant Mappings
 TIME_CONSTANT_VALUES = {0: 10e-6, 1: 20e-6, 2: 40e-6, 3: 80e-6, 4: 160e-6, 5: 320e-6, 6: 640e-6, 7: 5e-3, 8: 10e-3,
@@ -41,11 +43,8 @@ class MonitorThread(QThread):
         try:
             while not self.should_stop:
                 try:
-                    X = float(self.instrument.query("X."))
-                    Y = float(self.instrument.query("Y."))
-                    Mag = float(self.instrument.query("MAG."))
-                    Phase = float(self.instrument.query("PHA."))
-                    Noise = float(self.instrument.query("NHZ."))
+                    X, Y, Mag, Phase, Noise = SR7265_COMMAND().read_outputs(
+                        self.instrument, ('X', 'Y', 'MAG', 'PHA', 'NHZ'))
 
                     elapsed_time = time.time() - self.start_time
                     self.data_signal.emit(elapsed_time, X, Y, Mag, Phase, Noise)
@@ -117,11 +116,8 @@ class ContinuousReadingThread(QThread):
         try:
             while not self.should_stop:
                 try:
-                    X = float(self.instrument.query("X."))
-                    Y = float(self.instrument.query("Y."))
-                    Mag = float(self.instrument.query("MAG."))
-                    Phase = float(self.instrument.query("PHA."))
-                    Noise = float(self.instrument.query("NHZ."))
+                    X, Y, Mag, Phase, Noise = SR7265_COMMAND().read_outputs(
+                        self.instrument, ('X', 'Y', 'MAG', 'PHA', 'NHZ'))
 
                     self.reading_signal.emit(X, Y, Mag, Phase, Noise)
                     time.sleep(1)
@@ -237,11 +233,8 @@ class SweepThread(QThread):
 
                     time.sleep(rate_ms / 1000.0)
 
-                    x = float(self.instrument.query('X.').strip())
-                    y = float(self.instrument.query('Y.').strip())
-                    mag = float(self.instrument.query('MAG.').strip())
-                    phase = float(self.instrument.query('PHA.').strip())
-                    noise = float(self.instrument.query('NHZ.').strip())
+                    x, y, mag, phase, noise = SR7265_COMMAND().read_outputs(
+                        self.instrument, ('X', 'Y', 'MAG', 'PHA', 'NHZ'))
 
                 self.data_point_signal.emit(point, x, y, mag, phase, noise)
                 progress = int((i + 1) / total_points * 100)
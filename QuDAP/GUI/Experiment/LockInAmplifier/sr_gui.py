@@ -14,8 +14,10 @@ import numpy as np
 # Import the standalone connection class
 try:
     from instrument.instrument_connection import InstrumentConnection
+    from misc.visa_registry import session_lock
 except ImportError:
     from QuDAP.instrument.instrument_connection import InstrumentConnection
+    from QuDAP.misc.visa_registry import session_lock
 
 
 class MonitorThread(QThread):
@@ -263,6 +265,114 @@ class SweepThread(QThread):
         self.should_stop = True
 
 
+class BufferCaptureThread(QThread):
+    """Thread to capture gap-free time traces through the SR830 internal data buffer"""
+
+    block_signal = pyqtSignal(object, object, object, object, object)  # (time, X, Y, R, Theta) arrays
+    progress_signal = pyqtSignal(int, str)
+    error_signal = pyqtSignal(str)
+    info_signal = pyqtSignal(str, str)
+    capture_complete_signal = pyqtSignal()
+
+    # SRAT index i samples at 2**(i - 4) Hz: 62.5 mHz (0) ... 512 Hz (13)
+    SAMPLE_RATES = [2.0 ** (i - 4) for i in range(14)]
+    BUFFER_POINTS = 16383
+
+    def __init__(self, instrument, rate_index, duration, parent=None):
+        super().__init__(parent)
+        self.instrument = instrument
+        self.rate_index = rate_index
+        self.sample_rate = self.SAMPLE_RATES[rate_index]
+        self.total_points = max(1, min(self.BUFFER_POINTS, int(round(duration * self.sample_rate))))
+        self.should_stop = False
+
+    def read_buffer(self, channel, start, count):
+        """Transfer count points of a display buffer as binary IEEE floats"""
+        with session_lock(self.instrument):
+            self.instrument.write(f"TRCB? {channel},{start},{count}")
+            raw = self.instrument.read_bytes(4 * count)
+        return np.frombuffer(raw, dtype='<f4').astype(float)
+
+    def emit_block(self, start, X, Y):
+        """Emit a block of samples together with the derived R and Theta"""
+        t = (start + np.arange(len(X))) / self.sample_rate
+        R = np.hypot(X, Y)
+        Theta = np.degrees(np.arctan2(Y, X))
+        self.block_signal.emit(t, X, Y, R, Theta)
+        done = start + len(X)
+        self.progress_signal.emit(int(done / self.total_points * 100),
+                                  f"Captured {done}/{self.total_points} points")
+
+    def run(self):
+        """Fill the instrument buffer and stream the new points while it is storing"""
+        try:
+            if not self.instrument:
+                self.error_signal.emit("SR830 is not connected")
+                return
+
+            self.info_signal.emit("Buffered Capture Started",
+                                  f"Sample rate: {self.sample_rate:g} Hz\nTotal points: {self.total_points}\n"
+                                  f"Duration: {self.total_points / self.sample_rate:.2f} s")
+
+            if self.instrument == 'Emulation':
+                self.run_emulation()
+            else:
+                self.run_instrument()
+
+            if not self.should_stop:
+                self.capture_complete_signal.emit()
+
+        except Exception as e:
+            import traceback
+            self.error_signal.emit(f"Capture error:\n{str(e)}\n\n{traceback.format_exc()}")
+
+    def run_emulation(self):
+        """Generate buffered blocks in emulation mode"""
+        read = 0
+        while read < self.total_points and not self.should_stop:
+            time.sleep(0.2)
+            count = min(self.total_points - read, max(1, int(self.sample_rate * 0.2)))
+            X = np.random.random(count)
+            Y = np.random.random(count)
+            self.emit_block(read, X, Y)
+            read += count
+
+    def run_instrument(self):
+        """Program the SR830 buffer, stream it with TRCB and restore the displays"""
+        # The buffers store the CH1/CH2 displays, so show X and Y while capturing
+        ch1_display = self.instrument.query("DDEF? 1").strip()
+        ch2_display = self.instrument.query("DDEF? 2").strip()
+        try:
+            self.instrument.write("DDEF 1,0,0")
+            self.instrument.write("DDEF 2,0,0")
+            self.instrument.write("FAST 0")
+            self.instrument.write(f"SRAT {self.rate_index}")
+            self.instrument.write("SEND 0")  # One shot: stop when the buffer is full
+            self.instrument.write("TSTR 0")
+            self.instrument.write("REST")
+            self.instrument.write("STRT")
+
+            read = 0
+            while read < self.total_points and not self.should_stop:
+                time.sleep(0.2)
+                stored = min(int(self.instrument.query("SPTS?")), self.total_points)
+                if stored <= read:
+                    continue
+                count = stored - read
+                X = self.read_buffer(1, read, count)
+                Y = self.read_buffer(2, read, count)
+                self.emit_block(read, X, Y)
+                read = stored
+        finally:
+            self.instrument.write("PAUS")
+            self.instrument.write(f"DDEF 1,{ch1_display}")
+            self.instrument.write(f"DDEF 2,{ch2_display}")
+
+    def stop(self):
+        """Stop the capture"""
+        self.should_stop = True
+
+
 class SR830(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -622,7 +732,7 @@ class SR830(QMainWindow):
         mode_label.setFixedWidth(100)
         self.mode_combo = QComboBox()
         self.mode_combo.setFont(self.font)
-        self.mode_combo.addItems(["Real-time Monitor", "Frequency Sweep", "Amplitude Sweep"])
+        self.mode_combo.addItems(["Real-time Monitor", "Frequency Sweep", "Amplitude Sweep", "Buffered Capture"])
         self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
         mode_layout.addWidget(mode_label)
         mode_layout.addWidget(self.mode_combo, 1)
@@ -714,6 +824,42 @@ class SR830(QMainWindow):
         self.sweep_params_widget.setVisible(False)
         monitor_layout.addWidget(self.sweep_params_widget)
 
+        # Buffered capture parameters
+        self.capture_params_widget = QWidget()
+        capture_params_layout = QVBoxLayout()
+        capture_params_layout.setContentsMargins(0, 0, 0, 0)
+
+        rate_layout = QHBoxLayout()
+        rate_label = QLabel("Sample Rate:")
+        rate_label.setFont(self.font)
+        rate_label.setFixedWidth(100)
+        self.capture_rate_combo = QComboBox()
+        self.capture_rate_combo.setFont(self.font)
+        self.capture_rate_combo.addItems(["62.5 mHz", "125 mHz", "250 mHz", "500 mHz", "1 Hz", "2 Hz", "4 Hz", "8 Hz",
+                                          "16 Hz", "32 Hz", "64 Hz", "128 Hz", "256 Hz", "512 Hz"])
+        self.capture_rate_combo.setCurrentIndex(13)
+        rate_layout.addWidget(rate_label)
+        rate_layout.addWidget(self.capture_rate_combo, 1)
+        capture_params_layout.addLayout(rate_layout)
+
+        duration_layout = QHBoxLayout()
+        duration_label = QLabel("Duration (s):")
+        duration_label.setFont(self.font)
+        duration_label.setFixedWidth(100)
+        self.capture_duration_entry = QDoubleSpinBox()
+        self.capture_duration_entry.setFont(self.font)
+        self.capture_duration_entry.setRange(0.01, 262128)
+        self.capture_duration_entry.setDecimals(2)
+        self.capture_duration_entry.setValue(10)
+        self.capture_duration_entry.setToolTip("Limited to the 16383-point buffer of the SR830")
+        duration_layout.addWidget(duration_label)
+        duration_layout.addWidget(self.capture_duration_entry, 1)
+        capture_params_layout.addLayout(duration_layout)
+
+        self.capture_params_widget.setLayout(capture_params_layout)
+        self.capture_params_widget.setVisible(False)
+        monitor_layout.addWidget(self.capture_params_widget)
+
         # Control buttons
         button_layout = QHBoxLayout()
         self.start_btn = QPushButton("Start")
@@ -813,7 +959,8 @@ class SR830(QMainWindow):
 
     def on_mode_changed(self, mode):
         """Handle mode change"""
-        if mode == "Real-time Monitor":
+        self.capture_params_widget.setVisible(mode == "Buffered Capture")
+        if mode in ("Real-time Monitor", "Buffered Capture"):
             self.sweep_params_widget.setVisible(False)
             self.is_sweep_mode = False
             self.xyr_plot_widget.setLabel('bottom', 'Time', units='s')
@@ -1223,6 +1370,27 @@ class SR830(QMainWindow):
 
             self.operation_status.setText("Status: Monitoring active")
 
+        elif mode == "Buffered Capture":
+            self.is_sweep_mode = False
+            # The capture thread owns the instrument, so it reuses the monitor slot for stop/close handling
+            self.monitor_thread = BufferCaptureThread(self.SR830_instrument, self.capture_rate_combo.currentIndex(),
+                                                      self.capture_duration_entry.value())
+
+            self.monitor_thread.block_signal.connect(self.update_buffer_plots)
+            self.monitor_thread.progress_signal.connect(self.update_progress)
+            self.monitor_thread.error_signal.connect(self.on_error)
+            self.monitor_thread.info_signal.connect(self.on_info)
+            self.monitor_thread.capture_complete_signal.connect(self.on_complete)
+            self.monitor_thread.finished.connect(self.on_finished)
+
+            if self.reading_thread and self.reading_thread.isRunning():
+                self.reading_thread.stop()
+                self.reading_thread.wait()
+
+            self.monitor_thread.start()
+
+            self.operation_status.setText("Status: Buffered capture in progress")
+
         else:
             self.is_sweep_mode = True
             sweep_type = 'frequency' if mode == "Frequency Sweep" else 'amplitude'
@@ -1293,6 +1461,21 @@ class SR830(QMainWindow):
         self.r_reading_label.setText(f"{R:.6f} V")
         self.theta_reading_label.setText(f"{Theta:.2f} deg")
 
+    def update_buffer_plots(self, time_vals, X, Y, R, Theta):
+        """Update plots with a block of buffered samples"""
+        self.time_data.extend(time_vals.tolist())
+        self.x_data.extend(X.tolist())
+        self.y_data.extend(Y.tolist())
+        self.r_data.extend(R.tolist())
+        self.theta_data.extend(Theta.tolist())
+
+        self.update_plot_visibility()
+
+        self.x_reading_label.setText(f"{X[-1]:.6f} V")
+        self.y_reading_label.setText(f"{Y[-1]:.6f} V")
+        self.r_reading_label.setText(f"{R[-1]:.6f} V")
+        self.theta_reading_label.setText(f"{Theta[-1]:.2f} deg")
+
     def update_sweep_plots(self, sweep_val, X, Y, R, Theta):
         """Update plots for sweep"""
         self.sweep_param_data.append(sweep_val)
@@ -6,13 +6,24 @@ import sys
 import time
 import platform
 import random
-import threading
 import traceback
-import subprocess
 import os
 import pyqtgraph as pg
 from datetime import datetime
 
+try:
+    from QuDAP.misc.ppms_command_worker import PPMSCommandWorker
+    from QuDAP.misc.ppms_telemetry import PPMSTelemetry, READERS
+    from QuDAP.misc.ppms_client_registry import ppms_clients
+    from QuDAP.instrument.ppms_simulator import SimulatedMultiVuClient, SimulatedMultiVuServer, simulator_speed
+    from QuDAP.misc.multivu_watcher import MultiVuWatcher
+except ImportError:
+    from misc.ppms_command_worker import PPMSCommandWorker
+    from misc.ppms_telemetry import PPMSTelemetry, READERS
+    from misc.ppms_client_registry import ppms_clients
+    from instrument.ppms_simulator import SimulatedMultiVuClient, SimulatedMultiVuServer, simulator_speed
+    from misc.multivu_watcher import MultiVuWatcher
+
 if platform.system() == 'Windows':
     try:
         import MultiPyVu as mpv
@@ -27,28 +38,6 @@ else:
 
 
 # ===================== MultiVu Detection =====================
-def is_multivu_running():
-    """
-    Check if MultiVu application is running
-    Returns True if detected, False otherwise
-    """
-    try:
-        if os.name == 'nt':  # Windows
-            result = subprocess.run(['tasklist'], capture_output=True, text=True, timeout=5)
-            if 'MultiVu.exe' in result.stdout or 'Dynacool.exe' in result.stdout or 'Multivu.exe' in result.stdout or 'PpmsMvu.exe' in result.stdout:
-                return True
-            return False
-        else:  # Linux/Mac
-            result = subprocess.run(['pgrep', '-f', 'MultiVu'], capture_output=True, timeout=5)
-            return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        print("⚠ Timeout checking for MultiVu")
-        return False
-    except Exception as e:
-        print(f"⚠ Error checking for MultiVu: {e}")
-        return False
-
-
 def find_multivu_path():
     """
     Try to find MultiVu installation path
@@ -67,74 +56,32 @@ def find_multivu_path():
     return None
 
 
-# ===================== MultiVu Status Check Thread =====================
-class MultiVuStatusThread(QThread):
-    """Thread to check MultiVu status periodically"""
-
-    status_signal = pyqtSignal(bool)  # True if running, False if not
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.should_stop = False
-
-    def run(self):
-        """Check MultiVu status every 5 seconds"""
-        while not self.should_stop:
-            is_running = is_multivu_running()
-            self.status_signal.emit(is_running)
-            time.sleep(5)
-
-    def stop(self):
-        """Stop checking"""
-        self.should_stop = True
-
-
 # ===================== Thread-Safe PPMS Command Executor =====================
 class PPMSCommandExecutor:
-    """Executes PPMS commands in a separate thread with timeout protection"""
+    """Executes PPMS commands on the client's persistent PPMS I/O worker with timeout protection"""
 
     def __init__(self, client, notification_callback=None):
         self.client = client
         self.notification_callback = notification_callback
-        self.result = None
-        self.error = None
-
-    def execute_with_timeout(self, func, args=(), kwargs=None, timeout=30):
-        """Execute a function with timeout protection"""
-        if kwargs is None:
-            kwargs = {}
+        self.worker = PPMSCommandWorker.for_client(client)
 
-        self.result = None
-        self.error = None
-
-        thread = threading.Thread(target=self._run_function, args=(func, args, kwargs))
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=timeout)
-
-        if thread.is_alive():
-            error_msg = f"Command timeout after {timeout} seconds"
-            print(f"⚠ {error_msg}")
+    def execute_with_timeout(self, func, args=(), kwargs=None, timeout=30, coalesce_key=None):
+        """Execute a function with timeout protection, sharing reads with the same coalesce_key"""
+        try:
+            result = self.worker.execute(func, args, kwargs, timeout=timeout, coalesce_key=coalesce_key)
+        except TimeoutError as e:
+            print(f"⚠ {e}")
             if self.notification_callback:
                 self.notification_callback(f"PPMS command timed out: {func.__name__}", 'warning')
             return (False, None)
-
-        if self.error:
-            print(f"⚠ Command error: {self.error}")
+        except BaseException as e:
+            error = f"SystemExit: {e}" if isinstance(e, SystemExit) else f"{type(e).__name__}: {e}"
+            print(f"⚠ Command error: {error}")
             if self.notification_callback:
-                self.notification_callback(f"PPMS command error: {self.error}", 'critical')
+                self.notification_callback(f"PPMS command error: {error}", 'critical')
             return (False, None)
 
-        return (True, self.result)
-
-    def _run_function(self, func, args, kwargs):
-        """Run function in thread"""
-        try:
-            self.result = func(*args, **kwargs)
-        except SystemExit as e:
-            self.error = f"SystemExit: {e}"
-        except Exception as e:
-            self.error = f"{type(e).__name__}: {e}"
+        return (True, result)
 
 
 class ThreadSafePPMSCommands:
@@ -144,38 +91,36 @@ class ThreadSafePPMSCommands:
         self.client = client
         self.notification_callback = notification_callback
         self.executor = PPMSCommandExecutor(client, notification_callback)
-
-    def get_chamber_status(self, timeout=10):
-        """Get chamber status with timeout protection"""
-
-        def _get_chamber():
-            return self.client.get_chamber()
-
-        success, result = self.executor.execute_with_timeout(_get_chamber, timeout=timeout)
+        self.telemetry = PPMSTelemetry.for_client(client)
+
+    def _read(self, quantity, timeout, max_age):
+        """Cached reading if fresh enough, otherwise a coalesced query through the executor"""
+        cached = self.telemetry.cached(quantity, max_age)
+        if cached is not None:
+            return True, cached
+        generation = self.telemetry.generation
+        success, result = self.executor.execute_with_timeout(READERS[quantity], args=(self.client,),
+                                                             timeout=timeout, coalesce_key=quantity)
+        if success:
+            self.telemetry.store(quantity, result, generation)
         return success, result
 
-    def read_temperature(self, timeout=10):
-        """Read temperature with timeout protection"""
-
-        def _read_temp():
-            temperature, status = self.client.get_temperature()
-            return (temperature, status)
+    def get_chamber_status(self, timeout=10, max_age=0):
+        """Get chamber status with timeout protection, accepting a cached status up to max_age seconds"""
+        return self._read('chamber', timeout, max_age)
 
-        success, result = self.executor.execute_with_timeout(_read_temp, timeout=timeout)
+    def read_temperature(self, timeout=10, max_age=0):
+        """Read temperature with timeout protection, accepting a cached reading up to max_age seconds"""
+        success, result = self._read('temperature', timeout, max_age)
         if success and result:
-            return (True,) + result
+            return (True,) + tuple(result[:2])
         return (False, None, None)
 
-    def read_field(self, timeout=10):
-        """Read magnetic field with timeout protection"""
-
-        def _read_field():
-            field, status = self.client.get_field()
-            return (field, status)
-
-        success, result = self.executor.execute_with_timeout(_read_field, timeout=timeout)
+    def read_field(self, timeout=10, max_age=0):
+        """Read magnetic field with timeout protection, accepting a cached reading up to max_age seconds"""
+        success, result = self._read('field', timeout, max_age)
         if success and result:
-            return (True,) + result
+            return (True,) + tuple(result[:2])
         return (False, None, None)
 
     def set_temperature(self, set_point, temp_rate, mode, timeout=30):
@@ -186,6 +131,7 @@ class ThreadSafePPMSCommands:
             print(f"✓ Temperature set to {set_point} K")
 
         success, _ = self.executor.execute_with_timeout(_set_temp, timeout=timeout)
+        self.telemetry.invalidate('temperature')
         return success
 
     def set_field(self, set_point, field_rate, mode, timeout=30):
@@ -196,46 +142,55 @@ class ThreadSafePPMSCommands:
             print(f"✓ Field set to {set_point} Oe")
 
         success, _ = self.executor.execute_with_timeout(_set_field, timeout=timeout)
+        self.telemetry.invalidate('field')
         return success
 
 
 # ===================== Reading Thread =====================
 class PPMSReadingThread(QThread):
-    """Thread to continuously read PPMS parameters"""
+    """Thread to continuously read PPMS parameters from the shared telemetry cache"""
 
     update_data = pyqtSignal(float, str, float, str, str)
     error_signal = pyqtSignal(str)
 
-    def __init__(self, safe_commands, parent=None):
+    def __init__(self, safe_commands, parent=None, interval=1.0):
         super().__init__(parent)
         self.safe_commands = safe_commands
+        self.interval = interval
         self.should_stop = False
 
     def run(self):
         """Continuously read PPMS parameters"""
-        while not self.should_stop:
-            try:
-                # Read temperature
-                success_t, temp, temp_status = self.safe_commands.read_temperature(timeout=5)
-                if not success_t:
-                    temp, temp_status = 0.0, "Error"
-
-                # Read field
-                success_f, field, field_status = self.safe_commands.read_field(timeout=5)
-                if not success_f:
-                    field, field_status = 0.0, "Error"
-
-                # Read chamber
-                success_c, chamber = self.safe_commands.get_chamber_status(timeout=5)
-                if not success_c:
-                    chamber = "Unknown"
-
-                self.update_data.emit(temp, temp_status, field, field_status, chamber)
-                time.sleep(1)
-
-            except Exception as e:
-                self.error_signal.emit(f"Reading error: {str(e)}")
-                break
+        # The telemetry poller queries the PPMS; readings here only go to the PPMS when the cache is stale
+        telemetry = self.safe_commands.telemetry
+        telemetry.start_polling(self.interval)
+        max_age = 2 * self.interval
+        try:
+            while not self.should_stop:
+                try:
+                    # Read temperature
+                    success_t, temp, temp_status = self.safe_commands.read_temperature(timeout=5, max_age=max_age)
+                    if not success_t:
+                        temp, temp_status = 0.0, "Error"
+
+                    # Read field
+                    success_f, field, field_status = self.safe_commands.read_field(timeout=5, max_age=max_age)
+                    if not success_f:
+                        field, field_status = 0.0, "Error"
+
+                    # Read chamber
+                    success_c, chamber = self.safe_commands.get_chamber_status(timeout=5, max_age=max_age)
+                    if not success_c:
+                        chamber = "Unknown"
+
+                    self.update_data.emit(temp, temp_status, field, field_status, chamber)
+                    time.sleep(self.interval)
+
+                except Exception as e:
+                    self.error_signal.emit(f"Reading error: {str(e)}")
+                    break
+        finally:
+            telemetry.stop_polling()
 
     def stop(self):
         """Stop reading"""
@@ -254,7 +209,7 @@ class PPMS(QMainWindow):
         self.client = None
         self.safe_commands = None
         self.reading_thread = None
-        self.multivu_status_thread = None
+        self.multivu_watcher = None
         self.isConnect = False
         self.server_running = False
         self.client_running = False
@@ -306,8 +261,8 @@ class PPMS(QMainWindow):
 
         self.init_ui()
 
-        # Start MultiVu status monitoring
-        if MULTIVU_AVAILABLE:
+        # Start MultiVu status monitoring (not needed with the simulator)
+        if MULTIVU_AVAILABLE and simulator_speed() is None:
             self.start_multivu_monitoring()
 
     def init_ui(self):
@@ -716,14 +671,13 @@ class PPMS(QMainWindow):
         return right_panel
 
     def start_multivu_monitoring(self):
-        """Start MultiVu status monitoring thread"""
-        self.multivu_status_thread = MultiVuStatusThread()
-        self.multivu_status_thread.status_signal.connect(self.update_multivu_status)
-        self.multivu_status_thread.start()
+        """Subscribe to the shared MultiVu process watcher"""
+        self.multivu_watcher = MultiVuWatcher()
+        self.multivu_watcher.subscribe(self.update_multivu_status)
 
     def check_multivu_now(self):
         """Manually check MultiVu status"""
-        is_running = is_multivu_running()
+        is_running = MultiVuWatcher().check(force=True)
         self.update_multivu_status(is_running)
 
         if is_running:
@@ -769,18 +723,19 @@ class PPMS(QMainWindow):
 
     def toggle_server(self):
         """Toggle PPMS server"""
-        if not MULTIVU_AVAILABLE:
+        simulated = simulator_speed() is not None
+        if not MULTIVU_AVAILABLE and not simulated:
             QMessageBox.warning(self, "Error", "MultiPyVu library is not available")
             return
 
-        if not self.multivu_running and not self.server_running:
+        if not simulated and not self.multivu_running and not self.server_running:
             QMessageBox.warning(self, "MultiVu Not Running",
                                 "MultiVu is not running. Please start MultiVu before starting the server.")
             return
 
         if not self.server_running:
             try:
-                self.server = mpv.Server()
+                self.server = SimulatedMultiVuServer() if simulated else mpv.Server()
                 self.server.open()
                 self.server_btn.setText("Stop Server")
                 self.server_running = True
@@ -805,7 +760,8 @@ class PPMS(QMainWindow):
 
     def toggle_client(self):
         """Toggle PPMS client connection"""
-        if not MULTIVU_AVAILABLE:
+        simulated = simulator_speed() is not None
+        if not MULTIVU_AVAILABLE and not simulated:
             QMessageBox.warning(self, "Error", "MultiPyVu library is not available")
             return
 
@@ -814,8 +770,9 @@ class PPMS(QMainWindow):
                 host = self.host_entry.text()
                 port = int(self.port_entry.text())
 
-                self.client = mpv.Client(host=host, port=port)
-                self.client.open()
+                # Shared with the Measurement page, so both use one command worker and telemetry cache
+                factory = SimulatedMultiVuClient if simulated else mpv.Client
+                self.client = ppms_clients.open(host, port, factory)
 
                 # Create thread-safe command wrapper
                 self.safe_commands = ThreadSafePPMSCommands(self.client, notification_callback=self.show_notification)
@@ -844,7 +801,7 @@ class PPMS(QMainWindow):
                     self.reading_thread.wait()
 
                 if self.client:
-                    self.client.close_client()
+                    ppms_clients.release(self.client)
                     self.client = None
 
                 self.safe_commands = None
@@ -1052,9 +1009,8 @@ class PPMS(QMainWindow):
     def closeEvent(self, event):
         """Handle window close"""
         # Stop MultiVu monitoring
-        if self.multivu_status_thread and self.multivu_status_thread.isRunning():
-            self.multivu_status_thread.stop()
-            self.multivu_status_thread.wait()
+        if self.multivu_watcher:
+            self.multivu_watcher.unsubscribe(self.update_multivu_status)
 
         # Stop reading thread
         if self.reading_thread and self.reading_thread.isRunning():
@@ -1064,7 +1020,7 @@ class PPMS(QMainWindow):
         # Close client
         if self.client:
             try:
-                self.client.close_client()
+                ppms_clients.release(self.client)
             except:
                 pass
 
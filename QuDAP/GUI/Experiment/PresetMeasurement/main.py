@@ -11,7 +11,6 @@ Features:
 import sys
 import os
 import platform
-import subprocess
 import time
 from pathlib import Path
 from datetime import datetime
@@ -28,6 +27,13 @@ import numpy as np
 import pandas as pd
 import pyvisa as visa
 
+try:
+    from QuDAP.misc.multivu_watcher import MultiVuWatcher
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.multivu_watcher import MultiVuWatcher
+    from misc.visa_registry import visa_registry
+
 # ===================== Constants =====================
 TIME_CONSTANT_VALUES = {0: 10e-6, 1: 20e-6, 2: 40e-6, 3: 80e-6, 4: 160e-6, 5: 320e-6, 6: 640e-6, 7: 5e-3, 8: 10e-3,
     9: 20e-3, 10: 50e-3, 11: 100e-3, 12: 200e-3, 13: 500e-3, 14: 1, 15: 2, 16: 5, 17: 10, 18: 20, 19: 50, 20: 100,
@@ -35,20 +41,6 @@ TIME_CONSTANT_VALUES = {0: 10e-6, 1: 20e-6, 2: 40e-6, 3: 80e-6, 4: 160e-6, 5: 32
 
 
 # ===================== MultiVu Detection =====================
-def is_multivu_running():
-    try:
-        if os.name == 'nt':
-            result = subprocess.run(['tasklist'], capture_output=True, text=True, timeout=5)
-            if any(x in result.stdout for x in ['MultiVu.exe', 'Dynacool.exe', 'PpmsMvu.exe']):
-                return True
-            return False
-        else:
-            result = subprocess.run(['pgrep', '-f', 'MultiVu'], capture_output=True, timeout=5)
-            return result.returncode == 0
-    except:
-        return False
-
-
 def find_multivu_path():
     common_paths = [r"C:\Program Files\Quantum Design\MultiVu\MultiVu.exe",
         r"C:\Program Files (x86)\Quantum Design\MultiVu\MultiVu.exe", r"C:\QD\MultiVu\MultiVu.exe",
@@ -59,23 +51,6 @@ def find_multivu_path():
     return None
 
 
-class MultiVuStatusThread(QThread):
-    status_signal = pyqtSignal(bool)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.should_stop = False
-
-    def run(self):
-        while not self.should_stop:
-            is_running = is_multivu_running()
-            self.status_signal.emit(is_running)
-            time.sleep(5)
-
-    def stop(self):
-        self.should_stop = True
-
-
 # ===================== Circular Progress Bar =====================
 class CircularProgressBar(QWidget):
     """Circular progress bar with percentage in center"""
@@ -281,8 +256,8 @@ class DynamicInstrumentConnection(QWidget):
 
     def refresh_connections(self):
         try:
-            self.rm = visa.ResourceManager()
-            resources = self.rm.list_resources()
+            self.rm = visa_registry.resource_manager()
+            resources = visa_registry.list_resources()
             self.connection_combo.clear()
             self.connection_combo.addItem("None")
             self.connection_combo.addItems(list(resources))
@@ -375,10 +350,8 @@ class DynamicInstrumentConnection(QWidget):
                 self.connect_btn.setText("Disconnect")
                 self.instrument_connected.emit(None, instrument_name)
             else:
-                if not self.rm:
-                    self.rm = visa.ResourceManager()
-
-                instrument = self.rm.open_resource(connection_string)
+                # Shared with the other pages that have this resource open
+                instrument = visa_registry.open(connection_string)
                 instrument.timeout = 10000
 
                 if "ASRL" in connection_string or "COM" in connection_string:
@@ -589,10 +562,8 @@ class PPMSMultiVuWidget(QWidget):
         self.server_process = None
         self.init_ui()
 
-        # Start status monitoring thread
-        self.status_thread = MultiVuStatusThread()
-        self.status_thread.status_signal.connect(self.update_multivu_status)
-        self.status_thread.start()
+        # Subscribe to the shared MultiVu process watcher
+        MultiVuWatcher().subscribe(self.update_multivu_status)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -663,7 +634,7 @@ class PPMSMultiVuWidget(QWidget):
             self.status_label.setStyleSheet("color: red; font-weight: bold;")
 
     def check_multivu_now(self):
-        is_running = is_multivu_running()
+        is_running = MultiVuWatcher().check(force=True)
         self.update_multivu_status(is_running)
 
         if is_running:
@@ -759,9 +730,7 @@ class PPMSMultiVuWidget(QWidget):
         return self.client_connected
 
     def cleanup(self):
-        if self.status_thread:
-            self.status_thread.stop()
-            self.status_thread.wait()
+        MultiVuWatcher().unsubscribe(self.update_multivu_status)
 
         if self.client_connected:
             self.disconnect_client()
@@ -3480,10 +3449,8 @@ class PPMSMultiVuWidget(QWidget):
         self.server_process = None
         self.init_ui()
 
-        # Start status monitoring thread
-        self.status_thread = MultiVuStatusThread()
-        self.status_thread.status_signal.connect(self.update_multivu_status)
-        self.status_thread.start()
+        # Subscribe to the shared MultiVu process watcher
+        MultiVuWatcher().subscribe(self.update_multivu_status)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -3554,7 +3521,7 @@ class PPMSMultiVuWidget(QWidget):
             self.status_label.setStyleSheet("color: red; font-weight: bold;")
 
     def check_multivu_now(self):
-        is_running = is_multivu_running()
+        is_running = MultiVuWatcher().check(force=True)
         self.update_multivu_status(is_running)
 
         if is_running:
@@ -3642,9 +3609,7 @@ class PPMSMultiVuWidget(QWidget):
         return self.client if self.client_connected else None
 
     def cleanup(self):
-        if self.status_thread:
-            self.status_thread.stop()
-            self.status_thread.wait()
+        MultiVuWatcher().unsubscribe(self.update_multivu_status)
 
         if self.client_connected:
             self.disconnect_client()
@@ -8,6 +8,13 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon, QColor, QFont
 
+try:
+    from QuDAP.misc.ReadInstrument import DiscoveryCache, scan_resources
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.ReadInstrument import DiscoveryCache, scan_resources
+    from misc.visa_registry import visa_registry
+
 
 class InstrumentScanner(QThread):
     """Background thread for scanning instruments"""
@@ -16,27 +23,19 @@ class InstrumentScanner(QThread):
     finished = pyqtSignal(dict)  # Results dictionary
     error = pyqtSignal(str)  # Error message
 
-    def __init__(self, timeout=2000):
+    # Identification commands in the order they are tried (a cached known-good command goes first)
+    ID_COMMANDS = [
+        "ID?","*IDN?", "ID", "*ID?", "IDENTIFY?",
+        "MODEL?", "I", "++ver", "VER?", "VERSION?"
+    ]
+    STATUS_TEXT = {"connected": "Connected", "silent": "No ID response", "error": "Error"}
+
+    def __init__(self, timeout=2000, rescan=False):
         super().__init__()
         self.timeout = timeout
+        self.rescan = rescan
         self.is_running = True
-
-    def query_instrument_id(self, inst):
-        """Try multiple identification commands"""
-        id_commands = [
-            "ID?","*IDN?", "ID", "*ID?", "IDENTIFY?",
-            "MODEL?", "I", "++ver", "VER?", "VERSION?"
-        ]
-
-        for cmd in id_commands:
-            try:
-                response = inst.query(cmd).strip()
-                if response and len(response) > 0:
-                    return (response, cmd)
-            except:
-                continue
-
-        return (None, None)
+        self.cached_count = 0
 
     def categorize_instrument(self, resource_name):
         """Determine connection type"""
@@ -56,11 +55,11 @@ class InstrumentScanner(QThread):
     def run(self):
         """Scan for instruments"""
         try:
-            rm = pyvisa.ResourceManager()
+            rm = visa_registry.resource_manager()
 
             self.progress.emit(10, "Initializing VISA...")
 
-            resources = rm.list_resources()
+            resources = visa_registry.list_resources()
 
             if not resources:
                 self.finished.emit({})
@@ -76,51 +75,27 @@ class InstrumentScanner(QThread):
                 "Other": []
             }
 
-            total = len(resources)
+            def report(info, done, total):
+                self.progress.emit(10 + int(done / total * 80), f"Scanned {info['resource']} ({done}/{total})")
 
-            for idx, resource in enumerate(resources):
-                if not self.is_running:
-                    break
-
-                progress_pct = 10 + int((idx / total) * 80)
-                self.progress.emit(progress_pct, f"Scanning {resource}...")
-
-                conn_type = self.categorize_instrument(resource)
+            # Resources are probed concurrently; the cache skips recently silent ones
+            results = scan_resources(resources, rm=rm, timeout=self.timeout, cache=DiscoveryCache(),
+                                     rescan=self.rescan, id_commands=self.ID_COMMANDS, on_result=report,
+                                     should_stop=lambda: not self.is_running)
 
+            self.cached_count = 0
+            for resource, info in results.items():
                 instrument_info = {
                     "resource": resource,
-                    "id": "Unknown",
-                    "command": None,
-                    "status": "Not responding",
-                    "error": None
+                    "id": info["id"],
+                    "command": info["command"],
+                    "status": self.STATUS_TEXT.get(info["state"], "Not responding"),
+                    "error": info["error"],
+                    "cached": info["cached"],
+                    "in_use": info["in_use"]
                 }
-
-                try:
-                    inst = rm.open_resource(resource)
-                    inst.timeout = self.timeout
-
-                    try:
-                        inst.read_termination = '\n'
-                        inst.write_termination = '\n'
-                    except:
-                        pass
-
-                    idn, cmd_used = self.query_instrument_id(inst)
-
-                    if idn:
-                        instrument_info["id"] = idn
-                        instrument_info["command"] = cmd_used
-                        instrument_info["status"] = "Connected"
-                    else:
-                        instrument_info["status"] = "No ID response"
-
-                    inst.close()
-
-                except Exception as e:
-                    instrument_info["status"] = "Error"
-                    instrument_info["error"] = str(e)
-
-                instruments_by_type[conn_type].append(instrument_info)
+                self.cached_count += info["cached"]
+                instruments_by_type[self.categorize_instrument(resource)].append(instrument_info)
 
             self.progress.emit(100, "Scan complete!")
             self.finished.emit(instruments_by_type)
@@ -168,7 +143,8 @@ class InstrumentDetector(QWidget):
         self.refresh_button = QPushButton("🔄 Refresh")
         # self.refresh_button.setFixedHeight(40)
         self.refresh_button.setStyleSheet(self.Button_stylesheet)
-        self.refresh_button.clicked.connect(self.scan_instruments)
+        # Refresh also probes the resources the discovery cache remembers as silent
+        self.refresh_button.clicked.connect(lambda: self.scan_instruments(rescan=True))
 
         self.test_button = QPushButton("🔧 Test")
         # self.test_button.setFixedHeight(40)
@@ -229,8 +205,12 @@ class InstrumentDetector(QWidget):
         # Store instrument data
         self.instruments_data = {}
 
-    def scan_instruments(self):
-        """Start scanning for instruments"""
+    def scan_instruments(self, rescan=False):
+        """Start scanning for instruments
+
+        Args:
+            rescan: Probe the resources the discovery cache marks as not answering as well
+        """
         if self.scanner_thread and self.scanner_thread.isRunning():
             return
 
@@ -242,7 +222,7 @@ class InstrumentDetector(QWidget):
         self.tree.clear()
         self.details_text.clear()
 
-        self.scanner_thread = InstrumentScanner(timeout=2000)
+        self.scanner_thread = InstrumentScanner(timeout=2000, rescan=bool(rescan))
         self.scanner_thread.progress.connect(self.update_progress)
         self.scanner_thread.finished.connect(self.scan_finished)
         self.scanner_thread.error.connect(self.scan_error)
@@ -305,7 +285,10 @@ class InstrumentDetector(QWidget):
         self.progress_bar.setVisible(False)
         self.scan_button.setEnabled(True)
         self.refresh_button.setEnabled(True)
-        self.status_label.setText(f"Scan complete. Found {total_count} responding instrument(s).")
+        cached = self.scanner_thread.cached_count if self.scanner_thread else 0
+        self.status_label.setText(f"Scan complete. Found {total_count} responding instrument(s)."
+                                  + (f" {cached} silent resource(s) skipped from cache, use Refresh to probe them."
+                                     if cached else ""))
 
     def scan_error(self, error_msg):
         """Handle scan error"""
@@ -331,7 +314,9 @@ class InstrumentDetector(QWidget):
             # Display details
             details = f"<h3>Instrument Details</h3>"
             details += f"<b>Resource:</b> {inst_data['resource']}<br>"
-            details += f"<b>Status:</b> {inst_data['status']}<br>"
+            details += f"<b>Status:</b> {inst_data['status']}"
+            details += " (in use by another page)<br>" if inst_data.get('in_use') else \
+                " (cached)<br>" if inst_data.get('cached') else "<br>"
 
             if inst_data['command']:
                 details += f"<b>ID Command:</b> {inst_data['command']}<br>"
@@ -363,8 +348,9 @@ class InstrumentDetector(QWidget):
         resource = inst_data['resource']
 
         try:
-            rm = pyvisa.ResourceManager()
-            inst = rm.open_resource(resource)
+            # Shared with a page that may have the instrument open, so its timeout is restored afterwards
+            inst = visa_registry.open(resource)
+            previous_timeout = inst.timeout
             inst.timeout = 3000
 
             # Try common test commands
@@ -384,6 +370,7 @@ class InstrumentDetector(QWidget):
                 except Exception as e:
                     test_results += f"<b>{cmd}</b>: <font color='red'>Failed - {str(e)[:50]}</font><br>"
 
+            inst.timeout = previous_timeout
             inst.close()
             self.details_text.setHtml(test_results)
 
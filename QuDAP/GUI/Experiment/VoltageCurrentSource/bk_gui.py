@@ -18,6 +18,17 @@ except ImportError:
     from QuDAP.instrument.BK_precision_9129B import BK_9129_COMMAND
 
 
+def snapshot_readings(snapshot, power=True):
+    """Per-channel readings dict (ch1_v, ch1_i, ch1_p, ...) of a BK_9129_COMMAND snapshot"""
+    readings = {}
+    for index in range(3):
+        readings[f'ch{index + 1}_v'] = float(snapshot['voltage'][index])
+        readings[f'ch{index + 1}_i'] = float(snapshot['current'][index])
+        if power:
+            readings[f'ch{index + 1}_p'] = float(snapshot['power'][index])
+    return readings
+
+
 class ReadingThread(QThread):
     """Thread for continuous reading updates when connected"""
 
@@ -35,18 +46,8 @@ class ReadingThread(QThread):
         try:
             while not self.should_stop:
                 try:
-                    # Measure all voltages, currents, and powers
-                    voltages = self.bk_cmd.measure_all_voltages(self.instrument).strip().split(',')
-                    currents = self.bk_cmd.measure_all_currents(self.instrument).strip().split(',')
-
-                    # Measure power for each channel
-                    power1 = self.bk_cmd.measure_power(self.instrument, 'CH1').strip()
-                    power2 = self.bk_cmd.measure_power(self.instrument, 'CH2').strip()
-                    power3 = self.bk_cmd.measure_power(self.instrument, 'CH3').strip()
-
-                    readings = {'ch1_v': float(voltages[0]), 'ch2_v': float(voltages[1]), 'ch3_v': float(voltages[2]),
-                        'ch1_i': float(currents[0]), 'ch2_i': float(currents[1]), 'ch3_i': float(currents[2]),
-                        'ch1_p': float(power1), 'ch2_p': float(power2), 'ch3_p': float(power3)}
+                    # Measure all voltages and currents (power = V * I)
+                    readings = snapshot_readings(self.bk_cmd.measure_snapshot(self.instrument))
 
                     self.reading_signal.emit(readings)
                     time.sleep(1)
@@ -133,12 +134,7 @@ class MonitorThread(QThread):
                             'ch3_i': self.ch3_i + np.random.randn() * 0.001, }
                     else:
                         # Read actual values
-                        voltages = self.bk_cmd.measure_all_voltages(self.instrument).strip().split(',')
-                        currents = self.bk_cmd.measure_all_currents(self.instrument).strip().split(',')
-
-                        readings = {'ch1_v': float(voltages[0]), 'ch2_v': float(voltages[1]),
-                            'ch3_v': float(voltages[2]), 'ch1_i': float(currents[0]), 'ch2_i': float(currents[1]),
-                            'ch3_i': float(currents[2])}
+                        readings = snapshot_readings(self.bk_cmd.measure_snapshot(self.instrument), power=False)
 
                     self.data_signal.emit(elapsed_time, readings)
                     time.sleep(0.1)  # 100ms update rate
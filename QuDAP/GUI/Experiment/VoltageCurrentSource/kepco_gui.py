@@ -12,10 +12,10 @@ import pyqtgraph as pg
 # Import the standalone connection class and KEPCO commands
 try:
     from instrument.instrument_connection import InstrumentConnection
-    from instrument.kepco import KEPCO_COMMAND
+    from instrument.kepco import KEPCO_COMMAND, KepcoRampEngine
 except ImportError:
     from QuDAP.instrument.instrument_connection import InstrumentConnection
-    from QuDAP.instrument.kepco import KEPCO_COMMAND
+    from QuDAP.instrument.kepco import KEPCO_COMMAND, KepcoRampEngine
 
 
 class ReadingThread(QThread):
@@ -136,6 +136,67 @@ class MonitorThread(QThread):
         self.should_stop = True
 
 
+class RampThread(QThread):
+    """Thread running a list-mode ramp and streaming its samples to the plot"""
+
+    data_signal = pyqtSignal(float, dict)  # (time, readings)
+    progress_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(dict)  # all samples of the ramp
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, engine, interval=0.1, is_emulation=False, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.interval = interval
+        self.is_emulation = is_emulation
+        self.should_stop = False
+
+    def run(self):
+        """Execute the compiled ramp"""
+        try:
+            if self.is_emulation:
+                samples = self._emulate()
+            else:
+                samples = self.engine.run(interval=self.interval, on_sample=self._on_sample,
+                                          should_stop=lambda: self.should_stop)
+            self.finished_signal.emit(samples)
+        except Exception as e:
+            self.error_signal.emit(f"Ramp error: {str(e)}")
+
+    def _on_sample(self, sample):
+        """Forward one sample to the plot and the status label"""
+        self.data_signal.emit(sample['time'], {'voltage': sample['voltage'], 'current': sample['current']})
+        self.progress_signal.emit(f"Status: Ramp segment {sample['segment'] + 1}/{len(self.engine.segments)}, "
+                                  f"step {sample['step'] + 1}, setpoint {sample['setpoint']:.4f}"
+                                  f"{' (compliance)' if sample['compliance'] else ''}")
+
+    def _emulate(self):
+        """Walk the compiled staircase with simulated readings"""
+        samples = {'time': [], 'segment': [], 'step': [], 'setpoint': [], 'voltage': [], 'current': [],
+                   'compliance': []}
+        start_time = time.monotonic()
+        for segment, (levels, dwells) in enumerate(self.engine.segments):
+            for step, (level, dwell) in enumerate(zip(levels, dwells)):
+                step_end = time.monotonic() + dwell
+                while time.monotonic() < step_end:
+                    if self.should_stop:
+                        return samples
+                    current = level if self.engine.mode == 'CURR' else level / 10
+                    voltage = level if self.engine.mode == 'VOLT' else level * 10
+                    sample = {'time': time.monotonic() - start_time, 'segment': segment, 'step': step,
+                              'setpoint': level, 'voltage': voltage + np.random.randn() * 0.01,
+                              'current': current + np.random.randn() * 0.001, 'compliance': False}
+                    for key, value in sample.items():
+                        samples[key].append(value)
+                    self._on_sample(sample)
+                    time.sleep(min(self.interval, dwell))
+        return samples
+
+    def stop(self):
+        """Abort the ramp"""
+        self.should_stop = True
+
+
 class KEPCO(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -147,6 +208,8 @@ class KEPCO(QMainWindow):
         self.reading_thread = None
         self.monitor_thread = None
         self.emulation_thread = None
+        self.ramp_thread = None
+        self.ramp_samples = None
         self.isConnect = False
         self.output_on = False
 
@@ -222,6 +285,7 @@ class KEPCO(QMainWindow):
         self.setup_protection_section(self.left_layout)
         self.setup_mode_section(self.left_layout)
         self.setup_list_programming_section(self.left_layout)
+        self.setup_ramp_section(self.left_layout)
         self.setup_monitor_section(self.left_layout)
 
         self.left_layout.addStretch()
@@ -602,6 +666,75 @@ class KEPCO(QMainWindow):
         list_group.setLayout(list_layout)
         parent_layout.addWidget(list_group)
 
+    def setup_ramp_section(self, parent_layout):
+        """Setup list-mode ramp section"""
+        ramp_group = QGroupBox("List Ramp")
+        ramp_layout = QVBoxLayout()
+
+        # Source mode
+        mode_layout = QHBoxLayout()
+        mode_label = QLabel("Ramp:")
+        mode_label.setFont(self.font)
+        mode_label.setFixedWidth(100)
+
+        self.ramp_mode_combo = QComboBox()
+        self.ramp_mode_combo.setFont(self.font)
+        self.ramp_mode_combo.addItems(["Current", "Voltage"])
+
+        mode_layout.addWidget(mode_label)
+        mode_layout.addWidget(self.ramp_mode_combo, 1)
+        ramp_layout.addLayout(mode_layout)
+
+        # Start, stop, step, dwell and limit
+        self.ramp_start_spin = self._ramp_spin_box(-100, 100, 0.0, 4)
+        self.ramp_stop_spin = self._ramp_spin_box(-100, 100, 1.0, 4)
+        self.ramp_step_spin = self._ramp_spin_box(0.0001, 100, 0.01, 4)
+        self.ramp_dwell_spin = self._ramp_spin_box(0.01, 655.35, 0.1, 3)
+        self.ramp_limit_spin = self._ramp_spin_box(0, 1000, 10.0, 3)
+        # 0 programs the static limit setting instead of a 0 V / 0 A protection limit
+        self.ramp_limit_spin.setSpecialValueText("Static setting")
+
+        for text, spin, unit in [("Start:", self.ramp_start_spin, "A / V"), ("Stop:", self.ramp_stop_spin, "A / V"),
+                                 ("Step:", self.ramp_step_spin, "A / V"), ("Dwell:", self.ramp_dwell_spin, "s"),
+                                 ("Limit:", self.ramp_limit_spin, "V / A")]:
+            row_layout = QHBoxLayout()
+            row_label = QLabel(text)
+            row_label.setFont(self.font)
+            row_label.setFixedWidth(100)
+            unit_label = QLabel(unit)
+            unit_label.setFont(self.font)
+            row_layout.addWidget(row_label)
+            row_layout.addWidget(spin, 1)
+            row_layout.addWidget(unit_label)
+            ramp_layout.addLayout(row_layout)
+
+        # Run/Stop ramp
+        ramp_btn_layout = QHBoxLayout()
+        self.run_ramp_btn = QPushButton("Run Ramp")
+        self.run_ramp_btn.setFont(self.font)
+        self.run_ramp_btn.clicked.connect(self.toggle_ramp)
+        self.run_ramp_btn.setMinimumHeight(35)
+        self.run_ramp_btn.setEnabled(False)
+        ramp_btn_layout.addWidget(self.run_ramp_btn)
+        ramp_layout.addLayout(ramp_btn_layout)
+
+        self.ramp_status_label = QLabel("Status: No ramp")
+        self.ramp_status_label.setFont(self.font)
+        ramp_layout.addWidget(self.ramp_status_label)
+
+        ramp_group.setLayout(ramp_layout)
+        parent_layout.addWidget(ramp_group)
+
+    def _ramp_spin_box(self, minimum, maximum, value, decimals):
+        """Spin box of the ramp section"""
+        spin = QDoubleSpinBox()
+        spin.setFont(self.font)
+        spin.setDecimals(decimals)
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        spin.setFixedHeight(30)
+        return spin
+
     def setup_monitor_section(self, parent_layout):
         """Setup monitoring and data control section"""
         monitor_group = QGroupBox("Real-time Monitoring")
@@ -694,10 +827,7 @@ class KEPCO(QMainWindow):
             self.kepco_cmd.set_output_state(self.kepco, 'OFF')
 
             # Start reading thread
-            self.reading_thread = ReadingThread(self.kepco, self.kepco_cmd)
-            self.reading_thread.reading_signal.connect(self.update_readings)
-            self.reading_thread.error_signal.connect(self.on_reading_error)
-            self.reading_thread.start()
+            self.start_reading()
         else:
             # Emulation mode
             self.emulation_thread = EmulationThread()
@@ -711,17 +841,15 @@ class KEPCO(QMainWindow):
         self.apply_mode_btn.setEnabled(True)
         self.program_list_btn.setEnabled(True)
         self.clear_list_btn.setEnabled(True)
+        self.run_ramp_btn.setEnabled(True)
         self.start_monitor_btn.setEnabled(True)
 
     def on_instrument_disconnected(self, instrument_name):
         """Handle instrument disconnection"""
         # Stop monitoring
         self.stop_monitoring()
-
-        if self.reading_thread and self.reading_thread.isRunning():
-            self.reading_thread.stop()
-            self.reading_thread.wait()
-            self.reading_thread = None
+        self.stop_ramp(resume_reading=False)
+        self.stop_reading()
 
         if self.emulation_thread and self.emulation_thread.isRunning():
             self.emulation_thread.stop()
@@ -747,6 +875,7 @@ class KEPCO(QMainWindow):
         self.apply_mode_btn.setEnabled(False)
         self.program_list_btn.setEnabled(False)
         self.clear_list_btn.setEnabled(False)
+        self.run_ramp_btn.setEnabled(False)
         self.start_monitor_btn.setEnabled(False)
 
         # Reset readings
@@ -1015,6 +1144,100 @@ class KEPCO(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error clearing list:\n{str(e)}")
 
+    def toggle_ramp(self):
+        """Run or abort the list ramp"""
+        if self.ramp_thread and self.ramp_thread.isRunning():
+            self.stop_ramp()
+        else:
+            self.run_ramp()
+
+    def run_ramp(self):
+        """Compile the staircase into the KLP list and run it"""
+        if not self.isConnect:
+            QMessageBox.warning(self, "Not Connected", "Please connect to instrument first")
+            return
+
+        is_emulation = (self.kepco == 'Emulation')
+        engine = KepcoRampEngine(None if is_emulation else self.kepco, self.kepco_cmd)
+        mode = 'CURR' if self.ramp_mode_combo.currentText() == "Current" else 'VOLT'
+        try:
+            levels = engine.staircase(self.ramp_start_spin.value(), self.ramp_stop_spin.value(),
+                                      self.ramp_step_spin.value())
+            engine.compile(levels, self.ramp_dwell_spin.value(), mode, self.ramp_limit_spin.value() or None)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Ramp", str(e))
+            return
+
+        # The ramp samples the output itself and owns the bus during list upload and *OPC?
+        self.stop_monitoring()
+        self.stop_reading()
+        self.clear_plot_data()
+        self.plot_param_combo.setCurrentText("Current" if mode == 'CURR' else "Voltage")
+
+        self.ramp_thread = RampThread(engine, is_emulation=is_emulation)
+        self.ramp_thread.data_signal.connect(self.update_plot_data)
+        self.ramp_thread.progress_signal.connect(self.ramp_status_label.setText)
+        self.ramp_thread.finished_signal.connect(self.on_ramp_finished)
+        self.ramp_thread.error_signal.connect(self.on_ramp_error)
+        self.ramp_thread.start()
+
+        self.run_ramp_btn.setText("Stop Ramp")
+        self.start_monitor_btn.setEnabled(False)
+        self.save_data_btn.setEnabled(True)
+        self.ramp_status_label.setText(f"Status: Ramp of {len(levels)} steps running "
+                                       f"({engine.duration():.1f} s, {len(engine.segments)} list segment(s))")
+        print(f"Ramp started: {len(levels)} steps")
+
+    def stop_ramp(self, resume_reading=True):
+        """Abort the list ramp
+
+        Args:
+            resume_reading: Restart the panel readings paused by the ramp
+        """
+        if self.ramp_thread and self.ramp_thread.isRunning():
+            self.ramp_thread.stop()
+            self.ramp_thread.wait()
+        self.ramp_thread = None
+        self.run_ramp_btn.setText("Run Ramp")
+        self.start_monitor_btn.setEnabled(self.isConnect)
+        if resume_reading:
+            self.start_reading()
+
+    def on_ramp_finished(self, samples):
+        """Keep the samples of the finished ramp"""
+        self.ramp_samples = samples
+        self.run_ramp_btn.setText("Run Ramp")
+        self.start_monitor_btn.setEnabled(self.isConnect)
+        self.ramp_status_label.setText(f"Status: Ramp finished, {len(samples['time'])} samples")
+        self.start_reading()
+        print("Ramp finished")
+
+    def on_ramp_error(self, error_msg):
+        """Handle ramp thread error"""
+        self.run_ramp_btn.setText("Run Ramp")
+        self.start_monitor_btn.setEnabled(self.isConnect)
+        self.ramp_status_label.setText("Status: Ramp failed")
+        self.start_reading()
+        QMessageBox.critical(self, "Error", error_msg)
+
+    def start_reading(self):
+        """Start the periodic panel readings of a connected (non-emulated) instrument"""
+        if not self.isConnect or not self.kepco or self.kepco == 'Emulation':
+            return
+        if self.reading_thread and self.reading_thread.isRunning():
+            return
+        self.reading_thread = ReadingThread(self.kepco, self.kepco_cmd)
+        self.reading_thread.reading_signal.connect(self.update_readings)
+        self.reading_thread.error_signal.connect(self.on_reading_error)
+        self.reading_thread.start()
+
+    def stop_reading(self):
+        """Stop the periodic panel readings"""
+        if self.reading_thread and self.reading_thread.isRunning():
+            self.reading_thread.stop()
+            self.reading_thread.wait()
+        self.reading_thread = None
+
     def toggle_monitoring(self):
         """Start or stop monitoring"""
         if self.monitor_thread and self.monitor_thread.isRunning():
@@ -1131,10 +1354,8 @@ class KEPCO(QMainWindow):
     def closeEvent(self, event):
         """Handle window close"""
         self.stop_monitoring()
-
-        if self.reading_thread and self.reading_thread.isRunning():
-            self.reading_thread.stop()
-            self.reading_thread.wait()
+        self.stop_ramp(resume_reading=False)
+        self.stop_reading()
 
         if self.emulation_thread and self.emulation_thread.isRunning():
             self.emulation_thread.stop()
@@ -20,14 +20,26 @@ from matplotlib.figure import Figure
 
 try:
     # from GUI.Experiment.BNC845RF import COMMAND
-    from QuDAP.instrument.BNC845 import BNC_845M_COMMAND
+    from QuDAP.instrument.BNC845 import BNC_845M_COMMAND, BNC845ListEngine
+    from QuDAP.instrument.DSP7265 import SR7265_COMMAND
     from QuDAP.instrument.rigol_spectrum_analyzer import RIGOL_COMMAND
     from QuDAP.misc.logger import logger
+    from QuDAP.misc.run_data_writer import RunDataWriter
+    from QuDAP.misc.temperature_stability import TemperatureStabilityDetector
+    from QuDAP.misc.run_journal import RunJournal, ST_FMR_JOURNAL_NAME
+    from QuDAP.misc.ppms_recorder import PPMSTelemetryRecorder
+    from QuDAP.misc.io_trace import io_tracer
 except ImportError:
     # from QuDAP.GUI.Experiment.BNC845RF import COMMAND
-    from instrument.BNC845 import BNC_845M_COMMAND
+    from instrument.BNC845 import BNC_845M_COMMAND, BNC845ListEngine
+    from instrument.DSP7265 import SR7265_COMMAND
     from instrument.BK_precision_9129B import BK_9129_COMMAND
     from misc.logger import logger
+    from misc.run_data_writer import RunDataWriter
+    from misc.temperature_stability import TemperatureStabilityDetector
+    from misc.run_journal import RunJournal, ST_FMR_JOURNAL_NAME
+    from misc.ppms_recorder import PPMSTelemetryRecorder
+    from misc.io_trace import io_tracer
     # from GUI.Experiment.rigol_experiment import RIGOL_Measurement
 
 
@@ -71,6 +83,11 @@ class ST_FMR_Worker(QThread):
     # Measurement progress
     update_measurement_progress = pyqtSignal(float, float, float, float)
 
+    # Age (s) of a cached PPMS reading accepted when a reading only refreshes the labels
+    LABEL_MAX_AGE = 2.0
+    # Field/temperature logging interval (s) of the recorder used during continuous sweeps
+    RECORDER_INTERVAL = 0.25
+
     def __init__(self, parent, ppms_instrument, dsp7265_instrument, bnc845_instrument, ppms_setting, bnc845_setting,
                  measurment_setting, folder_path, file_name, run_number, settling_time, notification_manager, demo_mode=False, spectrum_averaging=1,
                  save_individual_spectra=True, **kwargs):
@@ -88,6 +105,8 @@ class ST_FMR_Worker(QThread):
         self.measurment_setting = measurment_setting
         self.folder_path = folder_path
         self.file_name = file_name
+        # Completed sweeps / field points, used to resume an interrupted run
+        self.journal = RunJournal(f"{self.folder_path}{ST_FMR_JOURNAL_NAME}")
         self.run_number = run_number
         self.settling_time = settling_time
         self.notification_manager = notification_manager
@@ -97,6 +116,8 @@ class ST_FMR_Worker(QThread):
 
         # Measurement parameters
         self.spectrum_averaging = spectrum_averaging
+        # Lock-in curve buffer storage interval in seconds (0 = point-by-point polling)
+        self.lockin_buffer_interval = measurment_setting.get('lockin_buffer_interval', 0)
         self.save_individual_spectra = save_individual_spectra
 
         # Control flags
@@ -110,6 +131,10 @@ class ST_FMR_Worker(QThread):
         self.cumulative_repetition_data = []  # Store all repetition data
         self.cumulative_power_data = {}  # Dict keyed by power level
         self.cumulative_frequency_data = {}  # Dict keyed by (power, frequency)
+        self.data_writer = RunDataWriter()
+        # Field points are journaled when the writer has flushed their rows, not fsync'ed one by one
+        self.data_writer.add_flush_callback(self.journal.commit_pending)
+        self.dsp7265_cmd = SR7265_COMMAND()
 
         # initialize ppms safe command
         try:
@@ -118,12 +143,18 @@ class ST_FMR_Worker(QThread):
             from GUI.Experiment.measurement import ThreadSafePPMSCommands
 
         self.ppms = ThreadSafePPMSCommands(self.client, self.notification_manager)
+        # Background field/temperature log, running during continuous field sweeps
+        self.ppms_recorder = None
+        # Frequency x power table stepped in BNC 845 LIST mode
+        self.rf_list = None
 
         # Additional parameters
         self.extra_params = kwargs
 
     def run(self):
         """Main execution method - runs in separate thread."""
+        # The I/O trace covers this run only
+        io_tracer.reset()
         try:
             self.append_text.emit("=" * 60, 'green')
             self.append_text.emit("Starting ST_FMR Measurement", 'green')
@@ -160,6 +191,11 @@ class ST_FMR_Worker(QThread):
             except Exception as e:
                 tb_str = traceback.format_exc()
                 self.show_error.emit("Error", f'{tb_str}')
+            finally:
+                self._stop_field_recorder()
+                self._release_rf_list()
+                self.data_writer.close_all()
+                self._dump_io_trace()
 
             if self.stopped_by_user:
                 self.append_text.emit("\n" + "=" * 60, 'red')
@@ -209,9 +245,15 @@ class ST_FMR_Worker(QThread):
             number_of_frequency = len(frequency_list)
             number_of_temperature = len(temperature_list)
 
+            # Upload the whole frequency x power table once, points are then stepped in LIST mode
+            if self.bnc845:
+                self._load_rf_list(frequency_list, power_list)
+
             fast_field_rate = 220
             zero_field = 0
             result = {}
+            csv_header = ["Temperature (K)", "Field (Oe)", "Voltage X (V)", "Voltage Y (V)",
+                          "Voltage Mag (V)", "Phase (deg)"]
 
             start_time = time.time()
             self.append_text.emit('Measurement Start....\n', 'red')
@@ -219,9 +261,9 @@ class ST_FMR_Worker(QThread):
             time.sleep(5)
 
             # -------------Temperature Status---------------------
-            self._update_temperature_reading_label()
+            self._update_temperature_reading_label(self.LABEL_MAX_AGE)
             # ------------Field Status----------------------
-            self._update_field_reading_label()
+            self._update_field_reading_label(self.LABEL_MAX_AGE)
             # ------------Chamber Status----------------------
             # self._update_chamber_reading_label()
 
@@ -237,6 +279,7 @@ class ST_FMR_Worker(QThread):
             self.pts = 0
 
 
+            remaining_progress = None
             for i in range(number_of_temperature):
                 if self.stopped_by_user:
                     self.append_text.emit("\n" + "=" * 60, 'red')
@@ -246,6 +289,13 @@ class ST_FMR_Worker(QThread):
                     logger.warning("Measurement stopped by user")
                     logger.warning("=" * 60)
                     return  # Exit without emitting measurement_finished
+                if self.journal.all_done({'temperature': temperature_list[i], 'frequency': frequency,
+                                          'power': power, 'repetition': repetition}
+                                         for frequency in frequency_list for power in power_list
+                                         for repetition in number_of_repetition):
+                    self.append_text.emit(f'{temperature_list[i]} K already completed, skipping\n', 'orange')
+                    logger.info(f'{temperature_list[i]} K already completed in the run journal, skipping')
+                    continue
                 self.temperature_array = []
                 self._set_field(zero_field, fast_field_rate)
                 time.sleep(10)
@@ -277,7 +327,7 @@ class ST_FMR_Worker(QThread):
                 logger.info(f'Waiting for {temperature_set_point} K Temperature')
                 time.sleep(4)
 
-                self._update_temperature_reading_label()
+                self._update_temperature_reading_label(self.LABEL_MAX_AGE)
                 while True:
                     if self.stopped_by_user:
                         self.append_text.emit("\n" + "=" * 60, 'red')
@@ -292,10 +342,17 @@ class ST_FMR_Worker(QThread):
                     if temperature_status == 'Stable':
                         break
 
-                self.append_text.emit(f'Stabilizing the Temperature for 5 minutes.....', 'orange')
-                logger.info(f'Stabilizing the Temperature for 5 minutes.....')
-                # time.sleep(300)
-                time.sleep(30)
+                self.append_text.emit(f'Stabilizing the Temperature.....', 'orange')
+                logger.info(f'Stabilizing the Temperature.....')
+                stability = TemperatureStabilityDetector(self.ppms, max_wait=30)
+                settled, settle_time, settled_temp = stability.wait(
+                    running=lambda: not self.stopped_by_user,
+                    on_reading=lambda T, status, unit: self.update_ppms_temp_reading_label.emit(str(T), str(unit),
+                                                                                                 status))
+                if settled_temp is not None:
+                    curTemp = settled_temp
+                self.append_text.emit(f'Temperature {"settled" if settled else "not fully settled"} after '
+                                      f'{settle_time:.0f} s\n', 'green' if settled else 'orange')
                 self.temperature_array.append(curTemp)
                 if self.stopped_by_user:
                     self.append_text.emit("\n" + "=" * 60, 'red')
@@ -324,18 +381,17 @@ class ST_FMR_Worker(QThread):
                     for k in range(number_of_power):
                         current_frequency = frequency_list[j]
                         current_power = power_list[k]
+                        if self.journal.all_done({'temperature': temperature_list[i], 'frequency': current_frequency,
+                                                  'power': current_power, 'repetition': repetition}
+                                                 for repetition in number_of_repetition):
+                            logger.info(f'{current_frequency} Hz, {current_power} dBm already completed, skipping')
+                            continue
                         self.power_array = []
                         if self.bnc845:
                             try:
-                                self._set_enable_bnc845(frequency=current_frequency, power=current_power)
-                                time.sleep(2)
+                                curFreq, curPower = self._select_rf_point(current_frequency, current_power)
                                 self.update_fmr_ui.emit()
-                                time.sleep(2)
-                                curFreq = self._get_current_frequency_bnc845()
-                                time.sleep(2)
                                 self.frequency_array.append(curFreq)
-                                curPower = self._get_current_power_bnc845()
-                                time.sleep(2)
                                 self.power_array.append(curPower)
                             except Exception as e:
                                 self.show_error.emit("BNC Setting Error", f'{e}')
@@ -351,10 +407,14 @@ class ST_FMR_Worker(QThread):
                                 return  # Exit without emitting measurement_finished
                             total_progress = len(
                                 number_of_repetition) * number_of_power * number_of_frequency * number_of_temperature
-                            if i == 0 and j == 0 and k == 0 and l == 0:
+                            if remaining_progress is None:
                                 remaining_progress = total_progress
                             else:
                                 remaining_progress = remaining_progress - 1
+                            if self.journal.is_done(temperature=temperature_list[i], frequency=frequency_list[j],
+                                                    power=power_list[k], repetition=number_of_repetition[l]):
+                                logger.info(f'Repetition {number_of_repetition[l]} already completed, skipping')
+                                continue
                             self.repetition_array = []
                             self.repetition_array.append(number_of_repetition[l])
                             self.send_notification.emit(
@@ -399,6 +459,7 @@ class ST_FMR_Worker(QThread):
 
                             # ----------------- Loop Down ----------------------#
                             if field_mode == 'continuous':
+                                self._start_field_recorder()
                                 field_zone_count = self.ppms_setting['field_setting']['final_continuous_list']['zone_count']
                                 field_direction = self.ppms_setting['field_setting']['field_direction']
                                 if field_direction == 'unidirectional':
@@ -458,7 +519,20 @@ class ST_FMR_Worker(QThread):
                                 counter = 0
                                 self._turn_on_output_bnc845()
                                 time.sleep(2)
-                                while currentField >= end_field + 1:
+                                lockin_buffered = bool(self.dsp7265) and self.lockin_buffer_interval > 0
+                                if lockin_buffered:
+                                    currentField = self._buffered_continuous_sweep(end_field, field_direction,
+                                                                                   field_zone_count, csv_filename,
+                                                                                   csv_header, curTemp)
+                                    if currentField is None:
+                                        self.append_text.emit("\n" + "=" * 60, 'red')
+                                        self.append_text.emit("Measurement stopped by user", 'red')
+                                        self.append_text.emit("=" * 60, 'red')
+                                        logger.warning("\n" + "=" * 60)
+                                        logger.warning("Measurement stopped by user")
+                                        logger.warning("=" * 60)
+                                        return  # Exit without emitting measurement_finished
+                                while not lockin_buffered and currentField >= end_field + 1:
                                     user_field_rate = self._continous_field_setting(field_direction, currentField, field_zone_count)
                                     self._set_field(end_field, user_field_rate)
                                     time.sleep(2)
@@ -476,7 +550,7 @@ class ST_FMR_Worker(QThread):
                                     single_measurement_start = time.time()
 
                                     time.sleep(1)
-                                    currentField, field_status = self._update_field_reading_label()
+                                    currentField, field_status = self._recorded_field_reading()
 
                                     self.append_text.emit(f'Saving data for {currentField} Oe \n', 'green')
                                     logger.success(f'Saving data for {currentField} Oe')
@@ -493,12 +567,12 @@ class ST_FMR_Worker(QThread):
                                                 return  # Exit without emitting measurement_finished
                                             # self._wait_settling("Wait for settling time.")
 
-                                            currentField, field_status = self._update_field_reading_label()
+                                            sample_start = time.monotonic()
+                                            X, Y, Mag, Phase = self.dsp7265_cmd.read_outputs(self.dsp7265, ('X', 'Y', 'MAG', 'PHA'))
+                                            # Field at the middle of the lock-in read
+                                            currentField, field_status = self._recorded_field_reading(
+                                                (sample_start + time.monotonic()) / 2)
                                             self.field_array.append(currentField)
-                                            X = float(self.dsp7265.query("X."))  # Read the measurement result
-                                            Y = float(self.dsp7265.query("Y."))  # Read the measurement result
-                                            Mag = float(self.dsp7265.query("MAG."))  # Read the measurement result
-                                            Phase = float(self.dsp7265.query("PHA."))  # Read the measurement result
                                             self.update_lockin_label.emit(str(X), str(Y), str(Mag), str(Phase))
                                             self.lockin_x.append(X)
                                             self.lockin_y.append(Y)
@@ -518,18 +592,10 @@ class ST_FMR_Worker(QThread):
 
 
                                         # Append the data to the CSV file
-                                        with open(csv_filename, "a", newline="") as csvfile:
-                                            csv_writer = csv.writer(csvfile)
-
-                                            if csvfile.tell() == 0:  # Check if file is empty
-                                                csv_writer.writerow(
-                                                    ["Temperature (K)", "Field (Oe)", "Voltage X (V)", "Voltage Y (V)",
-                                                     "Voltage Mag (V)", "Phase (deg)"])
-
-                                            csv_writer.writerow(
-                                                [curTemp, currentField, X, Y, Mag, Phase])
-                                            self.append_text.emit(f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
-                                            logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
+                                        self.data_writer.write_row(csv_filename, csv_header,
+                                                                   [curTemp, currentField, X, Y, Mag, Phase])
+                                        self.append_text.emit(f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
+                                        logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
                                     # ----------------------------- Measure NV voltage -------------------
                                     user_field_rate = self._continous_field_setting(field_direction, currentField,
                                                                                     field_zone_count)
@@ -599,6 +665,7 @@ class ST_FMR_Worker(QThread):
 
                                 # ----------------- Loop Up ----------------------#
                                 if field_direction == 'bidirectional':
+                                    self.data_writer.sync()  # Down sweep finished, push it to disk
                                     self.send_notification.emit(
                                         f"Starting the second half of measurement - ramping field up")
                                     currentField = end_field
@@ -636,7 +703,19 @@ class ST_FMR_Worker(QThread):
                                     counter = 0
 
                                     self.progress_update.emit(int(50))
-                                    while currentField <= start_field - 1:
+                                    if lockin_buffered:
+                                        currentField = self._buffered_continuous_sweep(start_field, field_direction,
+                                                                                       field_zone_count, csv_filename,
+                                                                                       csv_header, curTemp)
+                                        if currentField is None:
+                                            self.append_text.emit("\n" + "=" * 60, 'red')
+                                            self.append_text.emit("Measurement stopped by user", 'red')
+                                            self.append_text.emit("=" * 60, 'red')
+                                            logger.warning("\n" + "=" * 60)
+                                            logger.warning("Measurement stopped by user")
+                                            logger.warning("=" * 60)
+                                            return  # Exit without emitting measurement_finished
+                                    while not lockin_buffered and currentField <= start_field - 1:
                                         if self.stopped_by_user:
                                             self.append_text.emit("\n" + "=" * 60, 'red')
                                             self.append_text.emit("Measurement stopped by user", 'red')
@@ -662,7 +741,7 @@ class ST_FMR_Worker(QThread):
                                         single_measurement_start = time.time()
 
                                         time.sleep(1)
-                                        currentField, field_status = self._update_field_reading_label()
+                                        currentField, field_status = self._recorded_field_reading()
                                         self.append_text.emit(f'Saving data for {currentField} Oe \n', 'green')
                                         logger.success(f'Saving data for {currentField} Oe')
 
@@ -677,12 +756,12 @@ class ST_FMR_Worker(QThread):
                                                     logger.warning("=" * 60)
                                                     return  # Exit without emitting measurement_finished
                                                 # self._wait_settling("Wait for settling time.")
-                                                currentField, field_status = self._update_field_reading_label()
+                                                sample_start = time.monotonic()
+                                                X, Y, Mag, Phase = self.dsp7265_cmd.read_outputs(self.dsp7265, ('X', 'Y', 'MAG', 'PHA'))
+                                                # Field at the middle of the lock-in read
+                                                currentField, field_status = self._recorded_field_reading(
+                                                    (sample_start + time.monotonic()) / 2)
                                                 self.field_array.append(currentField)
-                                                X = float(self.dsp7265.query("X."))  # Read the measurement result
-                                                Y = float(self.dsp7265.query("Y."))  # Read the measurement result
-                                                Mag = float(self.dsp7265.query("MAG."))  # Read the measurement result
-                                                Phase = float(self.dsp7265.query("PHA."))  # Read the measurement result
                                                 self.update_lockin_label.emit(str(X), str(Y), str(Mag), str(Phase))
                                                 self.lockin_x.append(X)
                                                 self.lockin_y.append(Y)
@@ -700,20 +779,11 @@ class ST_FMR_Worker(QThread):
                                                 return
 
                                             # Append the data to the CSV file
-                                            with open(csv_filename, "a", newline="") as csvfile:
-                                                csv_writer = csv.writer(csvfile)
-
-                                                if csvfile.tell() == 0:  # Check if file is empty
-                                                    csv_writer.writerow(
-                                                        ["Temperature (K)", "Field (Oe)", "Voltage X (V)",
-                                                         "Voltage Y (V)",
-                                                         "Voltage Mag (V)", "Phase (deg)"])
-
-                                                csv_writer.writerow(
-                                                    [curTemp, currentField, X, Y, Mag, Phase])
-                                                self.append_text.emit(
-                                                    f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
-                                                logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
+                                            self.data_writer.write_row(csv_filename, csv_header,
+                                                                       [curTemp, currentField, X, Y, Mag, Phase])
+                                            self.append_text.emit(
+                                                f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
+                                            logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
 
                                         # ----------------------------- Measure NV voltage -------------------
                                         user_field_rate = self._continous_field_setting(field_direction, currentField,
@@ -806,6 +876,10 @@ class ST_FMR_Worker(QThread):
                                         logger.warning("=" * 60)
                                         return  # Exit without emitting measurement_finished
                                     currentField = field_list[m]
+                                    if self.journal.is_done(temperature=temperature_list[i],
+                                                            frequency=frequency_list[j], power=power_list[k],
+                                                            repetition=number_of_repetition[l], field_index=m):
+                                        continue
 
                                     single_measurement_start = time.time()
                                     self.append_text.emit(f'Loop is at {currentField} Oe \n', 'blue')
@@ -855,10 +929,7 @@ class ST_FMR_Worker(QThread):
                                                 logger.warning("=" * 60)
                                                 return  # Exit without emitting measurement_finished
                                             self._wait_settling("Wait for settling time.")
-                                            X = float(self.dsp7265.query("X."))  # Read the measurement result
-                                            Y = float(self.dsp7265.query("Y."))  # Read the measurement result
-                                            Mag = float(self.dsp7265.query("MAG."))  # Read the measurement result
-                                            Phase = float(self.dsp7265.query("PHA."))  # Read the measurement result
+                                            X, Y, Mag, Phase = self.dsp7265_cmd.read_outputs(self.dsp7265, ('X', 'Y', 'MAG', 'PHA'))
                                             self.update_lockin_label.emit(str(X), str(Y), str(Mag), str(Phase))
                                             self.lockin_x.append(X)
                                             self.lockin_y.append(Y)
@@ -875,22 +946,19 @@ class ST_FMR_Worker(QThread):
                                             return
 
                                         # Append the data to the CSV file
-                                        with open(csv_filename, "a", newline="") as csvfile:
-                                            csv_writer = csv.writer(csvfile)
-
-                                            if csvfile.tell() == 0:  # Check if file is empty
-                                                csv_writer.writerow(
-                                                    ["Temperature (K)", "Field (Oe)", "Voltage X (V)", "Voltage Y (V)", "Voltage Mag (V)", "Phase (deg)"])
-
-                                            csv_writer.writerow(
-                                                [curTemp, currentField, X, Y, Mag, Phase])
-                                            self.append_text.emit(f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
-                                            logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
+                                        self.data_writer.write_row(csv_filename, csv_header,
+                                                                   [curTemp, currentField, X, Y, Mag, Phase])
+                                        self.append_text.emit(f'Data Saved for {currentField} Oe at {curTemp} K\n', 'green')
+                                        logger.success(f'Data Saved for {currentField} Oe at {curTemp} K')
 
-                                    self._update_field_reading_label()
-                                    self._update_temperature_reading_label()
+                                    self._update_field_reading_label(self.LABEL_MAX_AGE)
+                                    self._update_temperature_reading_label(self.LABEL_MAX_AGE)
                                     # ----------------------------- Measure NV voltage -------------------
                                     self.pts += 1  # Number of self.pts count
+                                    # Journaled by the data writer once the point's row is flushed
+                                    self.journal.mark_pending(temperature=temperature_list[i],
+                                                              frequency=frequency_list[j], power=power_list[k],
+                                                              repetition=number_of_repetition[l], field_index=m)
                                     single_measurement_end = time.time()
                                     Single_loop = single_measurement_end - single_measurement_start
                                     remaining_progress_stepped = remaining_progress * number_of_field - m
@@ -944,6 +1012,11 @@ class ST_FMR_Worker(QThread):
                                         return  # Exit without emitting measurement_finished
                                     time.sleep(2)
 
+                            # Sweep finished, push the spectrum to disk and release the file
+                            self.data_writer.close(csv_filename)
+                            self.journal.mark_done(temperature=temperature_list[i], frequency=frequency_list[j],
+                                                   power=power_list[k], repetition=number_of_repetition[l])
+
                             # Update single spectrum plot with completed data
                             self.append_text.emit('Updating single spectrum plot...', 'blue')
 
@@ -958,10 +1031,7 @@ class ST_FMR_Worker(QThread):
                             self.append_text.emit(f'Saved individual spectrum: {individual_plot_filename}',
                                                       'green')
                             time.sleep(2)
-                            self.client.set_field(zero_field,
-                                                  fast_field_rate,
-                                                  self.client.field.approach_mode.oscillate,
-                                                  self.client.field.driven_mode.driven)
+                            self._set_field(zero_field, fast_field_rate, 'oscillate')
                             self.append_text.emit('Waiting for Zero Field', 'red')
                             time.sleep(2)
                             while True:
@@ -1100,10 +1170,7 @@ class ST_FMR_Worker(QThread):
                     self.cumulative_power_data = {}
                     self.cumulative_frequency_data = {}
             time.sleep(2)
-            self.client.set_field(zero_field,
-                                  fast_field_rate,
-                                  self.client.field.approach_mode.oscillate,  # linear/oscillate
-                                  self.client.field.driven_mode.driven)
+            self._set_field(zero_field, fast_field_rate, 'oscillate')
             self.append_text.emit('Waiting for Zero Field', 'red')
             time.sleep(2)
             while True:
@@ -1112,9 +1179,9 @@ class ST_FMR_Worker(QThread):
                 if field_status == 'Holding (driven)':
                     time.sleep(5)
                     break
-            self._update_field_reading_label()
+            self._update_field_reading_label(self.LABEL_MAX_AGE)
             time.sleep(2)
-            self._update_temperature_reading_label()
+            self._update_temperature_reading_label(self.LABEL_MAX_AGE)
             self.progress_update.emit(100)
             # self.save_plot.emit(self.file_name)
             # self.save_2d_plot.emit(self.file_name)
@@ -1128,6 +1195,7 @@ class ST_FMR_Worker(QThread):
             logger.success(f"Total runtime: {total_runtime} hours")
             logger.success(f'Total data points: {str(self.pts)} pts\n')
             logger.success("You measurement is finished!")
+            self.journal.finish()
             # stop_measurement()
             self.measurement_finished.emit()
             return
@@ -1140,6 +1208,16 @@ class ST_FMR_Worker(QThread):
             self.show_error.emit("Error", f'{tb_str}')
             logger.error(f'{tb_str}')
 
+    def _dump_io_trace(self):
+        """Write the I/O trace of this run (finished, stopped or failed) when tracing is enabled"""
+        if not io_tracer.enabled:
+            return
+        try:
+            io_tracer.dump(f"{self.folder_path}{self.file_name}_io_trace.json")
+            logger.info(io_tracer.summary())
+        except Exception as e:
+            logger.warning(f'Could not write the I/O trace: {e}')
+
     def _continous_field_setting(self, field_direction, currentField, field_zone_count):
         if field_direction == 'unidirectional':
             if field_zone_count == 1:
@@ -1271,21 +1349,143 @@ class ST_FMR_Worker(QThread):
                             'rate']
         return user_field_rate
 
+    def _buffered_continuous_sweep(self, target_field, field_direction, field_zone_count, csv_filename, csv_header,
+                                   curTemp):
+        """
+        Ramp the field to target_field while the DSP 7265 stores X/Y/Mag/Phase in its curve buffer.
+
+        The field is logged with monotonic timestamps during the ramp (by the PPMS recorder when it
+        runs); afterwards the buffer is downloaded in bulk and every sample gets the field
+        interpolated at its storage time.
+
+        Returns:
+            The last field reading, or None if the measurement was stopped
+        """
+        outputs = ('X', 'Y', 'MAG', 'PHA')
+        continuous_list = self.ppms_setting['field_setting']['final_continuous_list']
+        slowest_rate = min(continuous_list[f'region{zone}']['rate'] for zone in range(1, field_zone_count + 1)
+                           if f'region{zone}' in continuous_list)
+
+        currentField, field_status = self._update_field_reading_label()
+        # Size the buffer for the slowest zone with 20 % margin, stretching the interval if it does not fit
+        sweep_duration = abs(currentField - target_field) / slowest_rate * 1.2 + 10
+        interval = self.lockin_buffer_interval
+        max_length = 32768 // len(outputs)
+        if sweep_duration / interval > max_length:
+            interval = sweep_duration / max_length
+            self.append_text.emit(f'Lock-in buffer interval increased to {interval * 1000:.0f} ms to fit the sweep\n',
+                                  'orange')
+            logger.warning(f'Lock-in buffer interval increased to {interval * 1000:.0f} ms to fit the sweep')
+        length = max(1, min(max_length, int(sweep_duration / interval)))
+
+        start_time = self.dsp7265_cmd.start_buffered_acquisition(self.dsp7265, interval, length, outputs)
+        field_times = [start_time]
+        field_values = [currentField]
+        self.append_text.emit(f'Lock-in buffer started: {length} points every {interval * 1000:.0f} ms\n', 'purple')
+        logger.info(f'Lock-in buffer started: {length} points every {interval * 1000:.0f} ms')
+
+        last_rate = None
+        while abs(currentField - target_field) >= 1:
+            if self.stopped_by_user:
+                self.dsp7265_cmd.halt_curve_storage(self.dsp7265)
+                return None
+            user_field_rate = self._continous_field_setting(field_direction, currentField, field_zone_count)
+            if user_field_rate != last_rate:
+                self._set_field(target_field, user_field_rate)
+                last_rate = user_field_rate
+            time.sleep(1)
+            # The polled fields are always logged, as the fallback when the recorder series is too short
+            read_start = time.monotonic()
+            if self.ppms_recorder is not None:
+                currentField, field_status = self._recorded_field_reading()
+            else:
+                currentField, field_status = self._update_field_reading_label()
+            field_times.append((read_start + time.monotonic()) / 2)
+            field_values.append(currentField)
+            if field_status == 'Holding (driven)' and time.monotonic() - start_time > 10:
+                break
+
+        data = self.dsp7265_cmd.read_buffered_acquisition(self.dsp7265, outputs)
+        if self.ppms_recorder is not None:
+            recorded_times, recorded_values = self.ppms_recorder.series('field', since=start_time - 1)
+            if len(recorded_times) >= 2:
+                field_times, field_values = recorded_times, recorded_values
+            else:
+                logger.warning('PPMS recorder series too short, using the polled field log')
+        sample_times = start_time + interval * np.arange(len(data['X']))
+        # Only keep samples that lie inside the logged field window
+        in_window = sample_times <= field_times[-1]
+        fields = np.interp(sample_times[in_window], field_times, field_values)
+        X, Y, Mag, Phase = (data[name][in_window] for name in outputs)
+
+        for row in zip(fields, X, Y, Mag, Phase):
+            self.data_writer.write_row(csv_filename, csv_header, [curTemp, *row])
+        self.field_array.extend(fields.tolist())
+        self.lockin_x.extend(X.tolist())
+        self.lockin_y.extend(Y.tolist())
+        self.lockin_mag.extend(Mag.tolist())
+        self.lockin_pahse.extend(Phase.tolist())
+        self.pts += len(fields)
+
+        if len(fields):
+            self.update_lockin_label.emit(str(X[-1]), str(Y[-1]), str(Mag[-1]), str(Phase[-1]))
+        self.update_fmr_spectrum_plot.emit(self.field_array, self.lockin_x)
+        self.append_text.emit(f'Data Saved for {len(fields)} buffered points at {curTemp} K\n', 'green')
+        logger.success(f'Data Saved for {len(fields)} buffered points at {curTemp} K')
+        return currentField
+
     # ==================================================================================
     # LABEL UPDATE METHODS
     # ==================================================================================
-    def _update_temperature_reading_label(self):
-        temperature, status, temp_unit = self._read_temperature()
+    def _update_temperature_reading_label(self, max_age=0):
+        temperature, status, temp_unit = self._read_temperature(max_age)
         self.append_text.emit(f'Current temperature is {temperature} {temp_unit}; Status: {status}\n', 'purple')
         self.update_ppms_temp_reading_label.emit(str(temperature), str(temp_unit), status)
         return temperature, status
 
-    def _update_field_reading_label(self):
-        field, status, field_unit = self._read_field()
+    def _update_field_reading_label(self, max_age=0):
+        field, status, field_unit = self._read_field(max_age)
         self.append_text.emit(f'Current field is {field} {field_unit}; Status: {status}\n', 'purple')
         self.update_ppms_field_reading_label.emit(str(field), field_unit, status)
         return field, status
 
+    def _recorded_field_reading(self, timestamp=None):
+        """
+        Field from the PPMS recorder instead of a new PPMS query
+
+        Args:
+            timestamp: time.monotonic() of an instrument sample; the field is interpolated at it
+                (None returns the newest recorded field)
+
+        Returns:
+            Tuple (field, status); falls back to a direct reading if the recorder has no data
+        """
+        if self.ppms_recorder is None:
+            return self._update_field_reading_label()
+        if timestamp is None:
+            record = self.ppms_recorder.latest('field')
+            field, status = (record[1], record[2]) if record is not None else (None, None)
+        else:
+            field, status = self.ppms_recorder.value_at('field', timestamp)
+        if field is None:
+            return self._update_field_reading_label()
+        self.update_ppms_field_reading_label.emit(str(field), 'Oe', status)
+        return field, status
+
+    def _start_field_recorder(self):
+        """Start logging field and temperature in the background for continuous sweeps"""
+        if self.demo_mode or self.ppms_recorder is not None:
+            return
+        self.ppms_recorder = PPMSTelemetryRecorder(self.ppms.telemetry, interval=self.RECORDER_INTERVAL)
+        self.ppms_recorder.start()
+        logger.info(f'PPMS recorder started ({self.RECORDER_INTERVAL * 1000:.0f} ms interval)')
+
+    def _stop_field_recorder(self):
+        """Stop the background field/temperature log"""
+        if self.ppms_recorder is not None:
+            self.ppms_recorder.stop()
+            self.ppms_recorder = None
+
     def _update_chamber_reading_label(self):
         cT = self._get_chamber_status()
         self.append_text.emit(f'Current chamber status is {cT}\n', 'purple')
@@ -1325,12 +1525,13 @@ class ST_FMR_Worker(QThread):
                 f"Your measurement went wrong, possible PPMS command error {e}", 'critical')
             self.show_error('PPMS command error', f"Your measurement went wrong, possible PPMS command error {e}")
 
-    def _set_field(self, set_point, field_rate):
+    def _set_field(self, set_point, field_rate, approach_mode='linear'):
         try:
             success = self.ppms.set_field(
                 set_point=set_point,
                 field_rate=field_rate,
-                timeout=10
+                timeout=10,
+                approach_mode=approach_mode
             )
             if not success:
                 self.stop_measurement.emit()
@@ -1344,9 +1545,9 @@ class ST_FMR_Worker(QThread):
                 f"Your measurement went wrong, possible PPMS command error {e} {tb_str}", 'critical')
             self.show_error('PPMS command error', f"Your measurement went wrong, possible PPMS command error {e}")
 
-    def _read_temperature(self):
+    def _read_temperature(self, max_age=0):
         try:
-            success, temp, status, unit = self.ppms.read_temperature(timeout=10)
+            success, temp, status, unit = self.ppms.read_temperature(timeout=10, max_age=max_age)
             if not success:
                 self.stop_measurement.emit()
             return temp, status, unit
@@ -1359,9 +1560,9 @@ class ST_FMR_Worker(QThread):
                 f"Your measurement went wrong, possible PPMS command error {e}", 'critical')
             self.show_error('PPMS command error', f"Your measurement went wrong, possible PPMS command error {e}")
 
-    def _read_field(self):
+    def _read_field(self, max_age=0):
         try:
-            success, field, status, unit = self.ppms.read_field(timeout=10)
+            success, field, status, unit = self.ppms.read_field(timeout=10, max_age=max_age)
             if not success:
                 self.stop_measurement.emit()
             return field, status, unit
@@ -1383,6 +1584,41 @@ class ST_FMR_Worker(QThread):
         BNC_845M_COMMAND().set_power(self.bnc845,power)
         logger.info(f'Set BNC 845 frequency {frequency} power {power}')
 
+    def _load_rf_list(self, frequency_list, power_list):
+        """Upload the frequency x power table to the BNC 845 (in measurement order)"""
+        try:
+            self.rf_list = BNC845ListEngine(self.bnc845)
+            points = [(frequency, power) for frequency in frequency_list for power in power_list]
+            if self.rf_list.load(points):
+                logger.info(f'BNC 845 LIST mode: {len(points)} RF points uploaded')
+        except Exception as e:
+            logger.warning(f'BNC 845 LIST upload failed, setting RF points directly: {e}')
+            self.rf_list = None
+
+    def _select_rf_point(self, frequency, power):
+        """
+        Output one RF point and wait for the generator (*OPC?) instead of fixed sleeps
+
+        Returns:
+            Tuple (frequency, power) strings read back from the generator
+        """
+        if self.rf_list is not None:
+            frequency, power = self.rf_list.select(frequency, power)
+            logger.info(f'Set BNC 845 frequency {frequency} power {power} (read back)')
+            return str(frequency), str(power)
+        self._set_enable_bnc845(frequency=frequency, power=power)
+        BNC_845M_COMMAND().operation_complete_query(self.bnc845)
+        return self._get_current_frequency_bnc845(), self._get_current_power_bnc845()
+
+    def _release_rf_list(self):
+        """Return the BNC 845 from LIST mode to CW at the last point"""
+        if self.rf_list is not None:
+            try:
+                self.rf_list.release()
+            except Exception as e:
+                logger.warning(f'BNC 845 LIST release failed: {e}')
+            self.rf_list = None
+
     def _turn_on_output_bnc845(self):
         """Turn on a bncl."""
         BNC_845M_COMMAND().set_output(self.bnc845,'ON')
@@ -2936,9 +3172,22 @@ class FMR_Measurement(QWidget):
         fmr_setting_init_temp_rate_layout.addWidget(fmr_setting_init_temp_rate_line_edit)
         fmr_setting_layout.addLayout(fmr_setting_init_temp_rate_layout)
 
+        fmr_setting_buffer_interval_layout = QHBoxLayout()
+        fmr_setting_buffer_interval_label = QLabel('Lock-in Buffer Interval (ms):')
+        fmr_setting_buffer_interval_label.setToolTip('Continuous field mode only. The lock-in stores X/Y/Mag/Phase '
+                                                     'in its curve buffer at this interval; 0 reads point by point.')
+        fmr_setting_buffer_interval_label.setFont(self.font)
+        fmr_setting_buffer_interval_line_edit = QLineEdit('0')
+        fmr_setting_buffer_interval_line_edit.setFont(self.font)
+        fmr_setting_buffer_interval_layout.addWidget(fmr_setting_buffer_interval_label)
+        fmr_setting_buffer_interval_layout.addStretch(1)
+        fmr_setting_buffer_interval_layout.addWidget(fmr_setting_buffer_interval_line_edit)
+        fmr_setting_layout.addLayout(fmr_setting_buffer_interval_layout)
+
         return (fmr_setting_layout,
                 fmr_setting_average_line_edit,
-                fmr_setting_init_temp_rate_line_edit)
+                fmr_setting_init_temp_rate_line_edit,
+                fmr_setting_buffer_interval_line_edit)
 
     def validate_and_get_all_settings(self):
         """
@@ -9,7 +9,7 @@ import datetime
 import traceback
 import os
 import requests
-import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pyvisa as visa
 import matplotlib
@@ -52,8 +52,24 @@ try:
     from QuDAP.instrument.BK_precision_9129B import BK_9129_COMMAND
     from QuDAP.instrument.rigol_spectrum_analyzer import RIGOL_COMMAND
     from QuDAP.instrument.BNC845 import BNC_845M_COMMAND
-    from QuDAP.instrument.DSP7265 import TIME_CONSTANT_VALUES
+    from QuDAP.instrument.DSP7265 import TIME_CONSTANT_VALUES, SR7265_COMMAND
+    from QuDAP.instrument.keithley_2182 import KEITHLEY_2182_COMMAND
+    from QuDAP.instrument.keithley_6221 import KEITHLEY_6221_COMMAND
     from QuDAP.misc.logger import logger
+    from QuDAP.misc.run_data_writer import RunDataWriter
+    from QuDAP.misc.temperature_stability import TemperatureStabilityDetector
+    from QuDAP.misc.ppms_command_worker import PPMSCommandWorker
+    from QuDAP.misc.ppms_telemetry import PPMSTelemetry
+    from QuDAP.misc.ppms_client_registry import ppms_clients
+    from QuDAP.misc.run_journal import RunJournal, ETO_JOURNAL_NAME, ST_FMR_JOURNAL_NAME
+    from QuDAP.misc.measurement_plan import (compile_eto_plan, compile_st_fmr_plan, eto_field_step_rule,
+                                             eto_point_read_time, format_duration)
+    from QuDAP.instrument.ppms_simulator import SimulatedMultiVuClient, SimulatedMultiVuServer, simulator_speed
+    from QuDAP.misc.async_instruments import AsyncPPMS
+    from QuDAP.misc.multivu_watcher import is_multivu_running
+    from QuDAP.misc.scpi_session import SCPISession
+    from QuDAP.misc.io_trace import io_tracer, trace_resource
+    from QuDAP.misc.visa_registry import visa_registry
 except ImportError:
     # from QuDAP.GUI.Experiment.BNC845RF import COMMAND
     from GUI.Experiment.rigol_experiment import RIGOL_Measurement
@@ -62,8 +78,24 @@ except ImportError:
     from instrument.BK_precision_9129B import BK_9129_COMMAND
     from instrument.rigol_spectrum_analyzer import RIGOL_COMMAND
     from instrument.BNC845 import BNC_845M_COMMAND
-    from instrument.DSP7265 import TIME_CONSTANT_VALUES
+    from instrument.DSP7265 import TIME_CONSTANT_VALUES, SR7265_COMMAND
+    from instrument.keithley_2182 import KEITHLEY_2182_COMMAND
+    from instrument.keithley_6221 import KEITHLEY_6221_COMMAND
     from misc.logger import logger
+    from misc.run_data_writer import RunDataWriter
+    from misc.temperature_stability import TemperatureStabilityDetector
+    from misc.ppms_command_worker import PPMSCommandWorker
+    from misc.ppms_telemetry import PPMSTelemetry
+    from misc.ppms_client_registry import ppms_clients
+    from misc.run_journal import RunJournal, ETO_JOURNAL_NAME, ST_FMR_JOURNAL_NAME
+    from misc.measurement_plan import (compile_eto_plan, compile_st_fmr_plan, eto_field_step_rule,
+                                       eto_point_read_time, format_duration)
+    from instrument.ppms_simulator import SimulatedMultiVuClient, SimulatedMultiVuServer, simulator_speed
+    from misc.async_instruments import AsyncPPMS
+    from misc.multivu_watcher import is_multivu_running
+    from misc.scpi_session import SCPISession
+    from misc.io_trace import io_tracer, trace_resource
+    from misc.visa_registry import visa_registry
 
 class PyQtGraphPlotWidget(QWidget):
     """Widget containing PyQtGraph plot with controls"""
@@ -143,43 +175,6 @@ class ExitProtection:
         print(f"⚠ Prevented sys.exit({code}) - Application continues running")
         return  # Don't actually exit
 
-def is_multivu_running():
-    """
-    Check if MultiVu application is running
-    Returns True if detected, False otherwise
-    """
-    try:
-        if os.name == 'nt':  # Windows
-
-            result = subprocess.run(
-                ['tasklist'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            # print(result.stdout)
-            if 'MultiVu.exe' in result.stdout or 'Dynacool.exe' in result.stdout or 'Multivu.exe' in result.stdout or 'PpmsMvu.exe' in result.stdout:
-                is_running = True
-            else:
-                is_running = False
-
-            return is_running
-
-        else:  # Linux/Mac
-            result = subprocess.run(
-                ['pgrep', '-f', 'MultiVu'],
-                capture_output=True,
-                timeout=5
-            )
-            return result.returncode == 0
-
-    except subprocess.TimeoutExpired:
-        print("⚠ Timeout checking for MultiVu")
-        return False
-    except Exception as e:
-        print(f"⚠ Error checking for MultiVu: {e}")
-        return False
-
 def find_multivu_path():
     """
     Try to find MultiVu installation path
@@ -203,7 +198,7 @@ def find_multivu_path():
 
 class PPMSCommandExecutor:
     """
-    Executes PPMS commands in a separate thread with timeout protection
+    Executes PPMS commands on the client's persistent PPMS I/O worker with timeout protection
     """
 
     def __init__(self, client, notification_manager=None):
@@ -214,10 +209,9 @@ class PPMSCommandExecutor:
         """
         self.client = client
         self.notification_manager = notification_manager
-        self.result = None
-        self.error = None
+        self.worker = PPMSCommandWorker.for_client(client)
 
-    def execute_with_timeout(self, func, args=(), kwargs=None, timeout=30):
+    def execute_with_timeout(self, func, args=(), kwargs=None, timeout=30, coalesce_key=None):
         """
         Execute a function with timeout protection
 
@@ -226,33 +220,15 @@ class PPMSCommandExecutor:
             args: Positional arguments
             kwargs: Keyword arguments
             timeout: Timeout in seconds
+            coalesce_key: Reads with the same key share one execution when several are in flight
 
         Returns:
             Tuple (success: bool, result: any)
         """
-        if kwargs is None:
-            kwargs = {}
-
-        self.result = None
-        self.error = None
-
-        # Create thread
-        thread = threading.Thread(
-            target=self._run_function,
-            args=(func, args, kwargs)
-        )
-        thread.daemon = True
-
-        # Start thread
-        thread.start()
-
-        # Wait with timeout
-        thread.join(timeout=timeout)
-
-        # Check if still running
-        if thread.is_alive():
-            error_msg = f"Command timeout after {timeout} seconds"
-            print(f"⚠ {error_msg}")
+        try:
+            result = self.worker.execute(func, args, kwargs, timeout=timeout, coalesce_key=coalesce_key)
+        except TimeoutError as e:
+            print(f"⚠ {e}")
 
             if self.notification_manager:
                 self.notification_manager.send_message(
@@ -261,30 +237,19 @@ class PPMSCommandExecutor:
                 )
 
             return (False, None)
-
-        # Check for errors
-        if self.error:
-            print(f"⚠ Command error: {self.error}")
+        except BaseException as e:
+            error = f"SystemExit: {e}" if isinstance(e, SystemExit) else f"{type(e).__name__}: {e}"
+            print(f"⚠ Command error: {error}")
 
             if self.notification_manager:
                 self.notification_manager.send_message(
-                    f"PPMS command error: {self.error}",
+                    f"PPMS command error: {error}",
                     'critical'
                 )
 
             return (False, None)
 
-        return (True, self.result)
-
-    def _run_function(self, func, args, kwargs):
-        """Run function in thread (internal use)"""
-        try:
-            self.result = func(*args, **kwargs)
-        except SystemExit as e:
-            self.error = f"SystemExit: {e}"
-        except Exception as e:
-            # self.error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
-            self.error = f"{type(e).__name__}: {e}"
+        return (True, result)
 
 class ThreadSafePPMSCommands:
     """
@@ -295,13 +260,19 @@ class ThreadSafePPMSCommands:
         self.client = client
         self.notification_manager = notification_manager
         self.executor = PPMSCommandExecutor(client, notification_manager)
+        self.telemetry = PPMSTelemetry.for_client(client)
+
+    def as_async(self):
+        """Awaitable view of these commands for asyncio-based workers (see misc.async_instruments)"""
+        return AsyncPPMS(self)
 
-    def get_chamber_status(self, timeout=10):
+    def get_chamber_status(self, timeout=10, max_age=0):
         """
         Get chamber status with timeout protection
 
         Args:
             timeout: Timeout in seconds
+            max_age: Accept a cached status up to this age in seconds (0 always queries the PPMS)
 
         Returns:
             Tuple (success: bool, chamber_status: any)
@@ -327,10 +298,18 @@ class ThreadSafePPMSCommands:
                     )
                 raise
 
+        cached = self.telemetry.cached('chamber', max_age)
+        if cached is not None:
+            return True, cached
+
+        generation = self.telemetry.generation
         success, result = self.executor.execute_with_timeout(
             _get_chamber,
-            timeout=timeout
+            timeout=timeout,
+            coalesce_key='chamber'
         )
+        if success:
+            self.telemetry.store('chamber', result, generation)
 
         return success, result
 
@@ -377,10 +356,11 @@ class ThreadSafePPMSCommands:
             _set_temp,
             timeout=timeout
         )
+        self.telemetry.invalidate('temperature')
 
         return success
 
-    def set_field(self, set_point, field_rate, append_text_func=None, timeout=30):
+    def set_field(self, set_point, field_rate, append_text_func=None, timeout=30, approach_mode='linear'):
         """
         Set magnetic field with timeout protection
 
@@ -389,6 +369,7 @@ class ThreadSafePPMSCommands:
             field_rate: Field rate (Oe/s)
             append_text_func: Optional function to append text to GUI
             timeout: Timeout in seconds
+            approach_mode: MultiPyVu field approach mode ('linear', 'no_overshoot' or 'oscillate')
 
         Returns:
             bool: Success status
@@ -399,7 +380,7 @@ class ThreadSafePPMSCommands:
                 self.client.set_field(
                     set_point,
                     field_rate,
-                    self.client.field.approach_mode.linear,
+                    getattr(self.client.field.approach_mode, approach_mode),
                     self.client.field.driven_mode.driven
                 )
 
@@ -429,15 +410,17 @@ class ThreadSafePPMSCommands:
             _set_field,
             timeout=timeout
         )
+        self.telemetry.invalidate('field')
 
         return success
 
-    def read_temperature(self, timeout=10):
+    def read_temperature(self, timeout=10, max_age=0):
         """
         Read temperature with timeout protection
 
         Args:
             timeout: Timeout in seconds
+            max_age: Accept a cached reading up to this age in seconds (0 always queries the PPMS)
 
         Returns:
             Tuple (success: bool, temperature: float, status: str, unit: str)
@@ -465,22 +448,30 @@ class ThreadSafePPMSCommands:
                     )
                 raise
 
+        cached = self.telemetry.cached('temperature', max_age)
+        if cached is not None:
+            return (True,) + cached
+
+        generation = self.telemetry.generation
         success, result = self.executor.execute_with_timeout(
             _read_temp,
-            timeout=timeout
+            timeout=timeout,
+            coalesce_key='temperature'
         )
 
         if success and result:
+            self.telemetry.store('temperature', result, generation)
             return (True,) + result
         else:
             return (False, None, None, None)
 
-    def read_field(self, timeout=10):
+    def read_field(self, timeout=10, max_age=0):
         """
         Read magnetic field with timeout protection
 
         Args:
             timeout: Timeout in seconds
+            max_age: Accept a cached reading up to this age in seconds (0 always queries the PPMS)
 
         Returns:
             Tuple (success: bool, field: float, status: str, unit: str)
@@ -508,12 +499,19 @@ class ThreadSafePPMSCommands:
                     )
                 raise
 
+        cached = self.telemetry.cached('field', max_age)
+        if cached is not None:
+            return (True,) + cached
+
+        generation = self.telemetry.generation
         success, result = self.executor.execute_with_timeout(
             _read_field,
-            timeout=timeout
+            timeout=timeout,
+            coalesce_key='field'
         )
 
         if success and result:
+            self.telemetry.store('field', result, generation)
             return (True,) + result
         else:
             return (False, None, None, None)
@@ -855,7 +853,8 @@ class Worker(QThread):
                  zone3_step_field, zone1_top_field, zone2_top_field, zone3_top_field, zone1_field_rate, zone2_field_rate,
                  zone3_field_rate, Keithley_2182_Connected, Ketihley_6221_Connected, dsp7265_delay_config,
                  DSP7265_Connected, demo, keithley_6221_dc_config, keithley_6221_ac_config, ac_current_waveform, ac_current_freq,
-                 ac_current_offset, eto_number_of_avg, init_temp_rate, demag_field, record_zero_field):
+                 ac_current_offset, eto_number_of_avg, init_temp_rate, demag_field, record_zero_field, nv_burst_avg=False,
+                 keithley_6221_delta_mode=''):
         super().__init__()
         self.measurement_instance = measurement_instance
         self.running = True
@@ -905,6 +904,8 @@ class Worker(QThread):
         self.init_temp_rate = init_temp_rate
         self.demag_field = demag_field
         self.record_zero_field = record_zero_field
+        self.nv_burst_avg = nv_burst_avg
+        self.keithley_6221_delta_mode = keithley_6221_delta_mode
 
 
     def run(self):
@@ -961,7 +962,9 @@ class Worker(QThread):
                                               eto_number_of_avg=self.eto_number_of_avg,
                                               init_temp_rate=self.init_temp_rate,
                                               demag_field=self.demag_field,
-                                              record_zero_field=self.record_zero_field
+                                              record_zero_field=self.record_zero_field,
+                                              nv_burst_avg=self.nv_burst_avg,
+                                              keithley_6221_delta_mode=self.keithley_6221_delta_mode
                                               )
             self.running = False
             self.stop()
@@ -1215,8 +1218,10 @@ class Measurement(QMainWindow):
             self.nv_channel_1_enabled = None
             self.nv_channel_2_enabled = None
             self.nv_NPLC = None
+            self.nv_burst_avg = False
             self.keithley_6221_dc_config = False
             self.keithley_6221_ac_config = False
+            self.keithley_6221_delta_mode = ''
             self.ac_current_freq = None
             self.ac_current_offset = None
             self.ac_current_waveform = None
@@ -1969,7 +1974,7 @@ class Measurement(QMainWindow):
         fmr_status_reading_group_box.setLayout(fmr_measurement_status_layout)
         if self.FMR_ST_FMR:
             fmr_status_setting_group_box = QGroupBox('ST FMR Setting')
-            fmr_setting_layout, self.fmr_setting_average_line_edit, self.fmr_setting_init_temp_rate_line_edit = fmr_main_ui_class.st_fmr_setting_ui()
+            fmr_setting_layout, self.fmr_setting_average_line_edit, self.fmr_setting_init_temp_rate_line_edit, self.fmr_setting_buffer_interval_line_edit = fmr_main_ui_class.st_fmr_setting_ui()
             fmr_status_setting_group_box.setLayout(fmr_setting_layout)
         else:
             fmr_status_setting_group_box = QGroupBox('FMR Setting')
@@ -2089,7 +2094,7 @@ class Measurement(QMainWindow):
     #  Instrument Connection
     # ---------------------------------------------------------------------------------
     def start_server(self):
-        if not is_multivu_running():
+        if simulator_speed() is None and not is_multivu_running(force=True):
             reply = QMessageBox.question(
                 self,
                 "MultiVu Not Running",
@@ -2137,6 +2142,12 @@ class Measurement(QMainWindow):
                     self.server_btn.setText('Stop Server')
                     self.server_btn_clicked = True
                     self.connect_btn.setEnabled(True)
+                elif simulator_speed() is not None:
+                    self.server = SimulatedMultiVuServer()
+                    self.server.open()
+                    self.server_btn.setText('Stop Server')
+                    self.server_btn_clicked = True
+                    self.connect_btn.setEnabled(True)
                 else:
                     self.server = mpv.Server()
                     self.server.open()
@@ -2173,8 +2184,9 @@ class Measurement(QMainWindow):
         if self.connect_btn_clicked == False:
             try:
                 if not self.demo_mode:
-                    self.client = mpv.Client(host=self.host, port=int(self.port))
-                    self.client.open()
+                    # Shared with the PPMS page, so both use one command worker and telemetry cache
+                    factory = SimulatedMultiVuClient if simulator_speed() is not None else mpv.Client
+                    self.client = ppms_clients.open(self.host, self.port, factory)
                 else:
                     self.client = None
                 self.PPMS_measurement_setup_layout = QHBoxLayout()
@@ -2211,7 +2223,7 @@ class Measurement(QMainWindow):
         elif self.connect_btn_clicked == True:
             if self.client is not None:
                 if not self.demo_mode:
-                    self.client.close_client()
+                    ppms_clients.release(self.client)
                     self.client = None
             self.clear_layout(self.eto_ppms_layout)
             self.clear_layout(self.fmr_ppms_layout)
@@ -2222,7 +2234,8 @@ class Measurement(QMainWindow):
 
     def connect_devices(self):
         # self.rm = visa.ResourceManager('GUI/Experiment/visa_simulation.yaml@sim')
-        self.rm = visa.ResourceManager()
+        # Sessions are shared with the other pages through the process-wide registry
+        self.rm = visa_registry.resource_manager()
         self.current_connection_index = self.instruments_selection_combo_box.currentIndex()
         self.current_connection = self.connection_combo.currentText()
         if self.eto_radio_button.isChecked():
@@ -2424,8 +2437,7 @@ class Measurement(QMainWindow):
         except AttributeError:
             pass
         # rm = visa.ResourceManager('GUI/Experiment/visa_simulation.yaml@sim')
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.connection_ports = [instr for instr in instruments]
         self.Keithley_2182_Connected = False
         self.ketihley_6221_connected = False
@@ -2502,7 +2514,7 @@ class Measurement(QMainWindow):
         if self.Keithley_2182_Connected == False:
             try:
                 if not self.demo_mode:
-                    self.keithley_2182nv = self.rm.open_resource(self.current_connection)
+                    self.keithley_2182nv = SCPISession(trace_resource(visa_registry.open(self.current_connection)))
                     if "ASRL" in self.current_connection or "COM" in self.current_connection:
                         self.connect_rs232_instrument(self.keithley_2182nv)
                     self.keithley_2182nv.timeout=10000
@@ -2529,7 +2541,7 @@ class Measurement(QMainWindow):
         if self.ketihley_6221_connected == False:
             try:
                 if not self.demo_mode:
-                    self.keithley_6221 = self.rm.open_resource(self.current_connection)
+                    self.keithley_6221 = SCPISession(trace_resource(visa_registry.open(self.current_connection)))
                     if "ASRL" in self.current_connection or "COM" in self.current_connection:
                         self.connect_rs232_instrument(self.keithley_6221)
                     self.keithley_6221.timeout=10000
@@ -2558,7 +2570,8 @@ class Measurement(QMainWindow):
         if self.DSP7265_Connected == False:
             try:
                 if not self.demo_mode:
-                    self.DSP7265 = self.rm.open_resource(self.current_connection)
+                    # Not SCPI: AS/ASM/AQN/IMODE change other settings, so its writes are not deduplicated
+                    self.DSP7265 = trace_resource(visa_registry.open(self.current_connection))
                     if "ASRL" in self.current_connection or "COM" in self.current_connection:
                         self.connect_rs232_instrument(self.DSP7265)
                     self.DSP7265.timeout = 10000
@@ -2595,7 +2608,7 @@ class Measurement(QMainWindow):
     def connect_bnc_845_rf(self):
         if self.BNC845RF_CONNECTED == False:
             try:
-                self.bnc845rf = self.rm.open_resource(self.current_connection)
+                self.bnc845rf = trace_resource(visa_registry.open(self.current_connection))
                 if "ASRL" in self.current_connection or "COM" in self.current_connection:
                     self.connect_rs232_instrument(self.bnc845rf)
                 self.bnc845rf.timeout = 10000
@@ -2617,7 +2630,7 @@ class Measurement(QMainWindow):
     def connect_bk9129(self):
         if self.BK9129B_CONNECTED == False:
             try:
-                self.bk9129 = self.rm.open_resource(self.current_connection)
+                self.bk9129 = trace_resource(visa_registry.open(self.current_connection))
                 if "ASRL" in self.current_connection or "COM" in self.current_connection:
                     self.connect_rs232_instrument(self.bk9129)
                 self.bk9129.timeout = 10000
@@ -2637,7 +2650,7 @@ class Measurement(QMainWindow):
     def connect_rigol_dsa875(self):
         if self.RIGOLDSA875_CONNECTED == False:
             try:
-                self.rigol_dsa875 = self.rm.open_resource(self.current_connection)
+                self.rigol_dsa875 = trace_resource(visa_registry.open(self.current_connection))
                 if "ASRL" in self.current_connection or "COM" in self.current_connection:
                     self.connect_rs232_instrument(self.rigol_dsa875)
                 self.rigol_dsa875.timeout = 10000
@@ -2813,6 +2826,7 @@ class Measurement(QMainWindow):
         dialog = LogWindow()
         if dialog.exec():
             self._get_log_window_data(dialog)
+            resume_journal = self._check_run_journal(ST_FMR_JOURNAL_NAME)
             try:
                 self._prepare_measurement_ui()
                 log_file = f"{self.folder_path}/{self.file_name}_log.txt"
@@ -2849,6 +2863,9 @@ class Measurement(QMainWindow):
                     f.write(f"Initial Temperature Rate: {init_temp_rate}\n")
                     measurement_setting['init_temp_rate'] = init_temp_rate
                     measurement_setting['number_repetition'] = st_fmr_repetition_number
+                    lockin_buffer_interval = float(self.fmr_setting_buffer_interval_line_edit.text())
+                    f.write(f"Lock-in Buffer Interval (ms): {lockin_buffer_interval}\n")
+                    measurement_setting['lockin_buffer_interval'] = lockin_buffer_interval / 1000
 
                 if self.DSP7265_Connected:
                     dsp7265_delay_config = None
@@ -3118,7 +3135,24 @@ class Measurement(QMainWindow):
                 f.write(f"Experiment Field Range (Oe): {topField} to {botField}\n")
                 f.write(f"Experiment Temperature (K): {temp_field_dict['all_temps']}\n")
                 f.write(f"Experiment Temperature (K): {temp_field_dict['all_temps']}\n")
+
+                # Dry run: expand the schedule and show the estimated duration before starting
+                plan = compile_st_fmr_plan(self.temp_field_setting['temperature_setting']['temperature_list'],
+                                           bnc_845_settings['frequency_settings']['Final_list'],
+                                           bnc_845_settings['power_settings']['Final_list'],
+                                           measurement_setting.get('number_repetition', 1),
+                                           self.temp_field_setting['field_setting'],
+                                           self.temp_field_setting['temperature_setting']['temperature_rate'],
+                                           measurement_setting.get('init_temp_rate', temperature_rate),
+                                           settling_time=dsp7265_delay_config,
+                                           rf_connected=self.BNC845RF_CONNECTED,
+                                           journal=resume_journal)
+                if not self._confirm_measurement_plan(plan, f):
+                    f.close()
+                    self.stop_measurement()
+                    return
                 f.close()
+                self._start_run_journal(ST_FMR_JOURNAL_NAME, resume_journal)
                 NotificationManager().send_message(f"{self.user} is running {self.measurement} on {self.sample_id}")
                 self.fmr_worker = ST_FMR_Worker(
                     parent=self,
@@ -3771,6 +3805,13 @@ class Measurement(QMainWindow):
         self.keithley_2182_lsync_checkbox.setChecked(True)
         self.keithley_2182_lsync_layout.addWidget(self.keithley_2182_lsync_checkbox)
 
+        # Burst averaging collects the averages in the reading buffer
+        self.keithley_2182_burst_checkbox = QCheckBox('Burst Averaging')
+        self.keithley_2182_burst_checkbox.setFont(self.font)
+        self.keithley_2182_burst_checkbox.setToolTip("Take the number of averages in one instrument-timed burst\n"
+                                                     "and fetch them with a single buffer transfer (fixed field mode).")
+        self.keithley_2182_lsync_layout.addWidget(self.keithley_2182_burst_checkbox)
+
         # This section for line sync
         self.keithley_2182_filter_layout = QHBoxLayout()
         self.keithley_2182_digital_filter_radio = QRadioButton("Digital Filter")
@@ -3946,6 +3987,19 @@ class Measurement(QMainWindow):
         self.keithley_6221_DC_single_layout.addWidget(self.keithley_6221_DC_single_entry)
         self.keithley_6221_DC_single_layout.addWidget(self.keithley_6221_DC_single_combobox)
         self.keithley_6221_DC_range_single_layout.addLayout(self.keithley_6221_DC_single_layout)
+        self.keithley_6221_DC_delta_layout = QHBoxLayout()
+        self.keithley_6221_DC_delta_label = QLabel('Delta Mode:')
+        self.keithley_6221_DC_delta_label.setFont(self.font)
+        self.keithley_6221_DC_delta_label.setToolTip("Hardware current reversal with the 2182A on the Trigger Link\n"
+                                                     "(fixed field mode only). The number of averages sets the\n"
+                                                     "number of delta readings per field point.")
+        self.keithley_6221_DC_delta_combobox = QComboBox()
+        self.keithley_6221_DC_delta_combobox.setFont(self.font)
+        self.keithley_6221_DC_delta_combobox.setStyleSheet(self.QCombo_stylesheet)
+        self.keithley_6221_DC_delta_combobox.addItems(["Off", "Delta", "Pulse Delta"])
+        self.keithley_6221_DC_delta_layout.addWidget(self.keithley_6221_DC_delta_label)
+        self.keithley_6221_DC_delta_layout.addWidget(self.keithley_6221_DC_delta_combobox)
+        self.keithley_6221_DC_range_single_layout.addLayout(self.keithley_6221_DC_delta_layout)
         self.Keithey_curSour_layout.addLayout(self.keithley_6221_DC_range_single_layout)
         self.Keithey_curSour_layout.addWidget(self.keithley_6221_test_button_ui())
 
@@ -6017,6 +6071,73 @@ class Measurement(QMainWindow):
         except Exception as e:
             print(f"Error preparing UI: {str(e)}")
 
+    def _confirm_measurement_plan(self, plan, log_file):
+        """
+        Save the step table of a compiled plan and ask whether to start with the estimated duration
+
+        Args:
+            plan: MeasurementPlan of the measurement about to start
+            log_file: Open experiment log file, the estimate is appended to it
+
+        Returns:
+            True if the measurement should start
+        """
+        plan_file = f"{self.folder_path}{self.random_number}_Measurement_Plan.csv"
+        plan.write_csv(plan_file)
+        summary = plan.summary()
+        log_file.write(f"Measurement Plan: {plan_file}\n")
+        log_file.write(f"Estimated Duration: {format_duration(plan.total_duration)}\n")
+        self.append_text(summary + '\n', 'purple')
+        logger.info(summary)
+        reply = QMessageBox.question(
+            self, "Measurement Plan", f"{summary}\n\nStart the measurement?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes)
+        return reply == QMessageBox.StandardButton.Yes
+
+    def _check_run_journal(self, journal_name):
+        """
+        Offer to resume an unfinished run recorded in the run folder
+
+        Nothing is written here, so declining the measurement plan afterwards keeps the
+        journal; _start_run_journal applies the choice once the plan is accepted. On resume
+        the journal's file name prefix is reused so the new run appends to the existing CSV
+        files.
+
+        Args:
+            journal_name: Journal file name inside self.folder_path
+
+        Returns:
+            The RunJournal to resume (its completed points are left out of the plan), or None
+        """
+        journal = RunJournal(self.folder_path + journal_name)
+        if journal.file_name and journal.count and not journal.finished:
+            reply = QMessageBox.question(
+                self, "Resume Measurement",
+                f"An unfinished run ({journal.file_name}) with {journal.count} completed entries was found "
+                f"in this folder.\n\nResume from the next pending point?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.file_name = journal.file_name
+                return journal
+        return None
+
+    def _start_run_journal(self, journal_name, resume_journal):
+        """
+        Apply the resume choice of _check_run_journal after the plan was accepted
+
+        Without a journal to resume, the old journal is kept as a backup and a new one started.
+
+        Args:
+            journal_name: Journal file name inside self.folder_path
+            resume_journal: Journal returned by _check_run_journal
+        """
+        if resume_journal is not None:
+            logger.info(f"Resuming {resume_journal.file_name} from the run journal")
+            return
+        RunJournal(self.folder_path + journal_name).start(self.file_name)
+
     def _get_log_window_data(self, dialog):
         self.folder_path, self.file_name, self.formatted_date, self.sample_id, self.measurement, self.run, self.comment, self.user = dialog.get_text()
         self.folder_path = self.folder_path + f'Run_{self.run}/'
@@ -6076,6 +6197,7 @@ class Measurement(QMainWindow):
                 self.folder_path = self.folder_path + f'Run_{self.run}/'
                 os.makedirs(self.folder_path, exist_ok=True)
                 self.random_number = random.randint(100000, 999999)
+                resume_journal = self._check_run_journal(ETO_JOURNAL_NAME)
 
                 f = open(self.folder_path + f'{self.random_number}_Experiment_Log.txt', "a")
                 today = datetime.datetime.today()
@@ -6114,6 +6236,7 @@ class Measurement(QMainWindow):
                             self.stop_measurement()
                             return
                     self.append_text('Keithley 6221 connected!\n', 'green')
+                self.nv_burst_avg = False
                 if self.Keithley_2182_Connected:
                     self.append_text('Check Connection of Keithley 2182....\n', 'yellow')
                     if self.demo_mode:
@@ -6129,6 +6252,8 @@ class Measurement(QMainWindow):
                             f.write(f"Instrument: Keithley 2182nv enabled\n")
                             self.nv_NPLC = self.NPLC_entry.text()
                             f.write(f"\tNPLC (time constant): {self.nv_NPLC} \n")
+                            self.nv_burst_avg = self.keithley_2182_burst_checkbox.isChecked()
+                            f.write(f"\tBurst Averaging: {'Enabled' if self.nv_burst_avg else 'Disabled'} \n")
                             if self.keithley_2182_lsync_checkbox.isChecked():
                                 self.keithley_2182nv.write(":SYST:LSYNC ON")
                                 f.write(f"\tLine Synchronization: Enabled \n")
@@ -6357,6 +6482,11 @@ class Measurement(QMainWindow):
                 if self.keithley_6221_DC_radio.isChecked():
                     f.write(f"\tKeithley 6221 DC current: enabled\n")
                     self.keithley_6221_dc_config = True
+                    if self.keithley_6221_DC_delta_combobox.currentIndex() != 0:
+                        self.keithley_6221_delta_mode = self.keithley_6221_DC_delta_combobox.currentText()
+                        f.write(f"\tKeithley 6221 {self.keithley_6221_delta_mode} mode: enabled\n")
+                    else:
+                        self.keithley_6221_delta_mode = ''
                     if self.keithley_6221_DC_range_checkbox.isChecked():
                         init_current = float(self.keithley_6221_DC_range_init_entry.text())
                         final_current = float(self.keithley_6221_DC_range_final_entry.text())
@@ -6556,7 +6686,36 @@ class Measurement(QMainWindow):
                     f.write(f"Instrument: BNC845RF\n")
                 if self.DSP7265_Connected:
                     f.write(f"Instrument: DSP 7265 Lock-in\n")
+
+                # Dry run: expand the schedule and show the estimated duration before starting
+                if self.keithley_6221_delta_mode:
+                    nv_mode = 'delta'
+                elif self.nv_burst_avg:
+                    nv_mode = 'burst'
+                else:
+                    nv_mode = 'point'
+                nv_channels = int(bool(self.nv_channel_1_enabled)) + int(bool(self.nv_channel_2_enabled)) \
+                    if self.Keithley_2182_Connected else 0
+                step_rule = eto_field_step_rule(self.ppms_field_One_zone_radio_enabled,
+                                                self.ppms_field_Two_zone_radio_enabled,
+                                                self.ppms_field_Three_zone_radio_enabled,
+                                                (self.zone1_step_field, self.zone2_step_field, self.zone3_step_field),
+                                                (self.zone1_top_field, self.zone2_top_field, self.zone3_top_field),
+                                                (self.zone1_field_rate, self.zone2_field_rate, self.zone3_field_rate))
+                read_time = eto_point_read_time(nv_channels=nv_channels, nplc=float(self.nv_NPLC or 1),
+                                                number_of_avg=eto_number_of_avg, nv_mode=nv_mode,
+                                                lockin_delay=dsp7265_delay_config if self.DSP7265_Connected else None)
+                plan = compile_eto_plan(TempList, current_mag, topField, botField, step_rule, self.field_mode_fixed,
+                                        tempRate, init_temp_rate, demag_field, read_time,
+                                        record_zero_field=record_zero_field, number_of_avg=eto_number_of_avg,
+                                        lockin_connected=self.DSP7265_Connected,
+                                        journal=resume_journal, journal_currents=current)
+                if not self._confirm_measurement_plan(plan, f):
+                    f.close()
+                    self.stop_measurement()
+                    return
                 f.close()
+                self._start_run_journal(ETO_JOURNAL_NAME, resume_journal)
                 NotificationManager().send_message(f"{self.user} is running {self.measurement} on {self.sample_id}")
 
                 self.canvas.axes.cla()
@@ -6574,7 +6733,8 @@ class Measurement(QMainWindow):
                                      self.ketihley_6221_connected, dsp7265_delay_config, self.DSP7265_Connected, self.demo_mode,
                                      self.keithley_6221_dc_config, self.keithley_6221_ac_config, self.ac_current_waveform,
                                      self.ac_current_freq, self.ac_current_offset, eto_number_of_avg, init_temp_rate,
-                                     demag_field, record_zero_field)  # Create a worker instance
+                                     demag_field, record_zero_field, self.nv_burst_avg,
+                                     self.keithley_6221_delta_mode)  # Create a worker instance
                 self.worker.progress_update.connect(self.update_progress)
                 self.worker.append_text.connect(self.append_text)
                 self.worker.stop_measurment.connect(self.stop_measurement)
@@ -7517,11 +7677,135 @@ class Measurement(QMainWindow):
                 zone2_field_rate, zone3_field_rate, Keithley_2182_Connected,
                 Ketihley_6221_Connected, dsp7265_delay_config, DSP7265_Connected, running, demo, keithley_6221_dc_config,
                 keithley_6221_ac_config, ac_current_waveform, ac_current_freq, ac_current_offset,
-                eto_number_of_avg, init_temp_rate, demag_field, record_zero_field
+                eto_number_of_avg, init_temp_rate, demag_field, record_zero_field, nv_burst_avg=False,
+                keithley_6221_delta_mode=''
                 ):
+        data_writer = RunDataWriter()
+        # The I/O trace covers this run only
+        io_tracer.reset()
+        dsp7265_cmd = SR7265_COMMAND()
+        keithley_2182_cmd = KEITHLEY_2182_COMMAND()
+        keithley_6221_cmd = KEITHLEY_6221_COMMAND()
+        # Single worker so post-processing of the field points runs in order while the magnet ramps
+        post_processor = ThreadPoolExecutor(max_workers=1)
+        post_futures = []
+        # Completed points of this run folder, used to resume after a crash
+        journal = RunJournal(f"{folder_path}{ETO_JOURNAL_NAME}")
+        # Field points are journaled when the writer has flushed their rows, not fsync'ed one by one
+        data_writer.add_flush_callback(journal.commit_pending)
+        # Delta modes run the 2182A over the Trigger Link, so they only apply to fixed-field DC measurements
+        use_6221_delta = bool(keithley_6221_delta_mode) and keithley_6221_dc_config and field_mode_fixed \
+            and Keithley_2182_Connected and Ketihley_6221_Connected and not demo
+        nv_csv_header = ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
+                         "Channel 2 Resistance (Ohm)", "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"]
+        lockin_csv_header = ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)", "Voltage X (V)",
+                             "Voltage Y (V)", "Phase (deg)", "Temperature (K)", "Current (A)"]
         try:
             ppms = ThreadSafePPMSCommands(client, NotificationManager())
 
+            def nv_burst_collect(MyField):
+                """Burst-read the enabled 2182 channels and fill the per-field average buffers"""
+                readings = {}
+                for channel, enabled in ((1, nv_channel_1_enabled), (2, nv_channel_2_enabled)):
+                    if not enabled:
+                        continue
+                    mean, std, readings[channel] = keithley_2182_cmd.burst_average(keithley_2182nv, channel,
+                                                                                  eto_number_of_avg)
+                    append_text(f"Channel {channel} Voltage: {mean} V (std {std} V, "
+                                f"{len(readings[channel])} readings)\n", 'green')
+                nv_store_readings(MyField, readings)
+
+            def nv_delta_collect(MyField):
+                """Run one 6221 Delta / Pulse Delta test and fill the channel 1 average buffers"""
+                if keithley_6221_delta_mode == 'Pulse Delta':
+                    keithley_6221_cmd.configure_pulse_delta(keithley_6221, float(current[j]), count=eto_number_of_avg)
+                else:
+                    keithley_6221_cmd.configure_delta(keithley_6221, float(current[j]), count=eto_number_of_avg)
+                readings, timestamps = keithley_6221_cmd.run_armed_test(keithley_6221, eto_number_of_avg,
+                                                                        running=running)
+                append_text(f"{keithley_6221_delta_mode} Voltage: {np.mean(readings)} V (std {np.std(readings)} V, "
+                            f"{len(readings)} readings)\n", 'green')
+                nv_store_readings(MyField, {1: readings})
+
+            def nv_store_readings(MyField, readings):
+                """Add buffered readings {channel: array} to the plot/average arrays and the raw CSV"""
+                if 1 in readings:
+                    update_nv_channel_1_label(str(np.mean(readings[1])))
+                    self.channel1_array.extend(readings[1].tolist())
+                    self.channel1_field_array.extend([MyField] * len(readings[1]))
+                    self.channel1_avg_array_temp.extend(readings[1].tolist())
+                    self.channel1_field_avg_array_temp.extend([MyField] * len(readings[1]))
+                if 2 in readings:
+                    update_nv_channel_2_label(str(np.mean(readings[2])))
+                    self.channel2_array.extend(readings[2].tolist())
+                    self.channel2_field_array.extend([MyField] * len(readings[2]))
+                    self.channel2_avg_array_temp.extend(readings[2].tolist())
+                    self.channel2_field_avg_array_temp.extend([MyField] * len(readings[2]))
+
+                # Keep one raw row per reading, as the point-by-point loop does
+                chan_1 = readings.get(1, np.zeros(0))
+                chan_2 = readings.get(2, np.zeros(0))
+                for n in range(max(len(chan_1), len(chan_2))):
+                    Chan_1_voltage = float(chan_1[n]) if n < len(chan_1) else 0
+                    Chan_2_voltage = float(chan_2[n]) if n < len(chan_2) else 0
+                    data_writer.write_row(csv_filename, nv_csv_header,
+                                          [MyField, Chan_1_voltage / float(current[j]), Chan_1_voltage,
+                                           Chan_2_voltage / float(current[j]), Chan_2_voltage, MyTemp, current[j]])
+                append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+
+            def configure_nv_point():
+                """Send the per-point 2182 configuration and return the time it was sent"""
+                if Keithley_2182_Connected:
+                    keithley_2182nv.write("SENS:FUNC 'VOLT:DC'")
+                    keithley_2182nv.write(f"VOLT:DC:NPLC {nv_NPLC}")
+                return time.time()
+
+            def nv_average_point(MyField, MyTemp, current_value, csv_filename_avg, channel1, channel1_fields,
+                                 channel2, channel2_fields):
+                """Average one fixed-field point, write the averaged CSV row and update the plot"""
+                try:
+                    if channel1:
+                        channel1_avg_sig = sum(channel1) / len(channel1)
+                        self.channel1_avg_array.append(channel1_avg_sig)
+                        self.channel1_field_avg_array.append(sum(channel1_fields) / len(channel1_fields))
+                        resistance_chan_1_avg = channel1_avg_sig / float(current_value)
+                        update_plot(self.channel1_field_avg_array, self.channel1_avg_array, 'black', True, False)
+                    else:
+                        resistance_chan_1_avg = 0
+                        channel1_avg_sig = 0
+                    if channel2:
+                        channel2_avg_sig = sum(channel2) / len(channel2)
+                        self.channel2_avg_array.append(channel2_avg_sig)
+                        self.channel2_field_avg_array.append(sum(channel2_fields) / len(channel2_fields))
+                        resistance_chan_2_avg = channel2_avg_sig / float(current_value)
+                        update_plot(self.channel2_field_avg_array, self.channel2_avg_array, 'red', True, False)
+                    else:
+                        resistance_chan_2_avg = 0
+                        channel2_avg_sig = 0
+                    data_writer.write_row(csv_filename_avg, nv_csv_header,
+                                          [MyField, resistance_chan_1_avg, channel1_avg_sig, resistance_chan_2_avg,
+                                           channel2_avg_sig, MyTemp, current_value])
+                    append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                except Exception as e:
+                    logger.error(f'Post-processing failed for {MyField} Oe: {e}')
+                    append_text(f'Post-processing failed for {MyField} Oe: {e}\n', 'red')
+
+            def post_process(function, *args, **kwargs):
+                """Queue a post-processing job behind the ones already submitted"""
+                post_futures.append(post_processor.submit(function, *args, **kwargs))
+
+            def drain_post_processing():
+                """Wait until every queued post-processing job has finished"""
+                for future in post_futures:
+                    future.result()
+                post_futures.clear()
+
+            nv_collect = None
+            if use_6221_delta:
+                nv_collect = nv_delta_collect
+            elif nv_burst_avg and not demo:
+                nv_collect = nv_burst_collect
+
             def convert_to_seconds(time_str):
                 import re
                 # Allow optional space between number and unit
@@ -7542,28 +7826,12 @@ class Measurement(QMainWindow):
                 else:
                     raise ValueError(f"Unknown unit: {unit}")
 
-            def deltaH_chk(currentField):
-                if ppms_field_One_zone_radio_enabled:
-                    deltaH = zone1_step_field
-                    user_field_rate = zone1_field_rate
-                elif ppms_field_Two_zone_radio_enabled:
-                    if (currentField <= zone1_top_field + 1 or currentField >= -1 * zone1_top_field-1):
-                        deltaH = zone1_step_field
-                        user_field_rate = zone1_field_rate
-                    elif (currentField > -1 * zone2_top_field and currentField <= zone2_top_field):
-                        deltaH = zone2_step_field
-                        user_field_rate = zone2_field_rate
-                elif ppms_field_Three_zone_radio_enabled:
-                    if (currentField <= zone1_top_field+1 or currentField >= -1 * zone1_top_field-1):
-                        deltaH = zone1_step_field
-                        user_field_rate = zone1_field_rate
-                    elif (currentField < zone2_top_field and currentField >= -1 * zone2_top_field):
-                        deltaH = zone2_step_field
-                        user_field_rate = zone2_field_rate
-                    elif (currentField > -1 * zone3_top_field and currentField < zone3_top_field):
-                        deltaH = zone3_step_field
-                        user_field_rate = zone3_field_rate
-                return deltaH, user_field_rate
+            # Shared with the plan compiler so the dry-run estimate follows the same field schedule
+            deltaH_chk = eto_field_step_rule(ppms_field_One_zone_radio_enabled, ppms_field_Two_zone_radio_enabled,
+                                             ppms_field_Three_zone_radio_enabled,
+                                             (zone1_step_field, zone2_step_field, zone3_step_field),
+                                             (zone1_top_field, zone2_top_field, zone3_top_field),
+                                             (zone1_field_rate, zone2_field_rate, zone3_field_rate))
 
             def get_chamber_status():
                 try:
@@ -7594,12 +7862,13 @@ class Measurement(QMainWindow):
                     NotificationManager().send_message(
                         f"Your measurement went wrong, possible PPMS command error {e}", 'critical')
 
-            def set_field(set_point, field_rate):
+            def set_field(set_point, field_rate, approach_mode='linear'):
                 try:
                     success = ppms.set_field(
                         set_point=set_point,
                         field_rate=field_rate,
-                        timeout=10
+                        timeout=10,
+                        approach_mode=approach_mode
                     )
                     if not success:
                         stop_measurement()
@@ -7613,9 +7882,9 @@ class Measurement(QMainWindow):
                     NotificationManager().send_message(
                         f"Your measurement went wrong, possible PPMS command error {e}", 'critical')
 
-            def read_temperature():
+            def read_temperature(max_age=0):
                 try:
-                    success, temp, status, unit = ppms.read_temperature(timeout=10)
+                    success, temp, status, unit = ppms.read_temperature(timeout=10, max_age=max_age)
                     if not success:
                         stop_measurement()
                     # temperature, status = client.get_temperature()
@@ -7626,9 +7895,9 @@ class Measurement(QMainWindow):
                     NotificationManager().send_message(
                         f"Your measurement went wrong, possible PPMS command error {e}", 'critical')
 
-            def read_field():
+            def read_field(max_age=0):
                 try:
-                    success, field, status, unit = ppms.read_field(timeout=10)
+                    success, field, status, unit = ppms.read_field(timeout=10, max_age=max_age)
                     if not success:
                         stop_measurement()
                     # field, status = client.get_field()
@@ -7645,6 +7914,8 @@ class Measurement(QMainWindow):
             number_of_temp = len(TempList)
             fast_field_rate = 220
             zero_field = 0
+            # Readings that only refresh labels or the log may come from the shared telemetry cache
+            label_max_age = 2.0
             start_time = time.time()
             append_text('Measurement Start....\n', 'red')
             user_field_rate = zone1_field_rate
@@ -7657,11 +7928,11 @@ class Measurement(QMainWindow):
                 update_ppms_field_reading_label('0', 'Oe', 'stable')
             else:
                 # -------------Temp Status---------------------
-                temperature, status, temp_unit = read_temperature()
+                temperature, status, temp_unit = read_temperature(label_max_age)
                 append_text(f'Current temperature is {temperature} {temp_unit}\n', 'purple')
                 update_ppms_temp_reading_label(str(temperature), str(temp_unit), status)
                 # ------------Field Status----------------------
-                field, status, field_unit = read_field()
+                field, status, field_unit = read_field(label_max_age)
                 append_text(f'Current field is {field} {field_unit}\n', 'purple')
                 update_ppms_field_reading_label(str(field), field_unit, status)
 
@@ -7677,6 +7948,9 @@ class Measurement(QMainWindow):
                     stop_measurement()
                     return
                 for i in range(templen):
+                    if journal.all_done({'temperature': TempList[i], 'current': current[n]} for n in range(Curlen)):
+                        append_text(f'Skipping {TempList[i]} K: already completed in the run journal\n', 'orange')
+                        continue
                     set_field(zero_field, fast_field_rate)
 
                     time.sleep(10)
@@ -7699,7 +7973,7 @@ class Measurement(QMainWindow):
                     append_text(f'Waiting for {temp_set_point} K Temperature\n', 'red')
                     time.sleep(4)
 
-                    MyTemp, sT, temp_unit = read_temperature()
+                    MyTemp, sT, temp_unit = read_temperature(label_max_age)
                     update_ppms_temp_reading_label(str(MyTemp), str(temp_unit), sT)
                     while True:
                         if not running():
@@ -7711,15 +7985,27 @@ class Measurement(QMainWindow):
                         append_text(f'Temperature Status: {sT}\n', 'blue')
                         if sT == 'Stable':
                             break
-                    if i == 0:
-                        append_text(f'Stabilizing the Temperature....', 'orange')
-                        time.sleep(60)
-
+                    append_text(f'Stabilizing the Temperature....', 'orange')
+                    # The old fixed waits (60 s first, 300 s afterwards) are now the upper bound
+                    stability = TemperatureStabilityDetector(ppms, max_wait=60 if i == 0 else 300)
+                    settled, settle_time, settled_temp = stability.wait(
+                        running=running,
+                        on_reading=lambda T, status, unit: update_ppms_temp_reading_label(str(T), str(unit), status))
+                    if not running():
+                        stop_measurement()
+                        return
+                    if settled_temp is not None:
+                        MyTemp = settled_temp
+                    if settled:
+                        append_text(f'Temperature settled after {settle_time:.0f} s\n', 'green')
                     else:
-                        append_text(f'Stabilizing the Temperature.....', 'orange')
-                        time.sleep(300)
+                        append_text(f'Temperature not fully settled after {settle_time:.0f} s, continuing\n', 'orange')
 
                     for j in range(Curlen):
+                        if journal.is_done(temperature=TempList[i], current=current[j]):
+                            append_text(f'Skipping {TempList[i]} K, {current_mag[j]} {current_unit}: '
+                                        f'already completed in the run journal\n', 'orange')
+                            continue
                         NotificationManager().send_message(f"Starting measurement at temperature {str(TempList[i])} K, {current_mag[j]} {current_unit}")
                         clear_plot()
                         csv_filename = f"{folder_path}{file_name}_{TempList[i]}_K_{current_mag[j]}_{current_unit}_Run_{run}.csv"
@@ -7741,10 +8027,7 @@ class Measurement(QMainWindow):
                             append_text(f'Status: {sF}\n', 'red')
                             if sF == 'Holding (driven)':
                                 break
-                        client.set_field(zero_field,
-                                         fast_field_rate,
-                                         client.field.approach_mode.oscillate,  # linear/oscillate
-                                         client.field.driven_mode.driven)
+                        set_field(zero_field, fast_field_rate, 'oscillate')
                         append_text(f'Waiting for {zero_field} Oe Field for Demagnetization... \n', 'blue')
                         time.sleep(10)
                         while True:
@@ -7771,7 +8054,16 @@ class Measurement(QMainWindow):
 
                         if Ketihley_6221_Connected:
                             # keithley_6221.write('CLE')
-                            if keithley_6221_dc_config:
+                            if use_6221_delta:
+                                keithley_6221.write(":OUTP OFF")
+                                if not keithley_6221_cmd.nanovoltmeter_present(keithley_6221):
+                                    append_text('2182A not detected on the 6221 Trigger Link', 'red')
+                                    stop_measurement()
+                                    return
+                                append_text(f'{keithley_6221_delta_mode} current is set to: '
+                                            f'{str(current_mag[j])} {str(current_unit)}', 'blue')
+                                update_keithley_6221_update_label(current[j], "ON")
+                            elif keithley_6221_dc_config:
                                 keithley_6221.write(":OUTP OFF")  # Set source function to current
                                 keithley_6221.write("CURRent:RANGe:AUTO ON \n")
                                 keithley_6221.write(f'CURR {current[j]} \n')
@@ -7825,27 +8117,13 @@ class Measurement(QMainWindow):
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                     # Append the data to the CSV file
-                                    with open(csv_filename_zero_field, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
-                                                 "Channel 2 "
-                                                 "Resistance ("
-                                                 "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow([MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                                             Chan_2_voltage, MyTemp, current[j]])
-                                        append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                                    data_writer.write_row(csv_filename_zero_field, nv_csv_header,
+                                                          [MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, MyTemp, current[j]])
+                                    append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
                                 elif DSP7265_Connected:
                                     try:
                                         time.sleep(delay)
-                                        X = float(DSP7265.query("X."))  # Read the measurement result
-                                        Y = float(DSP7265.query("Y."))  # Read the measurement result
-                                        Mag = float(DSP7265.query("MAG."))  # Read the measurement result
-                                        Phase = float(DSP7265.query("PHA."))  # Read the measurement result
+                                        X, Y, Mag, Phase = dsp7265_cmd.read_outputs(DSP7265, ('X', 'Y', 'MAG', 'PHA'))
                                         update_lockin_label(str(X), str(Y), str(Mag), str(Phase))
 
                                     except Exception as e:
@@ -7853,19 +8131,9 @@ class Measurement(QMainWindow):
 
                                     resistance_chan_1 = X / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename_zero_field, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)",
-                                                 "Voltage X (V)", "Voltage Y (V)", "Phase (deg)",
-                                                 "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [MyField, resistance_chan_1, Mag, X, Y,
-                                             Phase, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {MyField} Oe at {MyTemp} K\n')
+                                    data_writer.write_row(csv_filename_zero_field, lockin_csv_header,
+                                                          [MyField, resistance_chan_1, Mag, X, Y, Phase, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {MyField} Oe at {MyTemp} K\n')
                                 k+=1
                                 time.sleep(0.2)
 
@@ -7895,17 +8163,28 @@ class Measurement(QMainWindow):
                             time.sleep(5)
 
                         if field_mode_fixed:
+                            next_field_issued = None
+                            field_issued_at = 0
                             while currentField >= botField:
                                 if not running():
                                     stop_measurement()
                                     return
+                                if journal.is_done(temperature=TempList[i], current=current[j], direction='down',
+                                                   field=currentField):
+                                    deltaH, user_field_rate = deltaH_chk(currentField)
+                                    currentField -= deltaH
+                                    number_of_field_update = number_of_field_update - 1
+                                    continue
                                 single_measurement_start = time.time()
                                 append_text(f'Loop is at {currentField} Oe Field Up \n', 'blue')
                                 field_set_point = currentField
                                 append_text(f'Set the field to {field_set_point} Oe and then collect data \n', 'blue')
-                                set_field(field_set_point, user_field_rate)
-
-                                time.sleep(4)
+                                if field_set_point != next_field_issued:
+                                    set_field(field_set_point, user_field_rate)
+                                    field_issued_at = time.time()
+                                nv_configured_at = configure_nv_point()
+                                # Give the magnet time to leave 'Holding' before polling the status
+                                time.sleep(max(0, 4 - (time.time() - field_issued_at)))
                                 while True:
                                     time.sleep(1)
                                     MyField, sF, field_unit = read_field()
@@ -7916,10 +8195,8 @@ class Measurement(QMainWindow):
 
                                 # ----------------------------- Measure NV voltage -------------------
                                 append_text(f'Saving data for {MyField} Oe \n', 'green')
-                                if Keithley_2182_Connected:
-                                    keithley_2182nv.write("SENS:FUNC 'VOLT:DC'")
-                                    keithley_2182nv.write(f"VOLT:DC:NPLC {nv_NPLC}")
-                                time.sleep(2)  # Wait for the configuration to complete
+                                # The 2182 was configured during the ramp, only wait out what is left of the 2 s
+                                time.sleep(max(0, 2 - (time.time() - nv_configured_at)))
                                 Chan_1_voltage = 0
                                 Chan_2_voltage = 0
                                 k = 0
@@ -7930,7 +8207,9 @@ class Measurement(QMainWindow):
                                 self.channel1_field_avg_array_temp = []
                                 self.channel2_field_avg_array_temp = []
                                 if Keithley_2182_Connected:
-                                    while k < eto_number_of_avg:
+                                    if nv_collect is not None:
+                                        nv_collect(MyField)
+                                    while nv_collect is None and k < eto_number_of_avg:
                                         try:
                                             if nv_channel_1_enabled:
                                                 keithley_2182nv.write("SENS:CHAN 1")
@@ -7963,68 +8242,19 @@ class Measurement(QMainWindow):
                                         resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                         # Append the data to the CSV file
-                                        with open(csv_filename, "a", newline="") as csvfile:
-                                            csv_writer = csv.writer(csvfile)
-
-                                            if csvfile.tell() == 0:  # Check if file is empty
-                                                csv_writer.writerow(
-                                                    ["Field (Oe)", "Channel 1 Resistance (Ohm)",
-                                                     "Channel 1 Voltage (V)", "Channel 2 "
-                                                                              "Resistance ("
-                                                                              "Ohm)",
-                                                     "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                            csv_writer.writerow(
-                                                [MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                                 Chan_2_voltage, MyTemp, current[j]])
-                                            append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                                        data_writer.write_row(csv_filename, nv_csv_header,
+                                                              [MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, MyTemp, current[j]])
+                                        append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
                                         k += 1
                                         time.sleep(0.2)
-                                    if self.channel1_avg_array_temp:
-                                        channel1_avg_sig = sum(self.channel1_avg_array_temp) / len(self.channel1_avg_array_temp)
-                                        channel1_field_avg_sig = sum(self.channel1_field_avg_array_temp) / len(
-                                            self.channel1_field_avg_array_temp)
-                                        self.channel1_avg_array.append(channel1_avg_sig)
-                                        self.channel1_field_avg_array.append(channel1_field_avg_sig)
-                                        resistance_chan_1_avg = channel1_avg_sig / float(current[j])
-                                        update_plot(self.channel1_field_avg_array, self.channel1_avg_array, 'black', True, False)
-                                    else:
-                                        resistance_chan_1_avg = 0
-                                        channel1_avg_sig = 0
-                                    if self.channel2_avg_array_temp:
-                                        channel2_avg_sig = sum(self.channel2_avg_array_temp) / len(self.channel2_avg_array_temp)
-                                        channel2_field_avg_sig = sum(self.channel2_field_avg_array_temp) / len(
-                                            self.channel2_field_avg_array_temp)
-                                        self.channel2_avg_array.append(channel2_avg_sig)
-                                        self.channel2_field_avg_array.append(channel2_field_avg_sig)
-                                        resistance_chan_2_avg = channel2_avg_sig / float(current[j])
-                                        update_plot(self.channel2_field_avg_array, self.channel2_avg_array, 'red', True, False)
-                                        # Append the data to the CSV file
-                                    else:
-                                        resistance_chan_2_avg = 0
-                                        channel2_avg_sig = 0
-                                    with open(csv_filename_avg, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)",
-                                                 "Channel 1 Voltage (V)", "Channel 2 "
-                                                                          "Resistance ("
-                                                                          "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [MyField, resistance_chan_1_avg, channel1_avg_sig, resistance_chan_2_avg,
-                                             channel2_avg_sig, MyTemp, current[j]])
-                                        append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                                    # Averaging, the averaged CSV row and the plot run on the post-processing thread
+                                    post_process(nv_average_point, MyField, MyTemp, current[j], csv_filename_avg,
+                                                 self.channel1_avg_array_temp, self.channel1_field_avg_array_temp,
+                                                 self.channel2_avg_array_temp, self.channel2_field_avg_array_temp)
                                 elif DSP7265_Connected:
                                     try:
                                         time.sleep(delay)
-                                        X = float(DSP7265.query("X."))  # Read the measurement result
-                                        Y = float(DSP7265.query("Y."))  # Read the measurement result
-                                        Mag = float(DSP7265.query("MAG."))  # Read the measurement result
-                                        Phase = float(DSP7265.query("PHA."))  # Read the measurement result
+                                        X, Y, Mag, Phase = dsp7265_cmd.read_outputs(DSP7265, ('X', 'Y', 'MAG', 'PHA'))
                                         update_lockin_label(str(X), str(Y), str(Mag), str(Phase))
                                         self.lockin_x.append(X)
                                         # self.lockin_y.append(Y)
@@ -8039,19 +8269,16 @@ class Measurement(QMainWindow):
 
                                     resistance_chan_1 = Mag / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)",
-                                                 "Voltage X (V)", "Voltage Y (V)", "Phase (deg)",
-                                                                                   "Temperature (K)", "Current (A)"])
+                                    data_writer.write_row(csv_filename, lockin_csv_header,
+                                                          [currentField, resistance_chan_1, Mag, X, Y, Phase, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
 
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Mag, X, Y,
-                                             Phase, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+                                # Start ramping to the next set point while this point is post-processed
+                                next_deltaH, next_field_rate = deltaH_chk(currentField)
+                                if currentField - next_deltaH >= botField:
+                                    next_field_issued = currentField - next_deltaH
+                                    set_field(next_field_issued, next_field_rate)
+                                    field_issued_at = time.time()
 
                                 MyField, sF, field_unit = read_field()
                                 update_ppms_field_reading_label(str(MyField), field_unit, sF)
@@ -8064,6 +8291,9 @@ class Measurement(QMainWindow):
                                 # Update currentField for the next iteration
                                 currentField -= deltaH
                                 self.pts += 1  # Number of self.pts count
+                                # Queued behind the point's averaging, so its rows are written before it is pending
+                                post_process(journal.mark_pending, temperature=TempList[i], current=current[j],
+                                             direction='down', field=field_set_point)
                                 single_measurement_end = time.time()
                                 Single_loop = single_measurement_end - single_measurement_start
                                 number_of_field_update = number_of_field_update - 1
@@ -8092,24 +8322,36 @@ class Measurement(QMainWindow):
                                 update_measurement_progress(total_time_in_days, total_time_in_hours,
                                                             totoal_time_in_minutes, current_progress * 100)
 
+                            drain_post_processing()
+                            data_writer.sync()  # Down sweep finished, push it to disk
                             # ----------------- Loop Up ----------------------#
                             currentField = botField
                             deltaH, user_field_rate = deltaH_chk(currentField)
                             NotificationManager().send_message(f"Starting the second half of measurement - ramping field up")
                             current_progress = int((i + 1) * (j + 1) / totoal_progress * 100) / 2
                             progress_update(int(current_progress))
+                            next_field_issued = None
                             while currentField <= topField:
                                 if not running():
                                     stop_measurement()
                                     return
+                                if journal.is_done(temperature=TempList[i], current=current[j], direction='up',
+                                                   field=currentField):
+                                    deltaH, user_field_rate = deltaH_chk(currentField)
+                                    currentField += deltaH
+                                    number_of_field_update = number_of_field_update - 1
+                                    continue
                                 single_measurement_start = time.time()
                                 append_text(f'\n Loop is at {currentField} Oe Field Up \n', 'blue')
                                 field_set_point = currentField
 
                                 append_text(f'Set the field to {field_set_point} Oe and then collect data \n', 'greem')
-                                set_field(field_set_point, user_field_rate)
-
-                                time.sleep(4)
+                                if field_set_point != next_field_issued:
+                                    set_field(field_set_point, user_field_rate)
+                                    field_issued_at = time.time()
+                                nv_configured_at = configure_nv_point()
+                                # Give the magnet time to leave 'Holding' before polling the status
+                                time.sleep(max(0, 4 - (time.time() - field_issued_at)))
                                 while True:
                                     time.sleep(1)
 
@@ -8123,10 +8365,8 @@ class Measurement(QMainWindow):
                                 append_text(f'Saving data for {MyField} Oe \n', 'green')
                                 Chan_1_voltage = 0
                                 Chan_2_voltage = 0
-                                if Keithley_2182_Connected:
-                                    keithley_2182nv.write("SENS:FUNC 'VOLT:DC'")
-                                    keithley_2182nv.write(f"VOLT:DC:NPLC {nv_NPLC}")
-                                time.sleep(2)  # Wait for the configuration to complete
+                                # The 2182 was configured during the ramp, only wait out what is left of the 2 s
+                                time.sleep(max(0, 2 - (time.time() - nv_configured_at)))
                                 MyField, sF, field_unit = read_field()
                                 update_ppms_field_reading_label(str(MyField), field_unit, sF)
                                 k = 0
@@ -8135,7 +8375,9 @@ class Measurement(QMainWindow):
                                 self.channel1_field_avg_array_temp = []
                                 self.channel2_field_avg_array_temp = []
                                 if Keithley_2182_Connected:
-                                    while k < eto_number_of_avg:
+                                    if nv_collect is not None:
+                                        nv_collect(MyField)
+                                    while nv_collect is None and k < eto_number_of_avg:
                                         try:
                                             if nv_channel_1_enabled:
                                                 keithley_2182nv.write("SENS:CHAN 1")
@@ -8168,73 +8410,19 @@ class Measurement(QMainWindow):
                                         resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                         # Append the data to the CSV file
-                                        with open(csv_filename, "a", newline="") as csvfile:
-                                            csv_writer = csv.writer(csvfile)
-
-                                            if csvfile.tell() == 0:  # Check if file is empty
-                                                csv_writer.writerow(
-                                                    ["Field (Oe)", "Channel 1 Resistance (Ohm)",
-                                                     "Channel 1 Voltage (V)", "Channel 2 "
-                                                                              "Resistance ("
-                                                                              "Ohm)",
-                                                     "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                            csv_writer.writerow(
-                                                [MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                                 Chan_2_voltage, MyTemp, current[j]])
-                                            append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                                        data_writer.write_row(csv_filename, nv_csv_header,
+                                                              [MyField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, MyTemp, current[j]])
+                                        append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
                                         k += 1
                                         time.sleep(0.2)
-                                    if self.channel1_avg_array_temp:
-                                        channel1_avg_sig = sum(self.channel1_avg_array_temp) / len(
-                                            self.channel1_avg_array_temp)
-                                        channel1_field_avg_sig = sum(self.channel1_field_avg_array_temp) / len(
-                                            self.channel1_field_avg_array_temp)
-                                        self.channel1_avg_array.append(channel1_avg_sig)
-                                        self.channel1_field_avg_array.append(channel1_field_avg_sig)
-                                        resistance_chan_1_avg = channel1_avg_sig / float(current[j])
-                                        update_plot(self.channel1_field_avg_array, self.channel1_avg_array, 'black',
-                                                    True, False)
-
-                                    else:
-                                        resistance_chan_1_avg = 0
-                                        channel1_avg_sig = 0
-                                    if self.channel2_avg_array_temp:
-                                        channel2_avg_sig = sum(self.channel2_avg_array_temp) / len(
-                                            self.channel2_avg_array_temp)
-                                        channel2_field_avg_sig = sum(self.channel2_field_avg_array_temp) / len(
-                                            self.channel2_field_avg_array_temp)
-                                        self.channel2_avg_array.append(channel2_avg_sig)
-                                        self.channel2_field_avg_array.append(channel2_field_avg_sig)
-                                        resistance_chan_2_avg = channel2_avg_sig / float(current[j])
-                                        update_plot(self.channel2_field_avg_array, self.channel2_avg_array, 'red', True,
-                                                    False)
-                                        # Append the data to the CSV file
-                                    else:
-                                        resistance_chan_2_avg = 0
-                                        channel2_avg_sig = 0
-                                    with open(csv_filename_avg, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)",
-                                                 "Channel 1 Voltage (V)", "Channel 2 "
-                                                                          "Resistance ("
-                                                                          "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [MyField, resistance_chan_1_avg, channel1_avg_sig, resistance_chan_2_avg,
-                                             channel2_avg_sig, MyTemp, current[j]])
-                                        append_text(f'Data Saved for {MyField} Oe at {MyTemp} K', 'green')
+                                    # Averaging, the averaged CSV row and the plot run on the post-processing thread
+                                    post_process(nv_average_point, MyField, MyTemp, current[j], csv_filename_avg,
+                                                 self.channel1_avg_array_temp, self.channel1_field_avg_array_temp,
+                                                 self.channel2_avg_array_temp, self.channel2_field_avg_array_temp)
                                 elif DSP7265_Connected:
                                     try:
                                         time.sleep(delay)
-                                        X = float(DSP7265.query("X."))  # Read the measurement result
-                                        Y = float(DSP7265.query("Y."))  # Read the measurement result
-                                        Mag = float(DSP7265.query("MAG."))  # Read the measurement result
-                                        Phase = float(DSP7265.query("PHA."))  # Read the measurement result
+                                        X, Y, Mag, Phase = dsp7265_cmd.read_outputs(DSP7265, ('X', 'Y', 'MAG', 'PHA'))
                                         update_lockin_label(str(X), str(Y), str(Mag), str(Phase))
                                         self.lockin_x.append(X)
                                         # self.lockin_y.append(Y)
@@ -8250,19 +8438,16 @@ class Measurement(QMainWindow):
 
                                     resistance_chan_1 = Mag / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)",
-                                                 "Voltage X (V)", "Voltage Y (V)", "Phase (deg)",
-                                                                                   "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Mag, X, Y,
-                                             Phase, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+                                    data_writer.write_row(csv_filename, lockin_csv_header,
+                                                          [currentField, resistance_chan_1, Mag, X, Y, Phase, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+
+                                # Start ramping to the next set point while this point is post-processed
+                                next_deltaH, next_field_rate = deltaH_chk(currentField)
+                                if currentField + next_deltaH <= topField:
+                                    next_field_issued = currentField + next_deltaH
+                                    set_field(next_field_issued, next_field_rate)
+                                    field_issued_at = time.time()
                                 # ----------------------------- Measure NV voltage -------------------
                                 deltaH, user_field_rate = deltaH_chk(currentField)
 
@@ -8270,6 +8455,9 @@ class Measurement(QMainWindow):
                                 # Update currentField for the next iteration
                                 currentField += deltaH
                                 self.pts += 1  # Number of self.pts count
+                                # Queued behind the point's averaging, so its rows are written before it is pending
+                                post_process(journal.mark_pending, temperature=TempList[i], current=current[j],
+                                             direction='up', field=field_set_point)
                                 single_measurement_end = time.time()
                                 Single_loop = single_measurement_end - single_measurement_start
                                 number_of_field_update = number_of_field_update - 1
@@ -8369,26 +8557,13 @@ class Measurement(QMainWindow):
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)", "Channel 2 "
-                                                                                                                      "Resistance ("
-                                                                                                                      "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow([currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                                             Chan_2_voltage, MyTemp, current[j]])
-                                        append_text(f'Data Saved for {currentField} Oe at {MyTemp} K', 'green')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, MyTemp, current[j]])
+                                    append_text(f'Data Saved for {currentField} Oe at {MyTemp} K', 'green')
                                 elif DSP7265_Connected:
                                     try:
                                         time.sleep(delay)
-                                        X = float(DSP7265.query("X."))  # Read the measurement result
-                                        Y = float(DSP7265.query("Y."))  # Read the measurement result
-                                        Mag = float(DSP7265.query("MAG."))  # Read the measurement result
-                                        Phase = float(DSP7265.query("PHA."))  # Read the measurement result
+                                        X, Y, Mag, Phase = dsp7265_cmd.read_outputs(DSP7265, ('X', 'Y', 'MAG', 'PHA'))
                                         update_lockin_label(str(X), str(Y), str(Mag), str(Phase))
                                         self.lockin_x.append(X)
                                         # self.lockin_y.append(Y)
@@ -8404,19 +8579,9 @@ class Measurement(QMainWindow):
 
                                     resistance_chan_1 = Mag / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)",
-                                                 "Voltage X (V)", "Voltage Y (V)", "Phase (deg)",
-                                                                                   "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Mag, X, Y,
-                                             Phase, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+                                    data_writer.write_row(csv_filename, lockin_csv_header,
+                                                          [currentField, resistance_chan_1, Mag, X, Y, Phase, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
                                 # ----------------------------- Measure NV voltage -------------------
                                 deltaH, user_field_rate = deltaH_chk(currentField)
 
@@ -8454,6 +8619,7 @@ class Measurement(QMainWindow):
                                 update_measurement_progress(total_time_in_days, total_time_in_hours,
                                                             totoal_time_in_minutes, current_progress * 100)
 
+                            data_writer.sync()  # Down sweep finished, push it to disk
                             # ----------------- Loop Up ----------------------#
                             NotificationManager().send_message(f"Starting the second half of measurement - ramping field up")
                             currentField = botField
@@ -8522,26 +8688,13 @@ class Measurement(QMainWindow):
                                     resistance_chan_1 = Chan_1_voltage / float(current[j])
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)", "Channel 2 "
-                                                                                                                      "Resistance ("
-                                                                                                                      "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow([currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                                             Chan_2_voltage, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
                                 elif DSP7265_Connected:
                                     try:
                                         time.sleep(delay)
-                                        X = float(DSP7265.query("X."))  # Read the measurement result
-                                        Y = float(DSP7265.query("Y."))  # Read the measurement result
-                                        Mag = float(DSP7265.query("MAG."))  # Read the measurement result
-                                        Phase = float(DSP7265.query("PHA."))  # Read the measurement result
+                                        X, Y, Mag, Phase = dsp7265_cmd.read_outputs(DSP7265, ('X', 'Y', 'MAG', 'PHA'))
                                         update_lockin_label(str(X), str(Y), str(Mag), str(Phase))
                                         self.lockin_x.append(X)
                                         # self.lockin_y.append(Y)
@@ -8557,19 +8710,9 @@ class Measurement(QMainWindow):
 
                                     resistance_chan_1 = Mag / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Resistance (Ohm)", "Voltage Mag (V)",
-                                                 "Voltage X (V)","Voltage Y (V)", "Phase (deg)",
-                                                 "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Mag, X, Y,
-                                             Phase, MyTemp, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
+                                    data_writer.write_row(csv_filename, lockin_csv_header,
+                                                          [currentField, resistance_chan_1, Mag, X, Y, Phase, MyTemp, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {MyTemp} K\n')
 
                                 # ----------------------------- Measure NV voltage -------------------
                                 deltaH, user_field_rate = deltaH_chk(currentField)
@@ -8604,6 +8747,8 @@ class Measurement(QMainWindow):
                                 progress_update(int(current_progress * 100))
                                 update_measurement_progress(total_time_in_days, total_time_in_hours,
                                                             totoal_time_in_minutes, current_progress * 100)
+                        # The averaged points are appended by the post-processing thread, let it finish first
+                        drain_post_processing()
                         if Keithley_2182_Connected:
                             if field_mode_fixed:
                                 if nv_channel_1_enabled:
@@ -8622,23 +8767,24 @@ class Measurement(QMainWindow):
                             # update_plot(self.field_array, self.lockin_pahse, 'red', False, True)
 
                         # NotificationManager().send_message()
+                        data_writer.close_all()  # Sweep finished, release the output files
+                        journal.mark_done(temperature=TempList[i], current=current[j])
                         current_progress = int((i+1) * (j+1) / totoal_progress * 100)
                         progress_update(int(current_progress))
                 time.sleep(2)
-                client.set_field(zero_field,
-                                 fast_field_rate,
-                                 client.field.approach_mode.oscillate,  # linear/oscillate
-                                 client.field.driven_mode.driven)
+                set_field(zero_field, fast_field_rate, 'oscillate')
                 append_text('Waiting for Zero Field', 'red')
                 time.sleep(2)
-                temperature, status, temp_unit = read_temperature()
+                temperature, status, temp_unit = read_temperature(label_max_age)
                 append_text(f'Finished Temperature = {temperature} {temp_unit}', 'green')
                 update_ppms_temp_reading_label(str(temperature), str(temp_unit), status)
                 time.sleep(2)
-                field, status, field_unit = read_field()
+                field, status, field_unit = read_field(label_max_age)
                 append_text(f'Finisehd Field = {field} {field_unit}\n', 'red')
                 update_ppms_field_reading_label(str(field), field_unit, status)
                 if Ketihley_6221_Connected:
+                    if use_6221_delta:
+                        keithley_6221_cmd.abort_sweep(keithley_6221)
                     if keithley_6221_dc_config:
                         keithley_6221.write(":SOR:CURR:LEV 0")  # Set current level to zero
                         keithley_6221.write(":OUTP OFF")  # Turn off the output
@@ -8659,6 +8805,7 @@ class Measurement(QMainWindow):
                 self.log_box.append(f'Total data points: {str(self.pts)} pts\n')
                 NotificationManager().send_message("The measurement has been completed successfully.")
                 progress_update(int(100))
+                journal.finish()
                 append_text("You measurement is finished!", 'green')
                 # stop_measurement()
                 measurement_finished()
@@ -8766,21 +8913,9 @@ class Measurement(QMainWindow):
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
-                                                 "Channel 2 "
-                                                 "Resistance ("
-                                                 "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                             Chan_2_voltage, temp_set_point, current[j]])
-                                        append_text(f'Data Saved for {currentField} Oe at {temp_set_point} K', 'green')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, temp_set_point, current[j]])
+                                    append_text(f'Data Saved for {currentField} Oe at {temp_set_point} K', 'green')
 
 
 
@@ -8824,6 +8959,7 @@ class Measurement(QMainWindow):
                                 update_measurement_progress(total_time_in_days, total_time_in_hours,
                                                             totoal_time_in_minutes, current_progress * 100)
 
+                            data_writer.sync()  # Down sweep finished, push it to disk
                             # ----------------- Loop Up ----------------------#
                             currentField = botField
                             deltaH, user_field_rate = deltaH_chk(currentField)
@@ -8875,21 +9011,9 @@ class Measurement(QMainWindow):
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
-                                                 "Channel 2 "
-                                                 "Resistance ("
-                                                 "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                             Chan_2_voltage, temp_set_point, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {temp_set_point} K\n')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, temp_set_point, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {temp_set_point} K\n')
 
                                 # ----------------------------- Measure NV voltage -------------------
                                 deltaH, user_field_rate = deltaH_chk(currentField)
@@ -8977,21 +9101,9 @@ class Measurement(QMainWindow):
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
 
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
-                                                 "Channel 2 "
-                                                 "Resistance ("
-                                                 "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                             Chan_2_voltage, temp_set_point, current[j]])
-                                        append_text(f'Data Saved for {currentField} Oe at {temp_set_point} K', 'green')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, temp_set_point, current[j]])
+                                    append_text(f'Data Saved for {currentField} Oe at {temp_set_point} K', 'green')
 
                                 # ----------------------------- Measure NV voltage -------------------
                                 deltaH, user_field_rate = deltaH_chk(currentField)
@@ -9033,6 +9145,7 @@ class Measurement(QMainWindow):
                                 update_measurement_progress(total_time_in_days, total_time_in_hours,
                                                             totoal_time_in_minutes, current_progress * 100)
 
+                            data_writer.sync()  # Down sweep finished, push it to disk
                             # ----------------- Loop Up ----------------------#
 
                             currentField = botField
@@ -9085,21 +9198,9 @@ class Measurement(QMainWindow):
                                     resistance_chan_1 = Chan_1_voltage / float(current[j])
                                     resistance_chan_2 = Chan_2_voltage / float(current[j])
                                     # Append the data to the CSV file
-                                    with open(csv_filename, "a", newline="") as csvfile:
-                                        csv_writer = csv.writer(csvfile)
-
-                                        if csvfile.tell() == 0:  # Check if file is empty
-                                            csv_writer.writerow(
-                                                ["Field (Oe)", "Channel 1 Resistance (Ohm)", "Channel 1 Voltage (V)",
-                                                 "Channel 2 "
-                                                 "Resistance ("
-                                                 "Ohm)",
-                                                 "Channel 2 Voltage (V)", "Temperature (K)", "Current (A)"])
-
-                                        csv_writer.writerow(
-                                            [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2,
-                                             Chan_2_voltage, temp_set_point, current[j]])
-                                        self.log_box.append(f'Data Saved for {currentField} Oe at {temp_set_point} K\n')
+                                    data_writer.write_row(csv_filename, nv_csv_header,
+                                                          [currentField, resistance_chan_1, Chan_1_voltage, resistance_chan_2, Chan_2_voltage, temp_set_point, current[j]])
+                                    self.log_box.append(f'Data Saved for {currentField} Oe at {temp_set_point} K\n')
 
 
                                 # ----------------------------- Measure NV voltage -------------------
@@ -9144,6 +9245,7 @@ class Measurement(QMainWindow):
                                 save_plot(self.field_array, self.channel2_array, 'red', False, True, True,
                                           str(TempList[i]), str(current[j]))
 
+                        data_writer.close_all()  # Sweep finished, release the output files
                         current_progress = int((i + 1) * (j + 1) / totoal_progress * 100)
                         progress_update(int(current_progress))
 
@@ -9152,6 +9254,16 @@ class Measurement(QMainWindow):
                 "Your measurement went wrong, possible PPMS client lost connection", 'critical')
             error_message(e,e)
             stop_measurement()
+        finally:
+            post_processor.shutdown(wait=True)
+            data_writer.close_all()
+            # Dumped for finished, stopped and failed runs alike
+            if io_tracer.enabled:
+                try:
+                    io_tracer.dump(f"{folder_path}{file_name}_io_trace.json")
+                    logger.info(io_tracer.summary())
+                except Exception as e:
+                    logger.warning(f'Could not write the I/O trace: {e}')
 
 
 
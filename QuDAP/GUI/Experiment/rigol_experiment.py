@@ -23,11 +23,11 @@ from pyqtgraph.exporters import ImageExporter
 try:
     # from GUI.Experiment.BNC845RF import COMMAND
     from QuDAP.instrument.BK_precision_9129B import BK_9129_COMMAND
-    from QuDAP.instrument.rigol_spectrum_analyzer import RIGOL_COMMAND
+    from QuDAP.instrument.rigol_spectrum_analyzer import RIGOL_COMMAND, RigolCaptureEngine
 
 except ImportError:
     # from QuDAP.GUI.Experiment.BNC845RF import COMMAND
-    from instrument.rigol_spectrum_analyzer import RIGOL_COMMAND
+    from instrument.rigol_spectrum_analyzer import RIGOL_COMMAND, RigolCaptureEngine
     from instrument.BK_precision_9129B import BK_9129_COMMAND
     # from GUI.Experiment.rigol_experiment import RIGOL_Measurement
 
@@ -61,8 +61,8 @@ class BK9205_RIGOL_Worker(QThread):
     save_individual_plot = pyqtSignal(str)
 
     # Plotting signals
-    update_2d_plot = pyqtSignal(list, list, list)  # x_data (indices), y_data (voltages), z_data (peak powers)
-    update_spectrum_plot = pyqtSignal(list, list)  # freq_data, power_data
+    update_2d_plot = pyqtSignal(object, list, list)  # x_data (frequency array), y_data (voltages), z_data (spectra)
+    update_spectrum_plot = pyqtSignal(object, object)  # freq_data, power_data (numpy arrays)
     save_plot = pyqtSignal(str)  # filename
     clear_plot = pyqtSignal()
 
@@ -72,9 +72,14 @@ class BK9205_RIGOL_Worker(QThread):
     def __init__(self, parent, bk9205_instrument, rigol_instrument, measurement_data,
                  folder_path, file_name, run_number, demo_mode=False,
                  settling_time=1.0, spectrum_averaging=1,
-                 save_individual_spectra=True, **kwargs):
+                 save_individual_spectra=True, instrument_averaging=True,
+                 averaging_mode='VIDeoavg', **kwargs):
         """
         Initialize worker thread.
+
+        With instrument_averaging, spectrum_averaging sweeps are averaged by the RIGOL
+        (averaging_mode trace, VIDeoavg or POWeravg) and only the final trace is read;
+        if the analyzer does not average, the sweeps are averaged on the host.
         """
         super().__init__(parent)
 
@@ -93,6 +98,8 @@ class BK9205_RIGOL_Worker(QThread):
         self.settling_time = settling_time
         self.spectrum_averaging = spectrum_averaging
         self.save_individual_spectra = save_individual_spectra
+        self.instrument_averaging = instrument_averaging
+        self.averaging_mode = averaging_mode
 
         # Control flags
         self.running = True
@@ -100,6 +107,7 @@ class BK9205_RIGOL_Worker(QThread):
         self.stopped_by_user = False
 
         # Data storage
+        self.rigol_capture = None
         self.measurement_results = []
         self.all_spectra = []
 
@@ -151,6 +159,14 @@ class BK9205_RIGOL_Worker(QThread):
             self.error_message.emit(error_msg)
             self.stop_measurement.emit()
 
+        finally:
+            # Give the analyzer its continuous sweep back, also after a stop or an error
+            if self.rigol_capture is not None:
+                try:
+                    self.rigol_capture.release()
+                except Exception as e:
+                    self.append_text.emit(f"  ⚠ RIGOL cleanup warning: {str(e)}")
+
     def _validate_measurement_data(self):
         """Validate measurement configuration."""
         self.append_text.emit("\nValidating measurement configuration...")
@@ -212,12 +228,14 @@ class BK9205_RIGOL_Worker(QThread):
                 self.append_text.emit("  Initializing RIGOL...")
                 self.rigol_cmd = RIGOL_COMMAND()
 
-                # Reset and configure RIGOL for measurement
-                # Add your specific RIGOL configuration here
-                self.append_text.emit("  ✓ RIGOL initialized")
+                # Single sweeps with REAL trace transfer, synchronized on *OPC?
+                self.rigol_capture = RigolCaptureEngine(self.rigol, self.rigol_cmd)
+                self.rigol_capture.prepare()
+                self.append_text.emit(f"  ✓ RIGOL initialized (sweep time {self.rigol_capture.sweep_time():.3g} s)")
             else:
                 self.append_text.emit("  ⚠ RIGOL not connected (demo mode)")
                 self.rigol_cmd = None
+                self.rigol_capture = None
 
             return True
 
@@ -754,23 +772,20 @@ class BK9205_RIGOL_Worker(QThread):
             return
 
         try:
-            # Read all voltages
-            voltages_str = self.bk9205_cmd.measure_all_voltages(self.bk9205)
-            voltages = voltages_str.split(',')
-
-            if len(voltages) >= 2:
-                self.update_bk9205_ch1_voltage_label.emit(f"{float(voltages[0]):.6f}")
-                self.update_bk9205_ch2_voltage_label.emit(f"{float(voltages[1]):.6f}")
-                self.update_bk9205_ch3_voltage_label.emit(f"{float(voltages[2]):.6f}")
+            # Read all voltages and currents (two queries)
+            snapshot = self.bk9205_cmd.measure_snapshot(self.bk9205)
+            voltages = snapshot['voltage']
+            currents = snapshot['current']
 
-            # Read all currents
-            currents_str = self.bk9205_cmd.measure_all_currents(self.bk9205)
-            currents = currents_str.split(',')
+            if len(voltages) >= 3:
+                self.update_bk9205_ch1_voltage_label.emit(f"{voltages[0]:.6f}")
+                self.update_bk9205_ch2_voltage_label.emit(f"{voltages[1]:.6f}")
+                self.update_bk9205_ch3_voltage_label.emit(f"{voltages[2]:.6f}")
 
-            if len(currents) >= 2:
-                self.update_bk9205_ch1_current_label.emit(f"{float(currents[0]):.6f}")
-                self.update_bk9205_ch2_current_label.emit(f"{float(currents[1]):.6f}")
-                self.update_bk9205_ch3_current_label.emit(f"{float(currents[2]):.6f}")
+            if len(currents) >= 3:
+                self.update_bk9205_ch1_current_label.emit(f"{currents[0]:.6f}")
+                self.update_bk9205_ch2_current_label.emit(f"{currents[1]:.6f}")
+                self.update_bk9205_ch3_current_label.emit(f"{currents[2]:.6f}")
 
         except Exception as e:
             self.append_text.emit(f"    ⚠ Warning reading measurements: {str(e)}")
@@ -787,46 +802,45 @@ class BK9205_RIGOL_Worker(QThread):
         try:
             self.append_text.emit(f"    Capturing spectrum (averaging {averaging})...")
 
-            spectra = []
-            for i in range(averaging):
-                if not self.running:
-                    return
+            avg_spectrum = None
+            if averaging > 1 and self.instrument_averaging:
+                # Averaged by the analyzer, only the final trace is transferred
+                captured = self.rigol_capture.capture_averaged(averaging, skip=1, mode=self.averaging_mode,
+                                                               should_stop=lambda: not self.running)
+                if captured is not None:
+                    avg_spectrum = {
+                        'frequencies': captured[0],
+                        'powers': captured[1]
+                    }
+                    self.append_text.emit(f"      {averaging} sweeps averaged on the RIGOL ({self.averaging_mode})")
+
+            if avg_spectrum is None:
+                spectra = []
+                for i in range(averaging):
+                    if not self.running:
+                        return
 
-                # Trigger single sweep
-                self.rigol_cmd.single_sweep(self.rigol)
-
-                # Wait for sweep to complete
-                time.sleep(2)  # Adjust based on sweep time
-
-                # Get trace data
-                self.rigol_cmd.set_data_format(self.rigol, 'REAL')
-                trace_data = self.rigol_cmd.get_trace_data(self.rigol, 'TRACE1')
-                trace_data_chopped = trace_data[1:]
-
-                # Get frequency data
-                start_freq = float(self.rigol_cmd.get_start_frequency(self.rigol))
-                stop_freq = float(self.rigol_cmd.get_stop_frequency(self.rigol))
-                num_points = len(trace_data)
-                frequencies = np.linspace(start_freq, stop_freq, num_points).tolist()
-                spectrum = {
-                    'frequencies': frequencies[1:],
-                    'powers': trace_data_chopped
-                }
-                spectra.append(spectrum)
+                    # Single sweep, wait for its end (*OPC?) and read the trace (first point dropped)
+                    frequencies, powers = self.rigol_capture.capture(skip=1)
+                    spectrum = {
+                        'frequencies': frequencies,
+                        'powers': powers
+                    }
+                    spectra.append(spectrum)
 
-                if averaging > 1:
-                    self.append_text.emit(f"      Trace {i + 1}/{averaging}")
+                    if averaging > 1:
+                        self.append_text.emit(f"      Trace {i + 1}/{averaging}")
 
-            # Average spectra
-            if len(spectra) > 1:
-                avg_spectrum = self._average_spectra(spectra)
-            else:
-                avg_spectrum = spectra[0]
+                # Average spectra
+                if len(spectra) > 1:
+                    avg_spectrum = self._average_spectra(spectra)
+                else:
+                    avg_spectrum = spectra[0]
 
             # Update RIGOL labels
-            if avg_spectrum['frequencies']:
+            if len(avg_spectrum['frequencies']):
                 center_freq = (avg_spectrum['frequencies'][0] + avg_spectrum['frequencies'][-1]) / 2
-                peak_power = max(avg_spectrum['powers'])
+                peak_power = float(np.max(avg_spectrum['powers']))
                 self.update_rigol_freq_label.emit(f"{center_freq / 1e9:.3f} GHz")
                 self.update_rigol_power_label.emit(f"{peak_power:.2f} dBm")
 
@@ -841,15 +855,15 @@ class BK9205_RIGOL_Worker(QThread):
         """Generate demo spectrum data."""
         time.sleep(3)
         frequencies = np.linspace(1e9, 2e9, 1001)
-        powers = -80 + 10 * np.random.randn(len(frequencies))
+        powers = (-80 + 10 * np.random.randn(len(frequencies))).astype(np.float32)
 
         # Add peaks
         for peak_idx in [200, 500, 800]:
             powers[peak_idx - 10:peak_idx + 10] += 30 * np.exp(-((np.arange(-10, 10)) ** 2) / 20)
 
         return {
-            'frequencies': frequencies.tolist(),
-            'powers': powers.tolist(),
+            'frequencies': frequencies,
+            'powers': powers,
             'metadata': {
                 'center_freq': 1.5e9,
                 'span': 1e9,
@@ -861,12 +875,12 @@ class BK9205_RIGOL_Worker(QThread):
     def _average_spectra(self, spectra):
         """Average multiple spectra."""
         frequencies = spectra[0]['frequencies']
-        powers_array = np.array([s['powers'] for s in spectra])
-        avg_powers = np.mean(powers_array, axis=0)
+        powers_array = np.stack([s['powers'] for s in spectra])
+        avg_powers = np.mean(powers_array, axis=0).astype(np.float32)
 
         return {
             'frequencies': frequencies,
-            'powers': avg_powers.tolist(),
+            'powers': avg_powers,
             'metadata': spectra[0].get('metadata', {})
         }
 
@@ -1032,7 +1046,7 @@ class BK9205_RIGOL_Worker(QThread):
                 f.write(f"Total Points: {len(self.measurement_results)}\n\n")
 
                 # Calculate statistics
-                all_peak_powers = [max(r['spectrum']['powers']) for r in self.measurement_results]
+                all_peak_powers = [float(np.max(r['spectrum']['powers'])) for r in self.measurement_results]
 
                 f.write("Peak Power Statistics:\n")
                 f.write(f"  Maximum: {max(all_peak_powers):.2f} dBm\n")
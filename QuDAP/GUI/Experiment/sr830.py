@@ -14,6 +14,11 @@ from matplotlib.figure import Figure
 import random
 import time
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 
 class THREAD(QThread):
     update_data = pyqtSignal(float, float, float, float)  # Signal to emit the temperature and field values
@@ -337,8 +342,7 @@ class sr830Lockin(QMainWindow):
 
     def refresh_gpib_list(self):
         # Access GPIB ports using PyVISA
-        rm = visa.ResourceManager()
-        instruments = rm.list_resources()
+        instruments = visa_registry.list_resources()
         self.gpib_ports = [instr for instr in instruments]
         self.current_gpib_label.setText(f"Current Connection: None")
         # Clear existing items and add new ones
@@ -359,7 +363,6 @@ class sr830Lockin(QMainWindow):
             self.rst()
 
     def connect_current_gpib(self):
-        rm = visa.ResourceManager()
         if self.connect_btn_clicked == False:
             self.connect_btn.setText('Disconnect')
             self.connect_btn_clicked = True
@@ -390,9 +393,9 @@ class sr830Lockin(QMainWindow):
                             self.emulation.update_data.connect(self.update_lockin)
                             self.emulation.start()
                     else:
-                        self.sr830 = rm.open_resource(self.current_connection, timeout=10000)
+                        self.sr830 = visa_registry.open(self.current_connection, timeout=10000)
                         time.sleep(2)
-                        sr830_device = self.sr830.write("*IDN?")
+                        sr830_device = self.sr830.query("*IDN?")
                         self.isConnect = True
                         self.current_gpib_label.setText(f"{self.current_connection} Connection Success!")
                         time.sleep(1)
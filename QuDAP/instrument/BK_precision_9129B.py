@@ -1,3 +1,12 @@
+import numpy as np
+
+try:
+    from QuDAP.misc.io_trace import traced_commands
+except ImportError:
+    from misc.io_trace import traced_commands
+
+
+@traced_commands
 class BK_9129_COMMAND:
     # IEEE488.2 Common Commands
     def clear(self, instrument):
@@ -201,6 +210,14 @@ class BK_9129_COMMAND:
         """Measure current for all channels"""
         return instrument.query('MEAS:CURR:ALL?')
 
+    def measure_snapshot(self, instrument) -> dict:
+        """Measure voltage, current and power of all channels in two queries
+        Returns: {'voltage', 'current', 'power'} float arrays indexed by channel (CH1..CH3)
+        """
+        voltages = np.array(self.measure_all_voltages(instrument).strip().split(','), dtype=float)
+        currents = np.array(self.measure_all_currents(instrument).strip().split(','), dtype=float)
+        return {'voltage': voltages, 'current': currents, 'power': voltages * currents}
+
     # Combine Mode Commands
     def set_series_mode(self, instrument):
         """Enable series mode (CH1+CH2)"""
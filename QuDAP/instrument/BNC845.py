@@ -11,7 +11,15 @@ Author: Command Interface Generator
 Date: 2025
 """
 
+import time
 
+try:
+    from QuDAP.misc.io_trace import traced_commands
+except ImportError:
+    from misc.io_trace import traced_commands
+
+
+@traced_commands
 class BNC_845M_COMMAND:
     """
     Command class for Berkeley Nucleonics Model 845-M Signal Generator
@@ -1176,6 +1184,133 @@ class BNC_845M_COMMAND:
         self.set_pulse_state(instrument, 'ON')
 
 
+# ========================================================================================
+# LIST-mode RF Engine
+# ========================================================================================
+
+class BNC845ListEngine:
+    """
+    Frequency x power table stepped in LIST:MODE MANual
+
+    The whole table of (frequency, power) points is uploaded once with LIST:FREQuency and
+    LIST:POWer; each point is then selected with LIST:MANual and confirmed with *OPC?, so a
+    point costs one write and one query instead of two settings and fixed sleeps. The
+    output frequency and power are then read back once, so the recorded point is the one
+    actually output. Tables longer than the 3501-point list memory are uploaded in windows,
+    reloaded on demand.
+
+    If the upload is not accepted (point count mismatch or a command error), the engine
+    falls back to CW settings of frequency and power, still confirmed with *OPC?.
+    """
+
+    MAX_POINTS = 3501
+
+    def __init__(self, instrument, command=None, settle=0.0):
+        """
+        Args:
+            instrument: Opened PyVISA resource of the generator
+            command: BNC_845M_COMMAND instance (a new one by default)
+            settle: Extra wait in seconds after each confirmed point
+        """
+        self.instrument = instrument
+        self.cmd = command or BNC_845M_COMMAND()
+        self.settle = settle
+        self.points = []
+        self.index = {}
+        self.window = None
+        self.list_mode = False
+        self.current = None
+
+    def load(self, points):
+        """
+        Upload a table of points and switch the generator to manual LIST stepping
+
+        Args:
+            points: Sequence of (frequency Hz, power dBm) in measurement order
+
+        Returns:
+            bool: True if LIST mode is used, False if the engine falls back to CW settings
+        """
+        self.points = [(float(frequency), float(power)) for frequency, power in points]
+        self.index = {}
+        for number, point in enumerate(self.points):
+            self.index.setdefault(point, number)
+        self.window = None
+        self.current = None
+        self.list_mode = bool(self.points)
+        if self.list_mode:
+            try:
+                self._upload(0)
+                self.cmd.set_list_mode(self.instrument, 'MANual')
+                self.cmd.set_frequency_mode(self.instrument, 'LIST')
+                self.cmd.set_power_mode(self.instrument, 'LIST')
+                self.cmd.operation_complete_query(self.instrument)
+            except Exception as e:
+                print(f"⚠ BNC 845 LIST mode unavailable ({e}), setting points directly")
+                self.list_mode = False
+                self._leave_list_mode()
+        return self.list_mode
+
+    def _upload(self, start):
+        """Upload the window of the table starting at point start"""
+        window = self.points[start:start + self.MAX_POINTS]
+        self.cmd.set_list_frequency(self.instrument, [frequency for frequency, _ in window])
+        self.cmd.set_list_power(self.instrument, [power for _, power in window])
+        uploaded = int(float(self.cmd.get_list_frequency_points(self.instrument)))
+        if uploaded != len(window):
+            raise RuntimeError(f"{uploaded} of {len(window)} list points accepted")
+        self.window = start
+
+    def _leave_list_mode(self):
+        """Return frequency and power to fixed (CW) mode"""
+        try:
+            self.cmd.set_frequency_mode(self.instrument, 'CW')
+            self.cmd.set_power_mode(self.instrument, 'FIXed')
+        except Exception as e:
+            print(f"⚠ Could not leave BNC 845 LIST mode: {e}")
+
+    def select(self, frequency, power):
+        """
+        Step the generator to a point and wait until it is settled
+
+        Args:
+            frequency: Frequency in Hz
+            power: Power in dBm
+
+        Returns:
+            Tuple (frequency, power) read back from the generator after *OPC?
+        """
+        point = (float(frequency), float(power))
+        number = self.index.get(point) if self.list_mode else None
+        if number is None:
+            self.cmd.set_frequency(self.instrument, point[0])
+            self.cmd.set_power(self.instrument, point[1])
+        else:
+            if not self.window <= number < self.window + self.MAX_POINTS:
+                self._upload(number - number % self.MAX_POINTS)
+            self.cmd.set_list_manual_point(self.instrument, number - self.window + 1)
+        self.cmd.operation_complete_query(self.instrument)
+        if self.settle:
+            time.sleep(self.settle)
+        self.current = point
+        # Record what the generator outputs, not what was commanded
+        return (float(self.cmd.get_frequency(self.instrument).strip()),
+                float(self.cmd.get_power(self.instrument).strip()))
+
+    def release(self):
+        """Leave LIST mode, keeping the last point as CW frequency and power"""
+        if not self.list_mode:
+            return
+        self.list_mode = False
+        self._leave_list_mode()
+        if self.current is not None:
+            try:
+                self.cmd.set_frequency(self.instrument, self.current[0])
+                self.cmd.set_power(self.instrument, self.current[1])
+            except Exception as e:
+                print(f"⚠ Could not restore BNC 845 CW point: {e}")
+
+
 # ========================================================================================
 # Example Usage
 # ========================================================================================
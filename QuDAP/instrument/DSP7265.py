@@ -16,6 +16,7 @@ Automatically uses 2x time constant for sweep rate
 Plots noise level vs frequency during sweep
 """
 
+import re
 import sys
 import time
 import numpy as np
@@ -26,10 +27,16 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QCheckBox)
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
 from PyQt6.QtGui import QFont
-import pyvisa
 import pyqtgraph as pg
 from datetime import datetime
 
+try:
+    from QuDAP.misc.io_trace import traced_commands
+    from QuDAP.misc.visa_registry import session_lock, visa_registry
+except ImportError:
+    from misc.io_trace import traced_commands
+    from misc.visa_registry import session_lock, visa_registry
+
 # ============================================================================
 # Time Constant Mappings (from DSP 7265 manual)
 # ============================================================================
@@ -118,10 +125,8 @@ class SweepThread(QThread):
     def read_measurement(self):
         """Read X, Y, and magnitude from lock-in"""
         try:
-            # Read X and Y outputs
-            x = float(self.instrument.query('X.').strip())
-            y = float(self.instrument.query('Y.').strip())
-            noise = float(self.instrument.query('NHZ.').strip())
+            # Read X, Y and noise outputs in one transaction
+            x, y, noise = SR7265_COMMAND().read_outputs(self.instrument, ('X', 'Y', 'NHZ'))
 
             # Calculate magnitude (noise level)
             # magnitude = np.sqrt(x ** 2 + y ** 2)
@@ -454,7 +459,6 @@ class DSP7265MainWindow(QMainWindow):
 
         # Instrument connection
         self.instrument = None
-        self.rm = None
 
         # Sweep thread
         self.sweep_thread = None
@@ -623,8 +627,8 @@ class DSP7265MainWindow(QMainWindow):
     def connect_instrument(self):
         """Connect to DSP 7265"""
         try:
-            self.rm = pyvisa.ResourceManager()
-            resources = self.rm.list_resources()
+            # Shared sessions, so the lock-in can stay open in the main application
+            resources = visa_registry.list_resources()
 
             if not resources:
                 QMessageBox.warning(self, "No Devices", "No VISA devices found")
@@ -633,8 +637,7 @@ class DSP7265MainWindow(QMainWindow):
             # Try to connect to GPIB device
             for resource in resources:
                 if 'GPIB' in resource:
-                    self.instrument = self.rm.open_resource(resource)
-                    self.instrument.timeout = 5000
+                    self.instrument = visa_registry.open(resource, timeout=5000)
 
                     try:
                         # Test connection
@@ -658,7 +661,8 @@ class DSP7265MainWindow(QMainWindow):
                         )
                         return
                     except:
-                        pass
+                        self.instrument.close()
+                        self.instrument = None
 
             QMessageBox.warning(self, "Connection Failed", "Could not connect to DSP 7265")
 
@@ -672,10 +676,6 @@ class DSP7265MainWindow(QMainWindow):
                 self.instrument.close()
                 self.instrument = None
 
-            if self.rm:
-                self.rm.close()
-                self.rm = None
-
             self.connection_status.setText("Status: Not Connected")
             self.connection_status.setStyleSheet("color: red; font-weight: bold;")
 
@@ -879,6 +879,7 @@ if __name__ == "__main__":
     window.show()
     sys.exit(app.exec())
 
+@traced_commands
 class SR7265_COMMAND:
     """
     Command class for Stanford Research Systems SR7265 Lock-In Amplifier
@@ -1117,6 +1118,30 @@ class SR7265_COMMAND:
             3: "24 dB/oct"
         }
 
+        # Floating point output queries accepted by read_outputs()
+        self.output_queries = {
+            'X': 'X.',
+            'Y': 'Y.',
+            'MAG': 'MAG.',
+            'PHA': 'PHA.',
+            'NHZ': 'NHZ.',
+            'ENBW': 'ENBW.'
+        }
+
+        # Output pairs the instrument returns with a single compound query
+        self.compound_output_queries = {
+            ('X', 'Y'): 'XY.',
+            ('MAG', 'PHA'): 'MP.'
+        }
+
+        # Curve buffer bit (CBD) / curve number (DC.) of each output
+        self.curve_bits = {
+            'X': 0,
+            'Y': 1,
+            'MAG': 2,
+            'PHA': 3
+        }
+
         # Curve Buffer Status
         self.curve_status = {
             0: "No activity",
@@ -1581,6 +1606,47 @@ class SR7265_COMMAND:
             return (float(values[0]), float(values[1]))
         return response
 
+    def read_outputs(self, instrument, outputs=('X', 'Y', 'MAG', 'PHA')) -> tuple:
+        """
+        Read several outputs in one bus transaction
+
+        Adjacent X/Y and MAG/PHA pairs use the compound XY. and MP. queries and
+        all queries are sent as a single ';' separated command, so the values
+        are taken at (nearly) the same instant with one GPIB turnaround.
+
+        Args:
+            instrument: VISA instrument object
+            outputs: Output names, any of 'X', 'Y', 'MAG', 'PHA', 'NHZ', 'ENBW'
+
+        Returns:
+            Tuple of floats in the order of `outputs`
+        """
+        outputs = [name.upper() for name in outputs]
+        commands = []
+        index = 0
+        while index < len(outputs):
+            pair = tuple(outputs[index:index + 2])
+            if pair in self.compound_output_queries:
+                commands.append(self.compound_output_queries[pair])
+                index += 2
+            elif outputs[index] in self.output_queries:
+                commands.append(self.output_queries[outputs[index]])
+                index += 1
+            else:
+                raise ValueError(f"Invalid output '{outputs[index]}'. Must be one of {list(self.output_queries)}.")
+
+        with session_lock(instrument):
+            instrument.write(';'.join(commands))
+            values = self._parse_output_values(instrument.read())
+            # Some interfaces terminate each response separately
+            while len(values) < len(outputs):
+                values.extend(self._parse_output_values(instrument.read()))
+        return tuple(values[:len(outputs)])
+
+    def _parse_output_values(self, response: str) -> list:
+        """Split a (compound) output response into floats"""
+        return [float(value) for value in re.split(r'[,;\s]+', response.strip('\x00 \r\n')) if value]
+
     def get_adc(self, instrument, channel: int) -> str:
         """
         Query ADC value
@@ -1763,9 +1829,9 @@ class SR7265_COMMAND:
 
         Args:
             instrument: VISA instrument object
-            interval: Storage interval in seconds (10 µs to 1000 s)
+            interval: Storage interval in seconds (sent to the instrument in ms)
         """
-        instrument.write(f'STR {interval}')
+        instrument.write(f'STR {int(round(interval * 1000))}')
         return f"Set storage interval to {interval} s"
 
     def get_curve_storage_interval(self, instrument) -> str:
@@ -1804,6 +1870,89 @@ class SR7265_COMMAND:
         """Query all curve data"""
         return instrument.query('DC')
 
+    def set_curve_buffer_define(self, instrument, outputs=('X', 'Y', 'MAG', 'PHA')):
+        """
+        Select which outputs are stored in the curve buffer
+
+        Args:
+            instrument: VISA instrument object
+            outputs: Output names, any of 'X', 'Y', 'MAG', 'PHA'
+        """
+        mask = 0
+        for name in outputs:
+            if name.upper() not in self.curve_bits:
+                raise ValueError(f"Invalid curve '{name}'. Must be one of {list(self.curve_bits)}.")
+            mask |= 1 << self.curve_bits[name.upper()]
+        instrument.write(f'CBD {mask}')
+        return f"Set curve buffer to store {', '.join(outputs)}"
+
+    def clear_curve_buffer(self, instrument):
+        """Initialise the curve buffer for a new acquisition"""
+        instrument.write('NC')
+
+    def get_curve_points_stored(self, instrument) -> int:
+        """Query the number of points stored in the curve buffer"""
+        response = instrument.query('M')
+        return int(re.split(r'[,;\s]+', response.strip())[-1])
+
+    def get_curve_values(self, instrument, output: str, n_points: int) -> np.ndarray:
+        """
+        Download one stored curve as floating point values
+
+        Args:
+            instrument: VISA instrument object
+            output: Curve to transfer ('X', 'Y', 'MAG' or 'PHA')
+            n_points: Number of stored points to read back
+
+        Returns:
+            NumPy array with the stored values
+        """
+        values = []
+        # Another page polling the lock-in between DC. and its reads would swap answers
+        with session_lock(instrument):
+            instrument.write(f'DC. {self.curve_bits[output.upper()]}')
+            while len(values) < n_points:
+                values.extend(self._parse_output_values(instrument.read()))
+        return np.asarray(values[:n_points], dtype=float)
+
+    def start_buffered_acquisition(self, instrument, interval: float, length: int,
+                                   outputs=('X', 'Y', 'MAG', 'PHA')):
+        """
+        Configure the curve buffer and start storing outputs at a fixed interval
+
+        Args:
+            instrument: VISA instrument object
+            interval: Storage interval in seconds
+            length: Number of points to store per curve
+            outputs: Outputs to store, any of 'X', 'Y', 'MAG', 'PHA'
+
+        Returns:
+            Host monotonic time at which storage was started
+        """
+        self.halt_curve_storage(instrument)
+        self.clear_curve_buffer(instrument)
+        self.set_curve_buffer_define(instrument, outputs)
+        self.set_curve_length(instrument, length)
+        self.set_curve_storage_interval(instrument, interval)
+        start_time = time.monotonic()
+        self.start_curve_storage(instrument)
+        return start_time
+
+    def read_buffered_acquisition(self, instrument, outputs=('X', 'Y', 'MAG', 'PHA')) -> dict:
+        """
+        Halt curve storage and download every stored point in bulk
+
+        Args:
+            instrument: VISA instrument object
+            outputs: Outputs that were stored by start_buffered_acquisition()
+
+        Returns:
+            Dictionary of NumPy arrays keyed by output name
+        """
+        self.halt_curve_storage(instrument)
+        n_points = self.get_curve_points_stored(instrument)
+        return {name: self.get_curve_values(instrument, name, n_points) for name in outputs}
+
     # ========================================================================================
     # Computer Interfaces (RS-232 and GPIB) Commands
     # ========================================================================================
@@ -2093,10 +2242,7 @@ class SR7265_COMMAND:
         Returns:
             Dictionary with X, Y, R, Theta values
         """
-        x = float(self.get_x_value(instrument))
-        y = float(self.get_y_value(instrument))
-        r = float(self.get_r_value(instrument))
-        theta = float(self.get_theta_value(instrument))
+        x, y, r, theta = self.read_outputs(instrument, ('X', 'Y', 'MAG', 'PHA'))
 
         return {
             'X': x,
@@ -3,6 +3,11 @@ from PyQt6.QtGui import QFont, QIcon
 from PyQt6.QtCore import pyqtSignal, Qt
 import pyvisa as visa
 
+try:
+    from QuDAP.misc.visa_registry import visa_registry
+except ImportError:
+    from misc.visa_registry import visa_registry
+
 
 class InstrumentConnection(QWidget):
     """
@@ -161,8 +166,8 @@ class InstrumentConnection(QWidget):
     def refresh_connections(self):
         """Refresh available connections"""
         try:
-            self.rm = visa.ResourceManager()
-            resources = self.rm.list_resources()
+            self.rm = visa_registry.resource_manager()
+            resources = visa_registry.list_resources()
 
             self.connection_combo.clear()
             self.connection_combo.addItem("None")
@@ -308,10 +313,8 @@ class InstrumentConnection(QWidget):
 
             else:
                 # Real instrument
-                if not self.rm:
-                    self.rm = visa.ResourceManager()
-
-                instrument = self.rm.open_resource(connection_string)
+                # Shared with the other pages that have this resource open
+                instrument = visa_registry.open(connection_string)
                 instrument.timeout = 10000
 
                 # Configure RS232 if applicable
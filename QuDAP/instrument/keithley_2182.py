@@ -0,0 +1,133 @@
+"""
+Keithley 2182A Nanovoltmeter - SCPI Command Interface
+
+Provides single readings and instrument-timed burst acquisition through the
+reading buffer (TRACe subsystem), so N readings are collected by the meter
+and transferred in one TRAC:DATA? query instead of N READ? round trips.
+"""
+
+import numpy as np
+
+try:
+    from QuDAP.misc.io_trace import traced_commands
+except ImportError:
+    from misc.io_trace import traced_commands
+
+
+@traced_commands
+class KEITHLEY_2182_COMMAND:
+    """
+    Command class for the Keithley 2182A Nanovoltmeter
+
+    All commands follow SCPI standard syntax
+    """
+
+    # Maximum number of readings held by the 2182A buffer
+    BUFFER_SIZE = 1024
+
+    def __init__(self):
+        """Initialize the Keithley 2182A command class"""
+        self.name = "Keithley 2182A Nanovoltmeter"
+        self.version = "1.0"
+
+    # ========================================================================================
+    # IEEE 488.2 Common Commands
+    # ========================================================================================
+
+    def clear_status(self, instrument):
+        """Clear status (*CLS) - Clears all event registers and error queue"""
+        instrument.write('*CLS')
+
+    def get_id(self, instrument) -> str:
+        """Get instrument identification (*IDN?)"""
+        return instrument.query('*IDN?')
+
+    def operation_complete_query(self, instrument) -> str:
+        """Wait for all pending operations and return 1 (*OPC?)"""
+        return instrument.query('*OPC?')
+
+    # ========================================================================================
+    # Measurement Commands
+    # ========================================================================================
+
+    def set_channel(self, instrument, channel: int):
+        """Select the measurement channel (1 or 2)"""
+        instrument.write(f'SENS:CHAN {channel}')
+
+    def set_nplc(self, instrument, nplc: float):
+        """Set the DC voltage integration time in power line cycles"""
+        instrument.write(f'SENS:VOLT:DC:NPLC {nplc}')
+
+    def get_nplc(self, instrument) -> float:
+        """Get the DC voltage integration time in power line cycles"""
+        return float(instrument.query('SENS:VOLT:DC:NPLC?'))
+
+    def read_voltage(self, instrument, channel: int) -> float:
+        """Trigger and return a single reading of a channel"""
+        self.set_channel(instrument, channel)
+        return float(instrument.query('READ?'))
+
+    # ========================================================================================
+    # Buffered Burst Acquisition
+    # ========================================================================================
+
+    def burst_read(self, instrument, channel: int, count: int) -> np.ndarray:
+        """
+        Collect count readings of a channel in one instrument-timed burst
+
+        Continuous initiation is turned off so the trigger model runs exactly
+        one burst: it takes count samples back to back into the buffer,
+        *OPC? blocks until the burst is complete and the readings are fetched
+        with a single TRAC:DATA? transfer. The sample count is restored to 1
+        afterwards so plain READ? calls keep returning one reading. The buffer
+        holds at least 2 readings, so a single reading is taken with READ?.
+
+        Args:
+            instrument: PyVISA resource of the 2182A
+            channel: Measurement channel (1 or 2)
+            count: Number of readings (1 - 1024)
+
+        Returns:
+            Array of voltage readings in V
+        """
+        count = min(self.BUFFER_SIZE, int(count))
+        if count <= 1:
+            return np.array([self.read_voltage(instrument, channel)])
+        # Allow for the burst duration (NPLC at 50 Hz, plus autozero) when waiting on *OPC?
+        nplc = self.get_nplc(instrument)
+        previous_timeout = instrument.timeout
+        instrument.timeout = max(previous_timeout, int(count * (nplc / 50 * 2 + 0.05) * 1000) + 5000)
+        try:
+            instrument.write('INIT:CONT OFF')
+            instrument.write('ABOR')
+            self.set_channel(instrument, channel)
+            instrument.write('TRIG:SOUR IMM')
+            instrument.write('TRIG:COUN 1')
+            instrument.write(f'SAMP:COUN {count}')
+            instrument.write('TRAC:CLE')
+            instrument.write(f'TRAC:POIN {count}')
+            instrument.write('TRAC:FEED SENS')
+            instrument.write('TRAC:FEED:CONT NEXT')
+            instrument.write('INIT')
+            self.operation_complete_query(instrument)
+            response = instrument.query('TRAC:DATA?')
+        finally:
+            instrument.write('TRAC:FEED:CONT NEV')
+            instrument.write('SAMP:COUN 1')
+            instrument.timeout = previous_timeout
+        return np.array([float(value) for value in response.strip().split(',') if value.strip()])
+
+    def burst_average(self, instrument, channel: int, count: int) -> tuple:
+        """
+        Burst-read a channel and reduce it to mean and standard deviation
+
+        Args:
+            instrument: PyVISA resource of the 2182A
+            channel: Measurement channel (1 or 2)
+            count: Number of readings to average
+
+        Returns:
+            Tuple of (mean, std, readings)
+        """
+        readings = self.burst_read(instrument, channel, count)
+        return float(np.mean(readings)), float(np.std(readings)), readings
@@ -0,0 +1,206 @@
+"""
+Keithley 6221 AC/DC Current Source - SCPI Command Interface
+
+Besides plain DC output, this drives the hardware-timed measurement modes the
+6221 runs together with a 2182A on the Trigger Link (RS-232 + trigger cable):
+Delta, Pulse Delta and Differential Conductance. The 6221 reverses the
+current, triggers the 2182A and stores the computed readings in its own
+buffer, which is then transferred in one TRAC:DATA? query.
+"""
+
+import time
+import numpy as np
+
+try:
+    from QuDAP.misc.io_trace import traced_commands
+except ImportError:
+    from misc.io_trace import traced_commands
+
+
+@traced_commands
+class KEITHLEY_6221_COMMAND:
+    """
+    Command class for the Keithley 6221 AC/DC Current Source
+
+    All commands follow SCPI standard syntax
+    """
+
+    # Maximum number of readings held by the 6221 buffer
+    BUFFER_SIZE = 65536
+
+    def __init__(self):
+        """Initialize the Keithley 6221 command class"""
+        self.name = "Keithley 6221 AC/DC Current Source"
+        self.version = "1.0"
+
+    # ========================================================================================
+    # IEEE 488.2 Common Commands
+    # ========================================================================================
+
+    def clear_status(self, instrument):
+        """Clear status (*CLS) - Clears all event registers and error queue"""
+        instrument.write('*CLS')
+
+    def get_id(self, instrument) -> str:
+        """Get instrument identification (*IDN?)"""
+        return instrument.query('*IDN?')
+
+    def reset(self, instrument):
+        """Reset to default settings (*RST)"""
+        instrument.write('*RST')
+
+    # ========================================================================================
+    # DC Source Commands
+    # ========================================================================================
+
+    def set_output(self, instrument, state: str):
+        """Turn the output ON or OFF"""
+        instrument.write(f':OUTP {state}')
+
+    def set_current(self, instrument, current: float):
+        """Set the DC current level in A"""
+        instrument.write(f'CURR {current}')
+
+    def set_compliance(self, instrument, voltage: float):
+        """Set the voltage compliance in V"""
+        instrument.write(f'CURR:COMP {voltage}')
+
+    # ========================================================================================
+    # Delta / Pulse Delta / Differential Conductance (2182A on the Trigger Link)
+    # ========================================================================================
+
+    def nanovoltmeter_present(self, instrument) -> bool:
+        """Check that a 2182A is attached to the 6221 serial port"""
+        return instrument.query('SOUR:DELT:NVPR?').strip() == '1'
+
+    def abort_sweep(self, instrument):
+        """Abort a running Delta, Pulse Delta or Differential Conductance test"""
+        instrument.write('SOUR:SWE:ABOR')
+
+    def configure_delta(self, instrument, high: float, low: float = None, delay: float = 0.002, count: int = 100,
+                        compliance_abort: bool = True):
+        """
+        Configure the Delta mode (current reversal with a 3-point moving average)
+
+        Args:
+            instrument: PyVISA resource of the 6221
+            high: High source value in A
+            low: Low source value in A (defaults to -high)
+            delay: Delay after each current change in s
+            count: Number of delta readings
+            compliance_abort: Abort the test if the source goes into compliance
+        """
+        low = -high if low is None else low
+        instrument.write(f'SOUR:DELT:HIGH {high}')
+        instrument.write(f'SOUR:DELT:LOW {low}')
+        instrument.write(f'SOUR:DELT:DEL {delay}')
+        instrument.write(f'SOUR:DELT:COUN {count}')
+        instrument.write(f"SOUR:DELT:CAB {'ON' if compliance_abort else 'OFF'}")
+        self._prepare_buffer(instrument, count)
+        instrument.write('SOUR:DELT:ARM')
+
+    def configure_pulse_delta(self, instrument, high: float, low: float = 0.0, width: float = 110e-6,
+                              source_delay: float = 16e-6, interval: int = 5, count: int = 100,
+                              compliance_abort: bool = True):
+        """
+        Configure the Pulse Delta mode (short pulses to limit sample heating)
+
+        Args:
+            instrument: PyVISA resource of the 6221
+            high: Pulse current in A
+            low: Current between pulses in A
+            width: Pulse width in s (50 µs - 12 ms)
+            source_delay: Delay from pulse edge to the 2182A trigger in s
+            interval: Pulse repetition interval in power line cycles
+            count: Number of pulse delta readings
+            compliance_abort: Abort the test if the source goes into compliance
+        """
+        instrument.write(f'SOUR:PDEL:HIGH {high}')
+        instrument.write(f'SOUR:PDEL:LOW {low}')
+        instrument.write(f'SOUR:PDEL:WIDT {width}')
+        instrument.write(f'SOUR:PDEL:SDEL {source_delay}')
+        instrument.write(f'SOUR:PDEL:INT {interval}')
+        instrument.write(f'SOUR:PDEL:COUN {count}')
+        instrument.write('SOUR:PDEL:SWE OFF')
+        instrument.write('SOUR:PDEL:RANG BEST')
+        instrument.write('SOUR:PDEL:LME 2')
+        instrument.write(f"SOUR:PDEL:CAB {'ON' if compliance_abort else 'OFF'}")
+        self._prepare_buffer(instrument, count)
+        instrument.write('SOUR:PDEL:ARM')
+
+    def configure_differential_conductance(self, instrument, start: float, stop: float, step: float,
+                                           delta: float, delay: float = 0.002, compliance_abort: bool = True) -> int:
+        """
+        Configure a Differential Conductance sweep (dV/dI along a current staircase)
+
+        Args:
+            instrument: PyVISA resource of the 6221
+            start: Start current in A
+            stop: Stop current in A
+            step: Staircase step in A
+            delta: Modulation amplitude in A
+            delay: Delay after each current change in s
+            compliance_abort: Abort the test if the source goes into compliance
+
+        Returns:
+            Number of readings the sweep will produce
+        """
+        count = int(round(abs(stop - start) / abs(step))) + 1
+        instrument.write(f'SOUR:DCON:STAR {start}')
+        instrument.write(f'SOUR:DCON:STOP {stop}')
+        instrument.write(f'SOUR:DCON:STEP {step}')
+        instrument.write(f'SOUR:DCON:DELT {delta}')
+        instrument.write(f'SOUR:DCON:DEL {delay}')
+        instrument.write(f"SOUR:DCON:CAB {'ON' if compliance_abort else 'OFF'}")
+        self._prepare_buffer(instrument, count)
+        instrument.write('SOUR:DCON:ARM')
+        return count
+
+    def _prepare_buffer(self, instrument, count: int):
+        """Size and clear the reading buffer, returning readings and timestamps as ASCII"""
+        instrument.write('FORM:DATA ASC')
+        instrument.write('FORM:ELEM READ,TST')
+        instrument.write('UNIT V')
+        instrument.write(f'TRAC:POIN {max(1, min(self.BUFFER_SIZE, count))}')
+        instrument.write('TRAC:CLE')
+
+    def get_buffer_count(self, instrument) -> int:
+        """Number of readings stored in the buffer"""
+        return int(float(instrument.query('TRAC:POIN:ACT?')))
+
+    def read_buffer(self, instrument) -> tuple:
+        """
+        Transfer the whole reading buffer in one query
+
+        Returns:
+            Tuple of (readings, timestamps) as NumPy arrays
+        """
+        response = instrument.query('TRAC:DATA?')
+        values = np.array([float(value) for value in response.strip().split(',') if value.strip()])
+        return values[0::2], values[1::2]
+
+    def run_armed_test(self, instrument, count: int, timeout: float = 600, running=lambda: True,
+                       poll_interval: float = 0.2) -> tuple:
+        """
+        Start an armed Delta / Pulse Delta / Differential Conductance test and fetch its buffer
+
+        Args:
+            instrument: PyVISA resource of the 6221
+            count: Number of readings the armed test produces
+            timeout: Maximum time to wait for the buffer to fill in s
+            running: Callable returning False to abort the test early
+            poll_interval: Time between buffer-count polls in s
+
+        Returns:
+            Tuple of (readings, timestamps); partial if aborted or timed out
+        """
+        instrument.write('INIT:IMM')
+        start_time = time.time()
+        try:
+            while self.get_buffer_count(instrument) < count:
+                if not running() or time.time() - start_time > timeout:
+                    break
+                time.sleep(poll_interval)
+        finally:
+            self.abort_sweep(instrument)
+        return self.read_buffer(instrument)
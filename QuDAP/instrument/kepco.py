@@ -1,3 +1,12 @@
+import time
+
+try:
+    from QuDAP.misc.io_trace import traced_commands
+except ImportError:
+    from misc.io_trace import traced_commands
+
+
+@traced_commands
 class KEPCO_COMMAND:
     """
     KEPCO KLP Series Power Supply SCPI Command Interface
@@ -203,6 +212,12 @@ class KEPCO_COMMAND:
         """Measure actual output current (MEAS:CURR?)"""
         return instrument.query('MEAS:CURR?')
 
+    def measure_voltage_current(self, instrument) -> str:
+        """Measure output voltage and current in one exchange (MEAS:VOLT?;:MEAS:CURR?)
+        Returns: 'voltage;current'
+        """
+        return instrument.query('MEAS:VOLT?;:MEAS:CURR?')
+
     # ==================== Function Mode Commands ====================
 
     def set_function_mode(self, instrument, mode: str):
@@ -604,6 +619,270 @@ class KEPCO_COMMAND:
             instrument.write(f'CAL:STAT {state}')
 
 
+# ==================== List Ramp Engine ====================
+
+class KepcoRampEngine:
+    """
+    Current (or voltage) staircases executed from the KLP's internal list
+
+    A staircase is compiled into list segments of at most 250 points with their dwell
+    times. Each segment is uploaded once and started with a single trigger, so the steps
+    are timed by the power supply instead of the host. While a segment runs, the operation
+    condition register tells whether the list still executes and whether the output is in
+    compliance; the active step follows from the dwell table and the output is read with one
+    combined MEAS:VOLT?;:MEAS:CURR? exchange per sample. The samples are returned together
+    when the ramp ends.
+    """
+
+    MAX_POINTS = 250
+    MIN_DWELL = 0.010
+    MAX_DWELL = 655.35
+
+    # Operation condition register bits (STAT:OPER:COND?)
+    OPER_LIST_RUNNING = 1 << 3
+    OPER_CV = 1 << 8
+    OPER_CC = 1 << 10
+
+    # A segment still listed as running this long after its dwell table ended has stalled
+    STALL_MARGIN = 2.0
+
+    def __init__(self, instrument, command=None):
+        """
+        Args:
+            instrument: Opened PyVISA resource of the KLP
+            command: KEPCO_COMMAND instance (a new one by default)
+        """
+        self.instrument = instrument
+        self.cmd = command or KEPCO_COMMAND()
+        self.mode = 'CURR'
+        self.limit = None
+        self.segments = []
+        self.segment = None
+        self.segment_start = None
+        self.aborted = False
+
+    # ==================== Compilation ====================
+
+    @staticmethod
+    def staircase(start, stop, step):
+        """
+        Levels from start to stop (inclusive) in steps of step
+
+        Returns:
+            list: Levels, ending exactly at stop
+        """
+        if step == 0:
+            raise ValueError("Step must not be zero")
+        step = abs(step) if stop >= start else -abs(step)
+        count = int(abs(stop - start) / abs(step) + 1e-9)
+        levels = [round(start + n * step, 12) for n in range(count + 1)]
+        if abs(levels[-1] - stop) > 1e-12:
+            levels.append(stop)
+        return levels
+
+    def compile(self, levels, dwell, mode='CURR', limit=None):
+        """
+        Split a staircase into list segments
+
+        Args:
+            levels: Output levels (A in CURR mode, V in VOLT mode)
+            dwell: Dwell time per level in seconds, or a sequence with one value per level
+            mode: 'CURR' (current source) or 'VOLT' (voltage source)
+            limit: Voltage limit in CURR mode / current limit in VOLT mode, programmed for
+                every step (None programs the static limit setting of the instrument)
+
+        Returns:
+            list: Segments as (levels, dwells) tuples
+        """
+        mode = mode.upper()[:4]
+        if mode not in ['CURR', 'VOLT']:
+            raise ValueError("Mode must be CURR or VOLT")
+        levels = [float(level) for level in levels]
+        dwells = [float(dwell)] * len(levels) if isinstance(dwell, (int, float)) else [float(d) for d in dwell]
+        if not levels or len(dwells) != len(levels):
+            raise ValueError("Levels and dwell times must be non-empty and of the same length")
+        if any(not self.MIN_DWELL <= d <= self.MAX_DWELL for d in dwells):
+            raise ValueError(f"Dwell times must be between {self.MIN_DWELL} and {self.MAX_DWELL} s")
+        self.mode = mode
+        self.limit = limit
+        self.segments = [(levels[i:i + self.MAX_POINTS], dwells[i:i + self.MAX_POINTS])
+                         for i in range(0, len(levels), self.MAX_POINTS)]
+        return self.segments
+
+    def duration(self):
+        """Total run time of the compiled ramp in seconds (without upload time)"""
+        return sum(sum(dwells) for _, dwells in self.segments)
+
+    # ==================== Execution ====================
+
+    def _static_limit(self):
+        """Static limit setting (VOLT? in CURR mode, CURR? in VOLT mode)"""
+        if self.mode == 'CURR':
+            return float(self.cmd.get_voltage(self.instrument).strip())
+        return float(self.cmd.get_current(self.instrument).strip())
+
+    def _upload(self, levels, dwells):
+        """Program one segment into the list (count 1, direction UP)"""
+        # LIST:CLE also wipes the limit list, so it is always rewritten
+        limit = self.limit if self.limit is not None else self._static_limit()
+        self.cmd.list_clear(self.instrument)
+        if self.mode == 'CURR':
+            self.cmd.set_list_current(self.instrument, *levels)
+            self.cmd.set_list_voltage(self.instrument, *([limit] * len(levels)))
+        else:
+            self.cmd.set_list_voltage(self.instrument, *levels)
+            self.cmd.set_list_current(self.instrument, *([limit] * len(levels)))
+        self.cmd.set_list_dwell(self.instrument, *dwells)
+        self.cmd.set_list_count(self.instrument, 1)
+        self.cmd.set_list_direction(self.instrument, 'UP')
+        self.cmd.get_operation_complete(self.instrument)
+
+    def _hold(self, level):
+        """Leave LIST mode with the static setting at level, so the output does not jump"""
+        if self.mode == 'CURR':
+            self.cmd.set_current(self.instrument, level)
+            self.cmd.set_current_mode(self.instrument, 'FIXED')
+        else:
+            self.cmd.set_voltage(self.instrument, level)
+            self.cmd.set_voltage_mode(self.instrument, 'FIXED')
+
+    def _start_segment(self, number):
+        """Upload a segment and start it with a single trigger"""
+        levels, dwells = self.segments[number]
+        if number > 0:
+            self._hold(self.segments[number - 1][0][-1])
+        self._upload(levels, dwells)
+        self.cmd.set_function_mode(self.instrument, self.mode)
+        if self.mode == 'CURR':
+            self.cmd.set_current_mode(self.instrument, 'LIST')
+        else:
+            self.cmd.set_voltage_mode(self.instrument, 'LIST')
+        self.cmd.initiate_trigger(self.instrument)
+        self.cmd.trigger(self.instrument)
+        self.segment = number
+        self.segment_start = time.monotonic()
+
+    def list_state(self):
+        """
+        List state read from the operation condition register
+
+        Returns:
+            Tuple (running, compliance): the list still executes / the output left the
+            programmed mode (constant voltage in CURR mode, constant current in VOLT mode)
+        """
+        condition = int(float(self.cmd.get_operation_condition(self.instrument).strip()))
+        compliance_bit = self.OPER_CV if self.mode == 'CURR' else self.OPER_CC
+        return bool(condition & self.OPER_LIST_RUNNING), bool(condition & compliance_bit)
+
+    def _estimated_step(self):
+        """Step of the running segment from the dwell table (the last step once it ran out)"""
+        dwells = self.segments[self.segment][1]
+        elapsed = time.monotonic() - self.segment_start
+        for step, dwell in enumerate(dwells):
+            elapsed -= dwell
+            if elapsed < 0:
+                return step
+        return len(dwells) - 1
+
+    def progress(self):
+        """
+        Active step of the running segment
+
+        The instrument decides whether the segment still runs; only the step within it is
+        estimated from the dwell table.
+
+        Returns:
+            Tuple (segment, step, setpoint, compliance), or None if no segment runs
+
+        Raises:
+            RuntimeError: The list stopped before its dwell table ended, or still runs well
+                after it (stalled step)
+        """
+        if self.segment is None:
+            return None
+        levels, dwells = self.segments[self.segment]
+        running, compliance = self.list_state()
+        elapsed = time.monotonic() - self.segment_start
+        if not running:
+            if elapsed < sum(dwells) - dwells[-1]:
+                raise RuntimeError(f"List segment {self.segment + 1} stopped at about step "
+                                   f"{self._estimated_step() + 1} of {len(levels)}")
+            return None
+        if elapsed > sum(dwells) + self.STALL_MARGIN:
+            raise RuntimeError(f"List segment {self.segment + 1} still running "
+                               f"{elapsed - sum(dwells):.1f} s after its last step")
+        step = self._estimated_step()
+        return self.segment, step, levels[step], compliance
+
+    def read_output(self):
+        """Measured output as (voltage, current)"""
+        answer = self.cmd.measure_voltage_current(self.instrument).strip()
+        try:
+            voltage, current = (float(value) for value in answer.replace(',', ';').split(';')[:2])
+        except ValueError:
+            voltage = float(self.cmd.measure_voltage(self.instrument).strip())
+            current = float(self.cmd.measure_current(self.instrument).strip())
+        return voltage, current
+
+    def abort(self):
+        """Stop the list and hold the active step's level in FIXED mode"""
+        self.aborted = True
+        self.cmd.abort_trigger(self.instrument)
+        if self.segment is not None:
+            self._hold(self.segments[self.segment][0][self._estimated_step()])
+        self.segment = None
+
+    def run(self, interval=0.1, on_sample=None, should_stop=None):
+        """
+        Execute the compiled ramp, sampling the output while it runs
+
+        Args:
+            interval: Sampling interval in seconds
+            on_sample: Optional callback(sample) called with every sample dict
+            should_stop: Optional callable; the ramp is aborted when it returns True
+
+        Returns:
+            dict: Lists 'time', 'segment', 'step', 'setpoint', 'voltage', 'current', 'compliance'
+                (time in seconds since the start of the ramp)
+
+        Raises:
+            RuntimeError: A list segment stopped early or stalled (the ramp is aborted)
+        """
+        if not self.segments:
+            raise ValueError("No ramp compiled")
+        samples = {'time': [], 'segment': [], 'step': [], 'setpoint': [], 'voltage': [], 'current': [],
+                   'compliance': []}
+        self.aborted = False
+        ramp_start = time.monotonic()
+        for number in range(len(self.segments)):
+            self._start_segment(number)
+            while True:
+                if should_stop is not None and should_stop():
+                    self.abort()
+                    return samples
+                try:
+                    state = self.progress()
+                except RuntimeError:
+                    self.abort()
+                    raise
+                if state is None:
+                    break
+                sample_start = time.monotonic()
+                voltage, current = self.read_output()
+                sample = {'time': (sample_start + time.monotonic()) / 2 - ramp_start, 'segment': state[0],
+                          'step': state[1], 'setpoint': state[2], 'voltage': voltage, 'current': current,
+                          'compliance': state[3]}
+                for key, value in sample.items():
+                    samples[key].append(value)
+                if on_sample is not None:
+                    on_sample(sample)
+                time.sleep(max(0.0, interval - (time.monotonic() - sample_start)))
+        # Back to FIXED mode at the final level, so the static set controls work again
+        self._hold(self.segments[-1][0][-1])
+        self.segment = None
+        return samples
+
+
 # Example usage
 if __name__ == "__main__":
     """
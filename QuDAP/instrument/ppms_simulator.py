@@ -0,0 +1,426 @@
+"""
+Quantum Design PPMS - MultiPyVu Stand-in Simulator
+
+Offline replacement for MultiPyVu.Server / MultiPyVu.Client, so run_ETO,
+ST_FMR_Worker and the PPMS pages can be exercised, profiled and benchmarked
+without MultiVu and a cryostat. The simulated client exposes the same calls
+and enums as the MultiPyVu client (get/set_temperature, get/set_field,
+get/set_chamber, wait_for, temperature/field/chamber.units and the approach /
+driven / chamber mode enums). The simulator models:
+
+- temperature ramps at the requested rate, with 'Tracking' / 'Near' /
+  'Stable' status and reading noise
+- linear or oscillating field ramps, with 'Charging' / 'Iterating' /
+  'Holding (driven)' status
+- chamber mode transitions
+- per-call latency and injected faults
+- accelerated time (speed > 1 runs the physics faster than the wall clock)
+
+Set the QUDAP_PPMS_SIMULATOR environment variable to a speed factor
+(e.g. 1 or 60) to make the GUI use the simulator instead of MultiPyVu.
+"""
+
+import os
+import random
+import threading
+import time
+from enum import IntEnum
+
+try:
+    from MultiPyVu import MultiPyVuError as SimulatedMultiVuError
+except ImportError:
+    class SimulatedMultiVuError(Exception):
+        """Error raised by the simulated MultiVu (MultiPyVuError when MultiPyVu is installed)"""
+
+# Environment variable holding the simulation speed factor
+SIMULATOR_ENV = 'QUDAP_PPMS_SIMULATOR'
+
+
+def simulator_speed():
+    """Simulation speed requested through QUDAP_PPMS_SIMULATOR, or None if the simulator is off"""
+    value = os.environ.get(SIMULATOR_ENV, '').strip()
+    if not value or value.lower() in ('0', 'off', 'false', 'no'):
+        return None
+    try:
+        return max(float(value), 1e-3)
+    except ValueError:
+        return 1.0
+
+
+# ========================================================================================
+# MultiPyVu-compatible enums
+# ========================================================================================
+
+class TemperatureApproach(IntEnum):
+    fast_settle = 0
+    no_overshoot = 1
+
+
+class FieldApproach(IntEnum):
+    linear = 0
+    no_overshoot = 1
+    oscillate = 2
+
+
+class FieldDrivenMode(IntEnum):
+    persistent = 0
+    driven = 1
+
+
+class ChamberMode(IntEnum):
+    seal = 0
+    purge_seal = 1
+    vent_seal = 2
+    pump_continuous = 3
+    vent_continuous = 4
+    high_vacuum = 5
+
+
+class Subsystem(IntEnum):
+    no_subsystem = 0
+    temperature = 1
+    field = 2
+    chamber = 4
+
+
+CHAMBER_STATES = {
+    ChamberMode.seal: ('Sealing', 'Sealed'),
+    ChamberMode.purge_seal: ('Purging', 'Purged and Sealed'),
+    ChamberMode.vent_seal: ('Venting', 'Vented and Sealed'),
+    ChamberMode.pump_continuous: ('Pumping', 'Pumping Continuously'),
+    ChamberMode.vent_continuous: ('Venting', 'Venting Continuously'),
+    ChamberMode.high_vacuum: ('Pumping', 'High Vacuum'),
+}
+
+
+class _Namespace:
+    """Attribute container mirroring client.temperature / client.field / client.chamber"""
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+# ========================================================================================
+# Cryostat Model
+# ========================================================================================
+
+class SimulatedClock:
+    """Simulated time running speed times faster than the wall clock"""
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.start = time.monotonic()
+
+    def now(self):
+        """Simulated seconds since the clock was created"""
+        return (time.monotonic() - self.start) * self.speed
+
+    def sleep(self, seconds):
+        """Sleep for a simulated duration"""
+        time.sleep(max(0.0, seconds) / self.speed)
+
+
+class SimulatedPPMS:
+    """
+    State of the simulated cryostat, shared by every client connected to the same server
+    """
+
+    def __init__(self, speed=1.0, temperature=300.0, temperature_noise=0.002, temperature_settle_time=30.0,
+                 near_band=0.01, field_settle_time=2.0, oscillate_factor=1.5, chamber_time=10.0,
+                 latency=0.02, latency_jitter=0.01, fault_rate=0.0, fault_kind='error', hang_time=60.0, seed=None):
+        """
+        Args:
+            speed: Simulation speed factor (simulated seconds per wall-clock second)
+            temperature: Initial temperature in K
+            temperature_noise: Standard deviation of the temperature reading noise in K
+            temperature_settle_time: Time from reaching the set point to 'Stable' in s
+            near_band: Relative distance from the set point reported as 'Near'
+            field_settle_time: Time from reaching the set point to 'Holding (driven)' in s
+            oscillate_factor: Duration factor of an oscillating approach compared to a linear ramp
+            chamber_time: Duration of a chamber mode transition in s
+            latency: Wall-clock latency of every client call in s
+            latency_jitter: Uniform jitter added to the latency in s
+            fault_rate: Probability of a random fault on every client call
+            fault_kind: Kind of random fault: 'error', 'exit' (SystemExit, as a lost client) or 'hang'
+            hang_time: Wall-clock duration of a 'hang' fault in s
+            seed: Random seed for reproducible noise and faults
+        """
+        self.clock = SimulatedClock(speed)
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.temperature_noise = temperature_noise
+        self.temperature_settle_time = temperature_settle_time
+        self.near_band = near_band
+        self.field_settle_time = field_settle_time
+        self.oscillate_factor = oscillate_factor
+        self.chamber_time = chamber_time
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.fault_rate = fault_rate
+        self.fault_kind = fault_kind
+        self.hang_time = hang_time
+        self.pending_faults = []
+        self.call_count = 0
+
+        now = self.clock.now()
+        # Each ramp is (start value, set point, start time, duration)
+        self.temperature_ramp = (temperature, temperature, now, 0.0)
+        self.temperature_reached_at = now - temperature_settle_time
+        self.field_ramp = (0.0, 0.0, now - field_settle_time, 0.0)
+        self.field_approach = FieldApproach.linear
+        self.field_driven_mode = FieldDrivenMode.driven
+        self.chamber_mode = ChamberMode.seal
+        self.chamber_changed_at = now - chamber_time
+
+    # ------------------------------------------------------------------ faults and latency
+
+    def inject_fault(self, kind='error', count=1):
+        """Make the next count client calls fail with a fault of the given kind"""
+        with self.lock:
+            self.pending_faults.extend([kind] * count)
+
+    def before_call(self, name):
+        """Apply latency and faults to a client call"""
+        with self.lock:
+            self.call_count += 1
+            kind = self.pending_faults.pop(0) if self.pending_faults else None
+            if kind is None and self.fault_rate and self.random.random() < self.fault_rate:
+                kind = self.fault_kind
+            delay = self.latency + self.random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if kind == 'hang':
+            time.sleep(self.hang_time)
+        elif kind == 'exit':
+            raise SystemExit(f'Simulated MultiVu connection lost during {name}')
+        elif kind is not None:
+            raise SimulatedMultiVuError(f'Simulated MultiVu error during {name}')
+
+    # ------------------------------------------------------------------ temperature
+
+    @staticmethod
+    def _ramp_value(ramp, now):
+        """Linear ramp value at time now"""
+        start, set_point, start_time, duration = ramp
+        if duration <= 0 or now >= start_time + duration:
+            return set_point
+        return start + (set_point - start) * (now - start_time) / duration
+
+    def set_temperature(self, set_point, rate, approach=TemperatureApproach.fast_settle):
+        """Start a temperature ramp; rate in K/min"""
+        with self.lock:
+            now = self.clock.now()
+            current = self._ramp_value(self.temperature_ramp, now)
+            duration = abs(set_point - current) / max(abs(rate), 1e-6) * 60
+            if approach == TemperatureApproach.no_overshoot:
+                duration *= 1.2
+            self.temperature_ramp = (current, float(set_point), now, duration)
+            self.temperature_reached_at = now + duration
+
+    def get_temperature(self):
+        """(temperature in K, status)"""
+        with self.lock:
+            now = self.clock.now()
+            value = self._ramp_value(self.temperature_ramp, now)
+            set_point = self.temperature_ramp[1]
+            settling = now - self.temperature_reached_at
+            if settling < 0:
+                near = abs(value - set_point) <= self.near_band * max(abs(set_point), 1.0)
+                status = 'Near' if near else 'Tracking'
+            elif settling < self.temperature_settle_time:
+                status = 'Near'
+                # Exponential approach of the sample temperature after the ramp
+                value += (self.temperature_ramp[0] - set_point) * 0.002 * \
+                    (1 - settling / self.temperature_settle_time)
+            else:
+                status = 'Stable'
+            value += self.random.gauss(0, self.temperature_noise)
+        return value, status
+
+    # ------------------------------------------------------------------ field
+
+    def set_field(self, set_point, rate, approach=FieldApproach.linear, driven_mode=FieldDrivenMode.driven):
+        """Start a field ramp; rate in Oe/s"""
+        with self.lock:
+            now = self.clock.now()
+            current = self._ramp_value(self.field_ramp, now)
+            duration = abs(set_point - current) / max(abs(rate), 1e-6)
+            if approach == FieldApproach.oscillate:
+                duration *= self.oscillate_factor
+            self.field_ramp = (current, float(set_point), now, duration)
+            self.field_approach = approach
+            self.field_driven_mode = driven_mode
+
+    def get_field(self):
+        """(field in Oe, status)"""
+        with self.lock:
+            now = self.clock.now()
+            start, set_point, start_time, duration = self.field_ramp
+            value = self._ramp_value(self.field_ramp, now)
+            elapsed = now - start_time - duration
+            if elapsed < 0:
+                status = 'Iterating' if self.field_approach == FieldApproach.oscillate else 'Charging'
+            elif elapsed < self.field_settle_time:
+                status = 'Iterating'
+            elif self.field_driven_mode == FieldDrivenMode.driven:
+                status = 'Holding (driven)'
+            else:
+                status = 'Stable (persistent)'
+        return value, status
+
+    # ------------------------------------------------------------------ chamber
+
+    def set_chamber(self, mode):
+        """Start a chamber mode transition"""
+        with self.lock:
+            self.chamber_mode = ChamberMode(int(mode))
+            self.chamber_changed_at = self.clock.now()
+
+    def get_chamber(self):
+        """Chamber status string"""
+        with self.lock:
+            transition, final = CHAMBER_STATES[self.chamber_mode]
+            return transition if self.clock.now() - self.chamber_changed_at < self.chamber_time else final
+
+    def is_stable(self, bitmask):
+        """Check the subsystems of a wait_for bitmask"""
+        if bitmask & Subsystem.temperature and self.get_temperature()[1] != 'Stable':
+            return False
+        if bitmask & Subsystem.field and self.get_field()[1] not in ('Holding (driven)', 'Stable (persistent)'):
+            return False
+        if bitmask & Subsystem.chamber and self.get_chamber() not in [state[1] for state in CHAMBER_STATES.values()]:
+            return False
+        return True
+
+
+# ========================================================================================
+# MultiPyVu-compatible Server and Client
+# ========================================================================================
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def _model_for_port(port, create_options=None):
+    """Cryostat model of the server on port, creating a standalone one if no server is open"""
+    with _servers_lock:
+        model = _servers.get(port)
+        if model is None:
+            model = SimulatedPPMS(**(create_options or {}))
+            _servers[port] = model
+        return model
+
+
+class SimulatedMultiVuServer:
+    """
+    Stand-in for MultiPyVu.Server owning the simulated cryostat of one port
+    """
+
+    def __init__(self, flags=None, keep_server_open=False, port=5000, speed=None, **model_options):
+        """
+        Args:
+            flags: Ignored, accepted for MultiPyVu.Server compatibility
+            keep_server_open: Ignored, accepted for MultiPyVu.Server compatibility
+            port: Port the clients connect to
+            speed: Simulation speed factor (defaults to QUDAP_PPMS_SIMULATOR or 1)
+            **model_options: Options of SimulatedPPMS (latency, fault_rate, ...)
+        """
+        self.port = port
+        speed = speed if speed is not None else (simulator_speed() or 1.0)
+        self.model_options = {'speed': speed, **model_options}
+        self.model = None
+
+    def open(self):
+        """Start the simulated cryostat"""
+        with _servers_lock:
+            self.model = SimulatedPPMS(**self.model_options)
+            _servers[self.port] = self.model
+        print(f"✓ Simulated MultiVu server running on port {self.port} (speed x{self.model.clock.speed:g})")
+        return self
+
+    def close(self):
+        """Stop the simulated cryostat"""
+        with _servers_lock:
+            if _servers.get(self.port) is self.model:
+                del _servers[self.port]
+
+    close_server = close
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SimulatedMultiVuClient:
+    """
+    Stand-in for MultiPyVu.Client talking to the simulated cryostat
+    """
+
+    def __init__(self, host='localhost', port=5000, socket_timeout=None):
+        """
+        Args:
+            host: Ignored, accepted for MultiPyVu.Client compatibility
+            port: Port of the simulated server
+            socket_timeout: Ignored, accepted for MultiPyVu.Client compatibility
+        """
+        self.host = host
+        self.port = port
+        self.model = None
+        self.temperature = _Namespace(units='K', approach_mode=TemperatureApproach, waitfor=Subsystem.temperature)
+        self.field = _Namespace(units='Oe', approach_mode=FieldApproach, driven_mode=FieldDrivenMode,
+                                waitfor=Subsystem.field)
+        self.chamber = _Namespace(units='', mode=ChamberMode, waitfor=Subsystem.chamber)
+        self.subsystem = Subsystem
+
+    def open(self):
+        """Connect to the simulated server (a standalone cryostat is created if none is open)"""
+        self.model = _model_for_port(self.port, {'speed': simulator_speed() or 1.0})
+        return self
+
+    def close_client(self):
+        """Disconnect"""
+        self.model = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close_client()
+
+    def _model(self, name):
+        """Connected model after latency and fault injection"""
+        if self.model is None:
+            raise SimulatedMultiVuError(f'{name} called on a closed simulated client')
+        self.model.before_call(name)
+        return self.model
+
+    def get_temperature(self):
+        return self._model('get_temperature').get_temperature()
+
+    def set_temperature(self, set_point, rate_per_min, approach_mode=TemperatureApproach.fast_settle):
+        self._model('set_temperature').set_temperature(set_point, rate_per_min, approach_mode)
+
+    def get_field(self):
+        return self._model('get_field').get_field()
+
+    def set_field(self, set_point, rate_per_sec, approach_mode=FieldApproach.linear,
+                  driven_mode=FieldDrivenMode.driven):
+        self._model('set_field').set_field(set_point, rate_per_sec, approach_mode, driven_mode)
+
+    def get_chamber(self):
+        return self._model('get_chamber').get_chamber()
+
+    def set_chamber(self, mode):
+        self._model('set_chamber').set_chamber(mode)
+
+    def wait_for(self, delay_sec, timeout_sec=0, bitmask=0):
+        """Wait delay_sec (simulated), then until the bitmask subsystems are stable or timeout_sec passes"""
+        model = self._model('wait_for')
+        model.clock.sleep(delay_sec)
+        start = model.clock.now()
+        while not model.is_stable(bitmask):
+            if timeout_sec and model.clock.now() - start > timeout_sec:
+                break
+            model.clock.sleep(1)
@@ -1,3 +1,16 @@
+import time
+
+import numpy as np
+
+try:
+    from QuDAP.misc.io_trace import traced_commands
+    from QuDAP.misc.visa_registry import session_lock
+except ImportError:
+    from misc.io_trace import traced_commands
+    from misc.visa_registry import session_lock
+
+
+@traced_commands
 class RIGOL_COMMAND:
     """
     RIGOL DSA800 Series Spectrum Analyzer Command Class
@@ -405,8 +418,9 @@ class RIGOL_COMMAND:
     def get_trace_data(self, instrument, trace: str) -> str:
         """Read trace data (TRACE1|TRACE2|TRACE3|TRACE4)"""
         if trace in ['TRACE1', 'TRACE2', 'TRACE3', 'TRACE4']:
-            instrument.write(f':TRACE:DATA? {trace}')
-            raw_data = instrument.read_raw()
+            with session_lock(instrument):
+                instrument.write(f':TRACE:DATA? {trace}')
+                raw_data = instrument.read_raw()
             header_len = 2 + int(chr(raw_data[1]))
             data_bytes = raw_data[header_len:-1]
             num_points = len(data_bytes) // 4
@@ -414,6 +428,17 @@ class RIGOL_COMMAND:
             trace = struct.unpack(f'<{num_points}f', data_bytes)
             return trace
 
+    def get_trace_array(self, instrument, trace: str = 'TRACE1') -> np.ndarray:
+        """Read REAL format trace data (TRACE1|TRACE2|TRACE3|TRACE4) as a float32 array"""
+        if trace in ['TRACE1', 'TRACE2', 'TRACE3', 'TRACE4']:
+            with session_lock(instrument):
+                instrument.write(f':TRACE:DATA? {trace}')
+                raw_data = instrument.read_raw()
+            header_len = 2 + int(chr(raw_data[1]))
+            data_bytes = raw_data[header_len:-1]
+            num_points = len(data_bytes) // 4
+            return np.frombuffer(data_bytes, dtype='<f4', count=num_points).astype(np.float32)
+
     def clear_all_traces(self, instrument):
         """Clear all traces"""
         instrument.write(':TRACe:CLEar:ALL')
@@ -1493,6 +1518,312 @@ class RIGOL_COMMAND:
         """Preset status registers"""
         instrument.write(':STATus:PRESet')
 
+
+# ========================================================================================
+# Capture Engine
+# ========================================================================================
+
+class RigolCaptureEngine:
+    """
+    Sweep-synchronized trace capture
+
+    Puts the analyzer in single-sweep mode with REAL trace transfer once, then each capture
+    triggers one sweep and blocks on *OPC? until that sweep has ended, with the VISA timeout
+    raised to the sweep time plus a margin; there is no fixed sleep. If *OPC? is not
+    answered, the engine falls back to waiting for the queried sweep time.
+
+    The frequency axis and the sweep time are queried once and cached until a setting is
+    changed through apply() or invalidate() is called. A trace whose point count differs
+    from the cached axis also rebuilds it. Changes made on the front panel are not seen.
+
+    Powers are float32 arrays (dBm); the frequency axis is float64 (Hz), since float32
+    cannot resolve GHz frequencies to the bin spacing.
+
+    capture_averaged() lets the analyzer average N sweeps in a VIDeoavg/POWeravg trace and
+    transfers only the final trace. The average counter is polled while the sweeps run, so
+    a stop request aborts them. If the analyzer does not reach N averages, on-instrument
+    averaging is switched off and None is returned, so the caller averages on the host.
+    """
+
+    # Trace modes in which the analyzer averages sweeps
+    AVERAGE_MODES = ('VIDeoavg', 'POWeravg')
+
+    # Settings after which the cached axis and sweep time are rebuilt
+    AXIS_SETTERS = ('set_center_frequency', 'set_frequency_span', 'set_start_frequency', 'set_stop_frequency',
+                    'set_full_span', 'set_sweep_points', 'set_sweep_time', 'set_sweep_time_auto',
+                    'set_resolution_bandwidth', 'set_video_bandwidth', 'reset')
+
+    def __init__(self, instrument, command=None, trace='TRACE1', margin=2.0, settle=0.05):
+        """
+        Args:
+            instrument: Opened PyVISA resource of the analyzer
+            command: RIGOL_COMMAND instance (a new one by default)
+            trace: Trace to read (TRACE1|TRACE2|TRACE3|TRACE4)
+            margin: Seconds added to the sweep time for the *OPC? timeout
+            settle: Extra wait after the sweep time when *OPC? is not used
+        """
+        self.instrument = instrument
+        self.cmd = command or RIGOL_COMMAND()
+        self.trace = trace
+        self.margin = margin
+        self.settle = settle
+        self.use_opc = True
+        self.prepared = False
+        self.previous_continuous = None
+        self._axis = None
+        self._sweep_time = None
+        self.onboard_averaging = True
+        self.average_mode = None
+        self.average_count = 1
+
+    # ========================================================================================
+    # Setup
+    # ========================================================================================
+
+    def prepare(self):
+        """Switch to single sweeps and REAL trace format (once)"""
+        if self.prepared:
+            return
+        try:
+            self.previous_continuous = self.cmd.get_continuous_sweep(self.instrument).strip()
+        except Exception:
+            self.previous_continuous = None
+        self.cmd.set_continuous_sweep(self.instrument, 'OFF')
+        self.cmd.set_data_format(self.instrument, 'REAL')
+        self.prepared = True
+
+    def release(self):
+        """Restore the WRITe trace mode and the continuous sweep state found by prepare()"""
+        if not self.prepared:
+            return
+        try:
+            self.set_averaging(1)
+        except Exception as e:
+            print(f"⚠ Could not restore trace mode: {e}")
+        if self.previous_continuous in ('1', 'ON'):
+            try:
+                self.cmd.set_continuous_sweep(self.instrument, 'ON')
+            except Exception as e:
+                print(f"⚠ Could not restore continuous sweep: {e}")
+        self.prepared = False
+
+    def invalidate(self):
+        """Forget the cached frequency axis and sweep time"""
+        self._axis = None
+        self._sweep_time = None
+
+    def apply(self, setter, *args):
+        """
+        Call a RIGOL_COMMAND setter and invalidate the cache if it affects the axis or sweep time
+
+        Args:
+            setter: Method name, e.g. 'set_center_frequency'
+            *args: Arguments after the instrument, e.g. (2.4, 'GHz')
+        """
+        result = getattr(self.cmd, setter)(self.instrument, *args)
+        if setter in self.AXIS_SETTERS:
+            self.invalidate()
+        if setter == 'reset':
+            self.prepared = False
+            self.average_mode = None
+            self.average_count = 1
+        return result
+
+    # ========================================================================================
+    # Cached Settings
+    # ========================================================================================
+
+    def sweep_time(self):
+        """Sweep time in seconds (cached)"""
+        if self._sweep_time is None:
+            self._sweep_time = float(self.cmd.get_sweep_time(self.instrument))
+        return self._sweep_time
+
+    def frequency_axis(self, num_points=None):
+        """
+        Frequency axis in Hz (cached)
+
+        Args:
+            num_points: Point count of the trace; rebuilds the axis if it differs from the cache
+        """
+        if self._axis is None or (num_points is not None and len(self._axis) != num_points):
+            start_freq = float(self.cmd.get_start_frequency(self.instrument))
+            stop_freq = float(self.cmd.get_stop_frequency(self.instrument))
+            if num_points is None:
+                num_points = int(float(self.cmd.get_sweep_points(self.instrument)))
+            self._axis = np.linspace(start_freq, stop_freq, num_points)
+            self._axis.flags.writeable = False
+        return self._axis
+
+    # ========================================================================================
+    # Capture
+    # ========================================================================================
+
+    def wait_for_sweep(self, started, sweeps=1):
+        """
+        Block until the sweep(s) triggered at time.monotonic() == started have ended
+
+        Args:
+            started: time.monotonic() value when the sweep was triggered
+            sweeps: Number of sweeps run by the trigger (averaging)
+
+        Returns:
+            bool: True if the end was confirmed by *OPC?, False if it was timed
+        """
+        sweep_time = self.sweep_time() * sweeps
+        if self.use_opc:
+            previous_timeout = self.instrument.timeout
+            self.instrument.timeout = int((sweep_time + self.margin) * 1000)
+            try:
+                self.cmd.query_operation_complete(self.instrument)
+                return True
+            except Exception as e:
+                print(f"⚠ *OPC? not answered ({e}), timing sweeps instead")
+                self.use_opc = False
+                try:
+                    self.instrument.clear()
+                except Exception:
+                    pass
+            finally:
+                self.instrument.timeout = previous_timeout
+        remaining = sweep_time + self.settle - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        return False
+
+    def capture(self, skip=0):
+        """
+        Trigger one sweep, wait for its end and read the trace
+
+        Args:
+            skip: Number of leading points to drop
+
+        Returns:
+            Tuple (frequencies, powers): float64 Hz and float32 dBm arrays
+        """
+        self.prepare()
+        if self.average_mode is not None:
+            self.set_averaging(1)
+        started = time.monotonic()
+        self.cmd.single_sweep(self.instrument)
+        self.wait_for_sweep(started)
+        powers = self.cmd.get_trace_array(self.instrument, self.trace)
+        frequencies = self.frequency_axis(len(powers))
+        return frequencies[skip:], powers[skip:]
+
+    # ========================================================================================
+    # On-instrument Averaging
+    # ========================================================================================
+
+    def set_averaging(self, count, mode='VIDeoavg'):
+        """
+        Configure the trace for on-instrument averaging (count <= 1 returns it to WRITe)
+
+        Args:
+            count: Number of sweeps averaged (1 to 1000)
+            mode: VIDeoavg (log power, same as averaging dBm values on the host) or POWeravg
+        """
+        trace_number = int(self.trace[-1])
+        if count <= 1:
+            if self.average_mode is not None:
+                self.cmd.set_trace_mode(self.instrument, trace_number, 'WRITe')
+            self.average_mode = None
+            self.average_count = 1
+            return
+        if mode not in self.AVERAGE_MODES:
+            raise ValueError(f"Averaging mode must be one of {self.AVERAGE_MODES}")
+        if not 1 <= count <= 1000:
+            raise ValueError("Average count must be between 1 and 1000")
+        if (mode, count) != (self.average_mode, self.average_count):
+            self.cmd.set_trace_mode(self.instrument, trace_number, mode)
+            self.cmd.set_trace_average_count(self.instrument, count)
+            self.average_mode = mode
+            self.average_count = count
+
+    def _average_progress(self):
+        """Number of sweeps averaged so far"""
+        return int(float(self.cmd.get_current_average_count(self.instrument)))
+
+    def wait_for_average(self, count, should_stop=None, poll_interval=0.5):
+        """
+        Poll the average counter until count sweeps are averaged or the analyzer stops sweeping
+
+        Args:
+            count: Number of sweeps to wait for
+            should_stop: Callable returning True to abort the sweeps (:ABORt)
+            poll_interval: Maximum time between two counter polls in seconds
+
+        Returns:
+            Number of sweeps averaged, or None if aborted by should_stop
+        """
+        sweep_time = self.sweep_time()
+        interval = min(poll_interval, max(sweep_time, 0.05))
+        done = self._average_progress()
+        last_change = time.monotonic()
+        while done < count:
+            if should_stop is not None and should_stop():
+                self.cmd.abort_sweep(self.instrument)
+                return None
+            time.sleep(interval)
+            current = self._average_progress()
+            if current != done:
+                done, last_change = current, time.monotonic()
+            elif time.monotonic() - last_change > sweep_time + self.margin:
+                # No sweep finished within a sweep time: the analyzer stopped
+                break
+        return done
+
+    def capture_averaged(self, count, skip=0, mode='VIDeoavg', should_stop=None):
+        """
+        Average count sweeps on the analyzer and read only the final trace
+
+        One trigger normally runs all count sweeps in single-sweep mode; if the analyzer stops
+        earlier, further sweeps are triggered until the average count is reached.
+
+        Args:
+            count: Number of sweeps averaged
+            skip: Number of leading points to drop
+            mode: Averaging trace mode (VIDeoavg|POWeravg)
+            should_stop: Callable returning True to abort the sweeps, polled while they run
+
+        Returns:
+            Tuple (frequencies, powers), or None if stopped or if the analyzer did not average
+            (the caller should then average on the host; later calls return None right away)
+        """
+        if count <= 1:
+            return self.capture(skip)
+        if not self.onboard_averaging:
+            return None
+        self.prepare()
+        try:
+            self.set_averaging(count, mode)
+            self.cmd.clear_average(self.instrument)
+            self.cmd.single_sweep(self.instrument)
+            done = self.wait_for_average(count, should_stop)
+            for _ in range(count):
+                if done is None or done >= count:
+                    break
+                self.cmd.single_sweep(self.instrument)
+                previous, done = done, self.wait_for_average(count, should_stop)
+                if done is not None and done <= previous:
+                    break
+            if done is None:
+                return None
+            if done < count:
+                raise RuntimeError(f"analyzer stopped at {done}/{count} averages")
+        except Exception as e:
+            print(f"⚠ On-instrument averaging unavailable ({e}), averaging on the host")
+            self.onboard_averaging = False
+            try:
+                self.set_averaging(1)
+            except Exception:
+                self.average_mode = None
+                self.average_count = 1
+            return None
+        powers = self.cmd.get_trace_array(self.instrument, self.trace)
+        frequencies = self.frequency_axis(len(powers))
+        return frequencies[skip:], powers[skip:]
+
 # ========================================================================================
 # Example Usage
 # ========================================================================================
@@ -1,5 +1,52 @@
-import pyvisa
+"""
+VISA instrument discovery
+
+Every resource is probed in its own session on a bounded thread pool, so dead
+GPIB addresses and silent serial ports time out side by side instead of one
+after the other. The result of each probe (identification, the ID command that
+worked and the termination/baud settings) is kept in a JSON cache: a later scan
+tries the known-good command first, and resources that did not answer are only
+probed again once their entry is older than dead_retry (or on a full rescan).
+The cache file defaults to ~/.qudap/visa_discovery.json and can be moved with
+the QUDAP_VISA_CACHE environment variable. Resources another page holds open
+through the VISA registry are not probed (that would retune a live session),
+they are reported from the cache.
+"""
+
+import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pyvisa
+
+try:
+    from QuDAP.misc.visa_registry import session_lock, visa_registry
+except ImportError:
+    from misc.visa_registry import session_lock, visa_registry
+
+# Identification commands in the order they are tried
+ID_COMMANDS = [
+    "*IDN?",  # Standard SCPI (most modern instruments)
+    "ID?",  # Older instruments like SR830, DSP7265
+    "ID",  # Some instruments without "?"
+    "*ID?",  # Some HP/Agilent instruments
+    "IDENTIFY?",  # Some custom implementations
+    "MODEL?",  # Some older instruments
+    "I",  # Very old instruments
+    "++ver",  # Prologix GPIB-USB controllers
+]
+# Commands answered by a plain read after a write
+WRITE_ID_COMMANDS = [
+    ("V", "Firmware version request"),  # Some instruments
+]
+
+DISCOVERY_CACHE_FILE = os.environ.get('QUDAP_VISA_CACHE') or \
+    os.path.join(os.path.expanduser('~'), '.qudap', 'visa_discovery.json')
+# Seconds before a resource that did not identify itself is probed again
+DEAD_RETRY_S = 3600.0
+MAX_DISCOVERY_WORKERS = 8
 
 
 def categorize_instrument(resource_name):
@@ -18,25 +65,30 @@ def categorize_instrument(resource_name):
         return "Other"
 
 
-def query_instrument_id(inst):
+def query_instrument_id(inst, preferred=None, id_commands=None):
     """
     Try multiple identification commands to support various instruments
-    Returns: (id_string, command_used)
-    """
 
-    # List of common identification commands
-    id_commands = [
-        "*IDN?",  # Standard SCPI (most modern instruments)
-        "ID?",  # Older instruments like SR830, DSP7265
-        "ID",  # Some instruments without "?"
-        "*ID?",  # Some HP/Agilent instruments
-        "IDENTIFY?",  # Some custom implementations
-        "MODEL?",  # Some older instruments
-        "I",  # Very old instruments
-        "++ver",  # Prologix GPIB-USB controllers
-    ]
+    Args:
+        inst: Opened PyVISA resource
+        preferred: Command known to work with this resource, tried first
+        id_commands: Query commands to try (defaults to ID_COMMANDS)
 
-    for cmd in id_commands:
+    Returns: (id_string, command_used)
+    """
+    commands = list(id_commands or ID_COMMANDS)
+    write_commands = [cmd for cmd, _ in WRITE_ID_COMMANDS]
+    if preferred in write_commands:
+        write_commands.remove(preferred)
+        write_commands.insert(0, preferred)
+        # A write-only instrument answers the write first, the queries only waste timeouts
+        commands = []
+    elif preferred:
+        if preferred in commands:
+            commands.remove(preferred)
+        commands.insert(0, preferred)
+
+    for cmd in commands:
         try:
             # Try to query with this command
             response = inst.query(cmd).strip()
@@ -48,43 +100,287 @@ def query_instrument_id(inst):
         except pyvisa.errors.VisaIOError:
             # This command didn't work, try next one
             continue
-        except Exception as e:
+        except Exception:
             # Some other error, continue
             continue
 
     # If none of the queries worked, try write-only commands
-    write_commands = [
-        ("V", "Firmware version request"),  # Some instruments
-    ]
-
-    for cmd, description in write_commands:
+    for cmd in write_commands:
         try:
-            inst.write(cmd)
-            time.sleep(0.1)  # Wait for response
-            response = inst.read().strip()
+            with session_lock(inst):
+                inst.write(cmd)
+                time.sleep(0.1)  # Wait for response
+                response = inst.read().strip()
             if response:
                 return (response, cmd)
         except:
             continue
 
+    if preferred in write_commands:
+        # The known-good write command failed, fall back to the full query list
+        return query_instrument_id(inst, id_commands=id_commands)
+
     return (None, None)
 
 
-def detect_all_instruments(timeout=2000, verbose=False):
+# ========================================================================================
+# Discovery Cache
+# ========================================================================================
+
+class DiscoveryCache:
+    """
+    Persistent resource -> probe result map (thread safe)
+    """
+
+    def __init__(self, filename=DISCOVERY_CACHE_FILE, dead_retry=DEAD_RETRY_S):
+        """
+        Args:
+            filename: JSON file the cache is kept in (None keeps it in memory only)
+            dead_retry: Seconds before a resource without ID response is probed again
+        """
+        self.filename = filename
+        self.dead_retry = dead_retry
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Read the cache file; a missing or damaged file gives an empty cache"""
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r') as file:
+                entries = json.load(file)
+            if isinstance(entries, dict):
+                with self.lock:
+                    self.entries = entries
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring VISA discovery cache {self.filename}: {e}")
+
+    def save(self):
+        """Write the cache file (atomically, through a temporary file)"""
+        if not self.filename:
+            return
+        with self.lock:
+            entries = dict(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+            temporary = f"{self.filename}.tmp"
+            with open(temporary, 'w') as file:
+                json.dump(entries, file, indent=1)
+            os.replace(temporary, self.filename)
+        except OSError as e:
+            print(f"⚠ Could not save VISA discovery cache {self.filename}: {e}")
+
+    def get(self, resource):
+        with self.lock:
+            entry = self.entries.get(resource)
+            return dict(entry) if entry else None
+
+    def update(self, info):
+        """Remember the probe result of one resource"""
+        entry = {key: info.get(key) for key in ('id', 'command', 'state', 'read_termination',
+                                                 'write_termination', 'baud_rate', 'checked')}
+        with self.lock:
+            self.entries[info['resource']] = entry
+
+    def forget(self, resource=None):
+        """Drop one resource or the whole cache"""
+        with self.lock:
+            if resource is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(resource, None)
+
+    def prune(self, resources):
+        """Drop the resources VISA no longer lists"""
+        with self.lock:
+            for resource in set(self.entries) - set(resources):
+                del self.entries[resource]
+
+    def skip_probe(self, entry):
+        """Check whether a cached entry is a recent 'no answer' that need not be probed again"""
+        return bool(entry) and entry.get('state') != 'connected' and \
+            time.time() - (entry.get('checked') or 0) < self.dead_retry
+
+
+# ========================================================================================
+# Discovery
+# ========================================================================================
+
+def probe_resource(rm, resource, timeout=2000, known=None, id_commands=None):
+    """
+    Open one resource in its own session and identify it
+
+    Args:
+        rm: PyVISA ResourceManager
+        resource: VISA resource string
+        timeout: Timeout in milliseconds for each query
+        known: Cached entry of this resource (its command and settings are tried first)
+        id_commands: Query commands to try (defaults to ID_COMMANDS)
+
+    Returns:
+        dict: resource, id, command, state ('connected', 'silent' or 'error'), status,
+            error, read_termination, write_termination, baud_rate, checked, cached, changed
+    """
+    known = known or {}
+    info = {
+        "resource": resource,
+        "id": "Unknown",
+        "command": None,
+        "state": "silent",
+        "status": "Not responding",
+        "error": None,
+        "read_termination": known.get('read_termination', '\n'),
+        "write_termination": known.get('write_termination', '\n'),
+        "baud_rate": known.get('baud_rate'),
+        "checked": time.time(),
+        "cached": False,
+        "changed": False,
+        "in_use": False,
+    }
+
+    inst = None
+    try:
+        # Connect to instrument
+        inst = rm.open_resource(resource)
+        inst.timeout = timeout
+
+        # Set read/write termination (helps with some instruments)
+        try:
+            inst.read_termination = info["read_termination"]
+            inst.write_termination = info["write_termination"]
+            if info["baud_rate"] and hasattr(inst, 'baud_rate'):
+                inst.baud_rate = info["baud_rate"]
+        except:
+            pass
+
+        # Try to identify the instrument
+        idn, cmd_used = query_instrument_id(inst, known.get('command'), id_commands)
+
+        if idn:
+            info["id"] = idn
+            info["command"] = cmd_used
+            info["state"] = "connected"
+            info["status"] = "Connected"
+            info["changed"] = bool(known) and (idn != known.get('id') or cmd_used != known.get('command'))
+        else:
+            info["status"] = "Connected (No ID response)"
+            info["changed"] = known.get('state') == 'connected'
+        info["baud_rate"] = getattr(inst, 'baud_rate', None)
+
+    except Exception as e:
+        info["state"] = "error"
+        info["status"] = f"Error: {str(e)[:50]}"
+        info["error"] = str(e)
+
+    finally:
+        if inst is not None:
+            try:
+                inst.close()
+            except Exception:
+                pass
+
+    return info
+
+
+def _cached_info(resource, entry, in_use=False):
+    """Probe result rebuilt from a cache entry"""
+    state = entry.get('state') or ('connected' if in_use else 'silent')
+    status = {"connected": "Connected", "silent": "Connected (No ID response)"}.get(state, "Error (cached)")
+    return {"resource": resource, "id": entry.get('id') or "Unknown", "command": entry.get('command'),
+            "state": state, "status": status, "error": None,
+            "read_termination": entry.get('read_termination'), "write_termination": entry.get('write_termination'),
+            "baud_rate": entry.get('baud_rate'), "checked": entry.get('checked'), "cached": True, "changed": False,
+            "in_use": in_use}
+
+
+def scan_resources(resources, rm=None, timeout=2000, max_workers=MAX_DISCOVERY_WORKERS, cache=None,
+                   rescan=False, id_commands=None, on_result=None, should_stop=None):
+    """
+    Probe resources concurrently, one session per resource
+
+    Args:
+        resources: VISA resource strings
+        rm: PyVISA ResourceManager (defaults to the VISA registry's)
+        timeout: Timeout in milliseconds for each query
+        max_workers: Upper bound on the number of resources probed at the same time
+        cache: DiscoveryCache (None probes everything and remembers nothing)
+        rescan: Probe resources the cache marks as not answering as well
+        id_commands: Query commands to try (defaults to ID_COMMANDS)
+        on_result: Called as on_result(info, done, total) in the calling thread after each resource
+        should_stop: Callable returning True to cancel the probes not started yet
+
+    Returns:
+        dict: resource -> probe result (see probe_resource), in the order of resources
+    """
+    rm = rm or visa_registry.resource_manager()
+    resources = list(resources)
+    results = {}
+    pending = []
+
+    for resource in resources:
+        entry = cache.get(resource) if cache else None
+        if visa_registry.in_use(resource):
+            results[resource] = _cached_info(resource, entry or {}, in_use=True)
+        elif not rescan and cache and cache.skip_probe(entry):
+            results[resource] = _cached_info(resource, entry)
+        else:
+            pending.append((resource, entry))
+
+    total = len(resources)
+    done = 0
+    for info in list(results.values()):
+        done += 1
+        if on_result:
+            on_result(info, done, total)
+
+    if pending:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))),
+                                      thread_name_prefix='visa-discovery')
+        try:
+            futures = {executor.submit(probe_resource, rm, resource, timeout, entry, id_commands): resource
+                       for resource, entry in pending}
+            for future in as_completed(futures):
+                info = future.result()
+                results[futures[future]] = info
+                if cache:
+                    cache.update(info)
+                done += 1
+                if on_result:
+                    on_result(info, done, total)
+                if should_stop and should_stop():
+                    break
+        finally:
+            # Probes already running finish on their own, the queued ones are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if cache:
+        cache.prune(resources)
+        cache.save()
+
+    return {resource: results[resource] for resource in resources if resource in results}
+
+
+def detect_all_instruments(timeout=2000, verbose=False, max_workers=MAX_DISCOVERY_WORKERS, use_cache=True,
+                           rescan=False):
     """
     Detect instruments across all connection types with support for various ID commands
 
     Args:
         timeout: Timeout in milliseconds for each instrument query
         verbose: Show detailed information about query attempts
+        max_workers: Number of resources probed at the same time
+        use_cache: Use and update the discovery cache (DISCOVERY_CACHE_FILE)
+        rescan: Probe resources the cache marks as not answering as well
     """
 
-    rm = pyvisa.ResourceManager()
+    rm = visa_registry.resource_manager()
     print(f"VISA Backend: {rm}")
 
     try:
         # Get all resources
-        resources = rm.list_resources()
+        resources = visa_registry.list_resources()
 
         if not resources:
             print("No instruments found!")
@@ -100,54 +396,26 @@ def detect_all_instruments(timeout=2000, verbose=False):
             "Other": []
         }
 
-        for resource in resources:
-            conn_type = categorize_instrument(resource)
-
-            instrument_info = {
-                "resource": resource,
-                "id": "Unknown",
-                "command": None,
-                "status": "Not responding"
-            }
-
-            if verbose:
-                print(f"Trying {resource}...")
-
-            try:
-                # Connect to instrument
-                inst = rm.open_resource(resource)
-                inst.timeout = timeout
-
-                # Set read/write termination (helps with some instruments)
-                try:
-                    inst.read_termination = '\n'
-                    inst.write_termination = '\n'
-                except:
-                    pass
-
-                # Try to identify the instrument
-                idn, cmd_used = query_instrument_id(inst)
-
-                if idn:
-                    instrument_info["id"] = idn
-                    instrument_info["command"] = cmd_used
-                    instrument_info["status"] = "Connected"
-
-                    if verbose:
-                        print(f"  ✓ Responded to '{cmd_used}': {idn}")
-                else:
-                    instrument_info["status"] = "Connected (No ID response)"
-                    if verbose:
-                        print(f"  ✗ No valid ID response")
-
-                inst.close()
-
-            except Exception as e:
-                instrument_info["status"] = f"Error: {str(e)[:50]}"
-                if verbose:
-                    print(f"  ✗ Error: {e}")
-
-            instruments_by_type[conn_type].append(instrument_info)
+        def report(info, done, total):
+            if not verbose:
+                return
+            source = " (in use)" if info["in_use"] else \
+                " (cached)" if info["cached"] else (" (changed)" if info["changed"] else "")
+            if info["state"] == "connected":
+                print(f"  [{done}/{total}] ✓ {info['resource']} responded to '{info['command']}'{source}: "
+                      f"{info['id']}")
+            elif info["state"] == "silent":
+                print(f"  [{done}/{total}] ✗ {info['resource']}: no valid ID response{source}")
+            else:
+                print(f"  [{done}/{total}] ✗ {info['resource']}: {info['error'] or info['status']}")
+
+        cache = DiscoveryCache() if use_cache else None
+        start = time.perf_counter()
+        results = scan_resources(resources, rm=rm, timeout=timeout, max_workers=max_workers, cache=cache,
+                                 rescan=rescan, on_result=report)
+
+        for resource, instrument_info in results.items():
+            instruments_by_type[categorize_instrument(resource)].append(instrument_info)
 
         # Display results organized by connection type
         total_found = 0
@@ -164,12 +432,14 @@ def detect_all_instruments(timeout=2000, verbose=False):
                         print(f"ID:       {inst['id']}")
                         total_found += 1
                     elif inst['status'] == "Connected (No ID response)":
-                        print(f"Note:     Instrument connected but doesn't respond to ID queries")
+                        print("Note:     Instrument connected but doesn't respond to ID queries")
                         total_found += 1
 
         # Summary
+        cached = sum(info["cached"] for info in results.values())
         print("\n" + "=" * 70)
-        print(f"Summary: {total_found} instrument(s) responding")
+        print(f"Summary: {total_found} instrument(s) responding "
+              f"({len(results) - cached} probed, {cached} from cache, {time.perf_counter() - start:.1f} s)")
         print("=" * 70)
 
         return instruments_by_type
@@ -188,7 +458,7 @@ def instrument_commands(resource_name, custom_commands=None):
         custom_commands: Optional list of additional commands to try
     """
 
-    rm = pyvisa.ResourceManager()
+    rm = visa_registry.resource_manager()
 
     # Default commands to test
     test_commands = [
@@ -261,6 +531,8 @@ if __name__ == "__main__":
     # Method 1: Auto-detect all instruments with multiple ID command support
     print("Auto-detecting instruments...\n")
     instruments = detect_all_instruments(verbose=False)
+    # A full rescan ignores the cached 'no answer' entries
+    # instruments = detect_all_instruments(rescan=True)
     print(instruments)
     # Method 2: Test specific instrument with all commands (uncomment to use)
     # instrument_commands("GPIB0::12::INSTR")
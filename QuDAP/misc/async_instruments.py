@@ -0,0 +1,351 @@
+"""
+Asyncio orchestration layer for PPMS and VISA instruments
+
+Wraps the MultiPyVu client (through ThreadSafePPMSCommands and its
+PPMSCommandWorker) and PyVISA resources (through the existing driver
+classes) in awaitable operations, so a worker can wait for the magnet, the
+temperature and the instruments at the same time instead of one after the
+other. Every instrument keeps a single I/O thread, so calls on the same
+resource stay serialized while different resources run in parallel.
+
+Cancelling a task returns control immediately. A call that has not reached
+its instrument yet is dropped; a call that is already on the bus finishes in
+the background (VISA and MultiPyVu calls cannot be interrupted).
+
+QThread workers can be ported one at a time:
+
+    def run(self):
+        run_until_stopped(self.measure(), should_stop=lambda: not self.running)
+
+    async def measure(self):
+        ppms = AsyncPPMS(self.safe_commands)
+        nv = AsyncInstrument(self.keithley_2182nv, KEITHLEY_2182_COMMAND(), name='2182A')
+        await ppms.set_field(1000, 100)
+        readings = await gather_readings(
+            field=ppms.wait_for_field(1000, tolerance=1),
+            temperature=ppms.read_temperature(),
+        )
+        voltage = await nv.call('read_voltage', 1)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from QuDAP.misc.logger import logger
+    from QuDAP.misc.ppms_command_worker import PPMSCommandWorker
+    from QuDAP.misc.ppms_telemetry import READERS
+except ImportError:
+    from misc.logger import logger
+    from misc.ppms_command_worker import PPMSCommandWorker
+    from misc.ppms_telemetry import READERS
+
+
+# ========================================================================================
+# Helpers
+# ========================================================================================
+
+async def _await_future(future, timeout, shared=False):
+    """
+    Await a concurrent.futures.Future from a worker thread
+
+    Args:
+        future: Future returned by a worker
+        timeout: Timeout in seconds (None waits forever)
+        shared: The future is shared with other callers (coalesced read); cancelling this
+            caller must not cancel it
+
+    Raises:
+        TimeoutError: If the future did not finish in time
+    """
+    wrapped = asyncio.wrap_future(future)
+    if shared:
+        wrapped = asyncio.shield(wrapped)
+    try:
+        return await asyncio.wait_for(wrapped, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Command timeout after {timeout} seconds")
+
+
+async def gather_readings(**awaitables):
+    """
+    Run named awaitables concurrently
+
+    If one of them fails, the others are cancelled and the error is raised.
+
+    Args:
+        **awaitables: name -> coroutine
+
+    Returns:
+        dict: name -> result
+    """
+    tasks = {name: asyncio.ensure_future(awaitable) for name, awaitable in awaitables.items()}
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return {name: task.result() for name, task in tasks.items()}
+
+
+async def _watch_stop(main_task, should_stop, poll_interval):
+    """Cancel main_task as soon as should_stop() becomes true"""
+    while not main_task.done():
+        if should_stop():
+            main_task.cancel()
+            return
+        await asyncio.sleep(poll_interval)
+
+
+def run_until_stopped(coroutine, should_stop=None, poll_interval=0.1):
+    """
+    Run an orchestration coroutine on a new event loop in the calling thread (e.g. QThread.run)
+
+    Args:
+        coroutine: Main coroutine of the measurement
+        should_stop: Callable polled every poll_interval; the coroutine is cancelled when it
+            returns True (e.g. lambda: not self.running)
+        poll_interval: Polling interval of should_stop in seconds
+
+    Returns:
+        Result of the coroutine, or None if it was stopped
+    """
+
+    async def _main():
+        main_task = asyncio.ensure_future(coroutine)
+        watcher = asyncio.ensure_future(_watch_stop(main_task, should_stop, poll_interval)) if should_stop else None
+        try:
+            return await main_task
+        except asyncio.CancelledError:
+            logger.info("Measurement orchestration stopped")
+            return None
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    return asyncio.run(_main())
+
+
+# ========================================================================================
+# PPMS
+# ========================================================================================
+
+class AsyncPPMS:
+    """
+    Awaitable PPMS operations on top of ThreadSafePPMSCommands
+
+    Commands go through the same PPMSCommandWorker and telemetry cache as the blocking
+    wrapper, so blocking and async code can share one client while a worker is ported.
+    """
+
+    def __init__(self, safe_commands):
+        """
+        Args:
+            safe_commands: ThreadSafePPMSCommands instance of the connected client
+        """
+        self.commands = safe_commands
+        self.client = safe_commands.client
+        self.telemetry = safe_commands.telemetry
+        self.worker = PPMSCommandWorker.for_client(self.client)
+
+    async def _read(self, quantity, timeout, max_age):
+        """Cached or coalesced reading in the canonical format"""
+        cached = self.telemetry.cached(quantity, max_age)
+        if cached is not None:
+            return cached
+        generation = self.telemetry.generation
+        future = self.worker.submit(READERS[quantity], (self.client,), coalesce_key=quantity)
+        value = await _await_future(future, timeout, shared=True)
+        self.telemetry.store(quantity, value, generation)
+        return value
+
+    async def read_temperature(self, timeout=10, max_age=0):
+        """
+        Read the temperature
+
+        Returns:
+            Tuple (temperature, status, unit)
+
+        Raises:
+            TimeoutError: If the PPMS did not answer in time
+        """
+        return await self._read('temperature', timeout, max_age)
+
+    async def read_field(self, timeout=10, max_age=0):
+        """
+        Read the magnetic field
+
+        Returns:
+            Tuple (field, status, unit)
+
+        Raises:
+            TimeoutError: If the PPMS did not answer in time
+        """
+        return await self._read('field', timeout, max_age)
+
+    async def get_chamber_status(self, timeout=10, max_age=0):
+        """Read the chamber status string"""
+        return await self._read('chamber', timeout, max_age)
+
+    async def set_temperature(self, set_point, temp_rate, timeout=30):
+        """
+        Set the temperature set point (K) and rate (K/min)
+
+        A set point still queued when the caller is cancelled is never sent.
+        """
+        future = self.worker.submit(self.client.set_temperature,
+                                    (set_point, temp_rate, self.client.temperature.approach_mode.fast_settle))
+        try:
+            await _await_future(future, timeout)
+        finally:
+            self.telemetry.invalidate('temperature')
+        print(f"✓ Temperature set to {set_point} K")
+
+    async def set_field(self, set_point, field_rate, timeout=30):
+        """
+        Set the field set point (Oe) and rate (Oe/s)
+
+        A set point still queued when the caller is cancelled is never sent.
+        """
+        future = self.worker.submit(self.client.set_field,
+                                    (set_point, field_rate, self.client.field.approach_mode.linear,
+                                     self.client.field.driven_mode.driven))
+        try:
+            await _await_future(future, timeout)
+        finally:
+            self.telemetry.invalidate('field')
+        print(f"✓ Field set to {set_point} Oe")
+
+    async def _wait_for(self, read, label, unit, target, tolerance, max_wait, check_interval, statuses):
+        """Poll a reading until it is within tolerance (and in one of statuses, if given)"""
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < max_wait:
+            try:
+                value, status, _ = await read(timeout=10)
+            except (Exception, SystemExit) as e:
+                logger.error(f"⚠ Failed to read {label}: {e}")
+                await asyncio.sleep(check_interval)
+                continue
+
+            if abs(value - target) <= tolerance and (statuses is None or status in statuses):
+                logger.success(f"✓ {label.capitalize()} stabilized at {value:.2f} {unit}")
+                return True
+            await asyncio.sleep(check_interval)
+
+        logger.info(f"⚠ {label.capitalize()} wait timeout after {max_wait}s")
+        return False
+
+    async def wait_for_temperature(self, target_temp, tolerance=0.5, max_wait=600, check_interval=2, statuses=None):
+        """
+        Wait for the temperature to reach the target
+
+        Args:
+            target_temp: Target temperature (K)
+            tolerance: Acceptable deviation (K)
+            max_wait: Maximum wait time (seconds)
+            check_interval: Time between checks (seconds)
+            statuses: Optional collection of accepted statuses (e.g. {'Stable'})
+
+        Returns:
+            bool: True if reached, False if timeout
+        """
+        return await self._wait_for(self.read_temperature, 'temperature', 'K', target_temp, tolerance,
+                                    max_wait, check_interval, statuses)
+
+    async def wait_for_field(self, target_field, tolerance=10, max_wait=600, check_interval=2, statuses=None):
+        """
+        Wait for the field to reach the target
+
+        Args:
+            target_field: Target field (Oe)
+            tolerance: Acceptable deviation (Oe)
+            max_wait: Maximum wait time (seconds)
+            check_interval: Time between checks (seconds)
+            statuses: Optional collection of accepted statuses (e.g. {'Holding (driven)'})
+
+        Returns:
+            bool: True if reached, False if timeout
+        """
+        return await self._wait_for(self.read_field, 'field', 'Oe', target_field, tolerance,
+                                    max_wait, check_interval, statuses)
+
+
+# ========================================================================================
+# VISA Instruments
+# ========================================================================================
+
+class AsyncInstrument:
+    """
+    Awaitable access to one PyVISA resource and its driver class
+
+    All calls on the resource run on one dedicated thread, in submission order.
+    """
+
+    _executors = {}
+    _executors_lock = threading.Lock()
+
+    def __init__(self, resource, driver=None, name=None, timeout=30):
+        """
+        Args:
+            resource: Opened PyVISA resource
+            driver: Optional driver instance (e.g. KEITHLEY_2182_COMMAND()) whose methods take
+                the resource as first argument
+            name: Name used for the I/O thread and in log messages
+            timeout: Default timeout of a call in seconds
+        """
+        self.resource = resource
+        self.driver = driver
+        self.name = name or getattr(resource, 'resource_name', 'VISA')
+        self.timeout = timeout
+        self.executor = self._executor_for(resource, self.name)
+
+    @classmethod
+    def _executor_for(cls, resource, name):
+        """Single I/O thread shared by every wrapper of the same resource"""
+        with cls._executors_lock:
+            entry = cls._executors.get(id(resource))
+            if entry is None or entry[0] is not resource:
+                entry = (resource, ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'{name} I/O'))
+                cls._executors[id(resource)] = entry
+            return entry[1]
+
+    @classmethod
+    def release(cls, resource):
+        """Stop the I/O thread of a resource (call before the resource is closed)"""
+        with cls._executors_lock:
+            entry = cls._executors.pop(id(resource), None)
+        if entry is not None:
+            entry[1].shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Run func(*args, **kwargs) on the I/O thread of the resource
+
+        Raises:
+            TimeoutError: If the call did not finish in time
+        """
+        future = self.executor.submit(func, *args, **kwargs)
+        return await _await_future(future, self.timeout if timeout is None else timeout)
+
+    async def write(self, command, timeout=None):
+        """Write a command"""
+        return await self.run(self.resource.write, command, timeout=timeout)
+
+    async def query(self, command, timeout=None):
+        """Query a command and return the answer"""
+        return await self.run(self.resource.query, command, timeout=timeout)
+
+    async def call(self, method, *args, timeout=None, **kwargs):
+        """
+        Call a driver method with the resource as first argument
+
+        Args:
+            method: Name of the driver method (e.g. 'read_voltage') or a callable taking the resource
+            *args: Further positional arguments of the method
+        """
+        func = getattr(self.driver, method) if isinstance(method, str) else method
+        return await self.run(func, self.resource, *args, timeout=timeout, **kwargs)
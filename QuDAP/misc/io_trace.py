@@ -0,0 +1,307 @@
+"""
+Opt-in instrument I/O tracing
+
+Records every write/query/read issued through a traced VISA resource, and
+every call of a traced command class method (SR7265_COMMAND,
+BNC_845M_COMMAND, RIGOL_COMMAND, KEPCO_COMMAND, BK_9129_COMMAND, ...),
+with its duration, byte count and error into a ring buffer, and keeps a
+log-spaced latency histogram per (instrument, command). The summary ranks
+commands by total time, so the slowest instrument interactions of a
+production run show up immediately; dump() writes everything to a JSON file.
+
+Tracing is off by default. It is enabled with io_tracer.enable() or by
+setting the QUDAP_IO_TRACE environment variable; when off, a traced
+resource or method costs a single flag check.
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+# Histogram bin edges: 0.1 ms * 2**n up to ~100 s
+HISTOGRAM_EDGES = tuple(1e-4 * 2 ** n for n in range(21))
+
+
+def _command_key(command):
+    """Histogram key of a command: the header without its arguments"""
+    if isinstance(command, bytes):
+        command = command.decode(errors='replace')
+    return str(command).strip().split(' ', 1)[0] if command is not None else ''
+
+
+def _size(value):
+    """Byte count of a command or an answer"""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+class LatencyHistogram:
+    """Count, total, max and log-spaced bins of the durations of one command"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.bytes = 0
+        self.bins = [0] * (len(HISTOGRAM_EDGES) + 1)
+
+    def add(self, duration, size=0, error=False):
+        self.count += 1
+        self.errors += bool(error)
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+        self.bytes += size
+        index = 0 if duration <= HISTOGRAM_EDGES[0] else \
+            min(len(HISTOGRAM_EDGES), int(math.log2(duration / HISTOGRAM_EDGES[0])) + 1)
+        self.bins[index] += 1
+
+    def percentile(self, fraction):
+        """Upper bin edge below which fraction of the durations lie"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.bins):
+            cumulative += count
+            if cumulative >= target:
+                return min(HISTOGRAM_EDGES[index], self.maximum) if index < len(HISTOGRAM_EDGES) else self.maximum
+        return self.maximum
+
+    def to_dict(self):
+        return {'count': self.count, 'errors': self.errors, 'total_s': self.total,
+                'mean_s': self.total / self.count if self.count else 0.0, 'max_s': self.maximum,
+                'p50_s': self.percentile(0.5), 'p95_s': self.percentile(0.95), 'bytes': self.bytes,
+                'bins': self.bins}
+
+
+class IOTracer:
+    """
+    Process-wide recorder of instrument I/O
+    """
+
+    def __init__(self, capacity=100000):
+        """
+        Args:
+            capacity: Number of individual records kept in the ring buffer
+        """
+        self.enabled = bool(os.environ.get('QUDAP_IO_TRACE'))
+        self.lock = threading.Lock()
+        self.records = deque(maxlen=capacity)
+        self.histograms = {}
+        self.context = threading.local()
+        self.started = time.time()
+
+    def enable(self, capacity=None):
+        """Start tracing (optionally with a new ring buffer size)"""
+        with self.lock:
+            if capacity:
+                self.records = deque(self.records, maxlen=capacity)
+            self.enabled = True
+
+    def disable(self):
+        """Stop tracing (the records are kept)"""
+        self.enabled = False
+
+    def reset(self):
+        """Drop all records and histograms"""
+        with self.lock:
+            self.records.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def current_operation(self):
+        """Traced command class method running in this thread, or None"""
+        return getattr(self.context, 'operation', None)
+
+    def record(self, instrument, kind, command, duration, size=0, error=None):
+        """
+        Record one interaction
+
+        Args:
+            instrument: Instrument name
+            kind: 'write', 'query', 'read', 'call', ...
+            command: Command string or method name
+            duration: Duration in seconds
+            size: Bytes written plus bytes read
+            error: Exception raised, if any
+        """
+        key = (instrument, kind, _command_key(command))
+        with self.lock:
+            self.records.append((time.time(), instrument, kind, str(command).strip()[:200], duration, size,
+                                 None if error is None else repr(error), self.current_operation()))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.add(duration, size, error is not None)
+
+    # ========================================================================================
+    # Reports
+    # ========================================================================================
+
+    def summary(self, top=15):
+        """
+        Text table of the commands with the largest total time
+
+        Args:
+            top: Number of rows
+
+        Returns:
+            str: Summary table
+        """
+        with self.lock:
+            rows = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)[:top]
+            # Method calls contain the bus I/O they issue, so only bus I/O adds up to the total
+            bus = [h for (_, kind, _), h in self.histograms.items() if kind != 'call']
+            total = sum(h.total for h in bus)
+            count = sum(h.count for h in bus)
+        lines = [f"Instrument I/O trace: {total:.1f} s of bus I/O in {count} operations",
+                 f"{'instrument':<22}{'kind':<7}{'command':<28}{'count':>8}{'total s':>10}{'mean ms':>10}"
+                 f"{'p95 ms':>10}{'max ms':>10}{'err':>5}"]
+        for (instrument, kind, command), h in rows:
+            lines.append(f"{instrument[:21]:<22}{kind:<7}{command[:27]:<28}{h.count:>8}{h.total:>10.2f}"
+                         f"{h.total / h.count * 1000:>10.1f}{h.percentile(0.95) * 1000:>10.1f}"
+                         f"{h.maximum * 1000:>10.1f}{h.errors:>5}")
+        return '\n'.join(lines)
+
+    def dump(self, filename):
+        """
+        Write histograms and the ring buffer to a JSON file
+
+        Args:
+            filename: Output path
+        """
+        with self.lock:
+            data = {
+                'started': self.started,
+                'dumped': time.time(),
+                'histogram_edges_s': HISTOGRAM_EDGES,
+                'commands': [{'instrument': instrument, 'kind': kind, 'command': command, **h.to_dict()}
+                             for (instrument, kind, command), h in self.histograms.items()],
+                'records': [{'time': t, 'instrument': instrument, 'kind': kind, 'command': command,
+                             'duration_s': duration, 'bytes': size, 'error': error, 'operation': operation}
+                            for t, instrument, kind, command, duration, size, error, operation in self.records],
+            }
+        with open(filename, 'w') as file:
+            json.dump(data, file, indent=1)
+
+
+io_tracer = IOTracer()
+
+
+# ========================================================================================
+# Traced Resources
+# ========================================================================================
+
+class TracedResource:
+    """
+    PyVISA resource proxy recording its I/O in io_tracer; other attributes pass through
+    """
+
+    _OWN_ATTRIBUTES = ('resource', 'name', 'tracer')
+    _TRACED = {'write': 'write', 'write_raw': 'write', 'query': 'query', 'read': 'read', 'read_raw': 'read',
+               'read_bytes': 'read', 'query_ascii_values': 'query', 'query_binary_values': 'query',
+               'write_ascii_values': 'write', 'write_binary_values': 'write'}
+
+    def __init__(self, resource, name=None, tracer=None):
+        """
+        Args:
+            resource: Opened PyVISA resource
+            name: Instrument name used in the trace (defaults to the VISA resource name)
+            tracer: IOTracer (defaults to the process-wide io_tracer)
+        """
+        object.__setattr__(self, 'resource', resource)
+        object.__setattr__(self, 'name', name or getattr(resource, 'resource_name', 'VISA'))
+        object.__setattr__(self, 'tracer', tracer or io_tracer)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.resource, name)
+        kind = self._TRACED.get(name)
+        if kind is None or not self.tracer.enabled:
+            return attribute
+
+        @functools.wraps(attribute)
+        def traced(*args, **kwargs):
+            command = args[0] if args and kind != 'read' else name
+            start = time.perf_counter()
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception as e:
+                self.tracer.record(self.name, kind, command, time.perf_counter() - start,
+                                   _size(args[0]) if args else 0, e)
+                raise
+            size = (_size(args[0]) if args and kind != 'read' else 0) + (_size(result) if kind != 'write' else 0)
+            self.tracer.record(self.name, kind, command, time.perf_counter() - start, size)
+            return result
+
+        return traced
+
+    def __setattr__(self, name, value):
+        if name in self._OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resource, name, value)
+
+    def __repr__(self):
+        return f"<TracedResource {self.name}>"
+
+
+def trace_resource(resource, name=None):
+    """Wrap a PyVISA resource so its I/O is recorded whenever tracing is enabled"""
+    if resource is None or isinstance(resource, TracedResource):
+        return resource
+    return TracedResource(resource, name)
+
+
+# ========================================================================================
+# Traced Command Classes
+# ========================================================================================
+
+def traced_commands(cls):
+    """
+    Class decorator timing every public method of an instrument command class
+
+    The method name is also attached to the resource-level records issued while it runs,
+    so a slow query can be traced back to the driver call that sent it.
+    """
+    label = cls.__name__
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not callable(method) or isinstance(method, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, name, _traced_method(method, f'{label}.{name}', label))
+    return cls
+
+
+def _traced_method(method, operation, label):
+    """Wrap one command class method"""
+
+    @functools.wraps(method)
+    def traced(self, *args, **kwargs):
+        if not io_tracer.enabled:
+            return method(self, *args, **kwargs)
+        outer = io_tracer.current_operation()
+        io_tracer.context.operation = operation
+        instrument = args[0] if args else kwargs.get('instrument')
+        name = getattr(instrument, 'name', None) or getattr(instrument, 'resource_name', None) or label
+        start = time.perf_counter()
+        error = None
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            io_tracer.context.operation = outer
+            io_tracer.record(name, 'call', operation, time.perf_counter() - start, error=error)
+
+    return traced
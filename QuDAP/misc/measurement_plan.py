@@ -0,0 +1,428 @@
+"""
+Measurement plan compiler with a dry-run time estimate
+
+Expands a whole ETO (temperatures x currents x fields) or ST-FMR
+(temperatures x frequencies x powers x repetitions x fields) schedule into an
+explicit step table before the worker is started. Every step carries an
+estimated duration built from the ramp rates, the fixed waits and status-poll
+intervals of the measurement loops and the read cost of the instruments, so
+the total run time is known up front instead of being guessed mid-run.
+
+When a run is resumed, the run journal is passed in and the points it records
+as completed are left out, as the workers skip them.
+"""
+
+import csv
+import math
+
+# Time costs of the measurement loops in seconds, mirroring the waits in run_ETO and ST_FMR_Worker
+DEFAULT_COSTS = {
+    'ppms_query': 0.1,              # One MultiPyVu round trip (field / temperature read)
+    'field_settle': 2.0,            # Magnet settling after the ramp before 'Holding (driven)'
+    'temperature_settle': 20.0,     # Stability window of TemperatureStabilityDetector
+    'instrument_overhead': 0.02,    # GPIB / USB overhead of one instrument query
+    'line_frequency': 60.0,         # Power line frequency used to convert NPLC to seconds
+    'fast_field_rate': 220.0,       # Field rate used for zeroing and demagnetization in Oe/s
+    'rf_cw_setup': 8.0,             # BNC 845 CW set-up (frequency, power, output) without LIST mode
+}
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as 'Xd Xh Xmin Xs', dropping leading zero units"""
+    seconds = int(round(seconds))
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    parts = []
+    if days:
+        parts.append(f'{days}d')
+    if days or hours:
+        parts.append(f'{hours}h')
+    if days or hours or minutes:
+        parts.append(f'{minutes}min')
+    parts.append(f'{seconds}s')
+    return ' '.join(parts)
+
+
+def wait_for_holding(ramp_time, initial_wait, poll_interval, settle=0.0):
+    """
+    Time spent by a 'set, sleep, poll until Holding' block of the measurement loops
+
+    Args:
+        ramp_time: Time the magnet needs to reach the set point in s
+        initial_wait: Sleep before the first status poll in s
+        poll_interval: Sleep between status polls in s
+        settle: Extra settling time after the ramp in s
+
+    Returns:
+        Estimated duration of the block in s
+    """
+    remaining = max(0.0, ramp_time + settle - initial_wait)
+    return initial_wait + poll_interval * max(1, math.ceil(remaining / poll_interval))
+
+
+def eto_field_step_rule(one_zone_enabled, two_zone_enabled, three_zone_enabled, zone_steps, zone_tops, zone_rates):
+    """
+    Build the zone-dependent field step rule of the ETO sweep
+
+    Args:
+        one_zone_enabled: One field zone selected
+        two_zone_enabled: Two field zones selected
+        three_zone_enabled: Three field zones selected
+        zone_steps: (zone 1, zone 2, zone 3) field steps in Oe
+        zone_tops: (zone 1, zone 2, zone 3) top fields in Oe
+        zone_rates: (zone 1, zone 2, zone 3) field rates in Oe/s
+
+    Returns:
+        Callable mapping the current field to (step in Oe, field rate in Oe/s)
+    """
+    zone1_step_field, zone2_step_field, zone3_step_field = zone_steps
+    zone1_top_field, zone2_top_field, zone3_top_field = zone_tops
+    zone1_field_rate, zone2_field_rate, zone3_field_rate = zone_rates
+
+    def step_rule(currentField):
+        if one_zone_enabled:
+            return zone1_step_field, zone1_field_rate
+        elif two_zone_enabled:
+            if (currentField <= zone1_top_field + 1 or currentField >= -1 * zone1_top_field - 1):
+                return zone1_step_field, zone1_field_rate
+            elif (currentField > -1 * zone2_top_field and currentField <= zone2_top_field):
+                return zone2_step_field, zone2_field_rate
+        elif three_zone_enabled:
+            if (currentField <= zone1_top_field + 1 or currentField >= -1 * zone1_top_field - 1):
+                return zone1_step_field, zone1_field_rate
+            elif (currentField < zone2_top_field and currentField >= -1 * zone2_top_field):
+                return zone2_step_field, zone2_field_rate
+            elif (currentField > -1 * zone3_top_field and currentField < zone3_top_field):
+                return zone3_step_field, zone3_field_rate
+        raise ValueError(f'No field zone covers {currentField} Oe')
+
+    return step_rule
+
+
+def eto_point_read_time(nv_channels=0, nplc=1.0, number_of_avg=1, nv_mode='point', lockin_delay=None,
+                        costs=None):
+    """
+    Instrument read cost of one ETO field point
+
+    Args:
+        nv_channels: Number of enabled 2182A channels (0 if no nanovoltmeter)
+        nplc: 2182A integration time in power line cycles
+        number_of_avg: Readings per point
+        nv_mode: 'point' (READ? loop), 'burst' (buffered burst) or 'delta' (6221 Delta / Pulse Delta)
+        lockin_delay: Lock-in settling delay in s, or None if no lock-in is read
+        costs: Optional overrides of DEFAULT_COSTS
+
+    Returns:
+        Estimated read time in s
+    """
+    costs = {**DEFAULT_COSTS, **(costs or {})}
+    overhead = costs['instrument_overhead']
+    # The 2182A autozero doubles the conversion time of every reading
+    conversion = 2 * float(nplc) / costs['line_frequency']
+    read_time = 0.0
+    if nv_channels:
+        if nv_mode == 'delta':
+            read_time += number_of_avg * (2 * conversion + overhead) + 0.5
+        elif nv_mode == 'burst':
+            read_time += nv_channels * (number_of_avg * conversion + 10 * overhead)
+        else:
+            # One READ? per channel per average, plus the 0.2 s pause of the averaging loop
+            read_time += number_of_avg * (nv_channels * (conversion + 2 * overhead) + 0.2)
+    elif lockin_delay is not None:
+        read_time += lockin_delay + 4 * overhead
+    return read_time
+
+
+class MeasurementPlan:
+    """
+    Explicit step table of a measurement with estimated durations
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name: Measurement name shown in the summary
+        """
+        self.name = name
+        self.steps = []
+        self.notes = []
+
+    def add(self, stage, duration, **params):
+        """
+        Append a step
+
+        Args:
+            stage: Step kind ('temperature', 'demagnetize', 'field_point', 'field_sweep', ...)
+            duration: Estimated duration in s
+            **params: Set points of the step (temperature, current, frequency, field, ...)
+        """
+        self.steps.append({'index': len(self.steps), 'stage': stage, 'duration': float(duration), **params})
+
+    @property
+    def total_duration(self):
+        """Estimated duration of the whole plan in s"""
+        return sum(step['duration'] for step in self.steps)
+
+    @property
+    def number_of_points(self):
+        """Number of measured field points (continuous sweeps count as one)"""
+        return sum(1 for step in self.steps if step['stage'] in ('field_point', 'field_sweep'))
+
+    def stage_totals(self):
+        """Estimated time per stage in s, in order of first appearance"""
+        totals = {}
+        for step in self.steps:
+            totals[step['stage']] = totals.get(step['stage'], 0.0) + step['duration']
+        return totals
+
+    def summary(self):
+        """Multi-line text with the total and the per-stage breakdown"""
+        lines = [f'{self.name}: {len(self.steps)} steps, {self.number_of_points} measured points',
+                 f'Estimated duration: {format_duration(self.total_duration)}']
+        for stage, duration in self.stage_totals().items():
+            lines.append(f'    {stage.replace("_", " ")}: {format_duration(duration)}')
+        lines.extend(self.notes)
+        return '\n'.join(lines)
+
+    def write_csv(self, filename):
+        """Write the step table with the cumulative start time of each step"""
+        columns = ['index', 'stage']
+        for step in self.steps:
+            for key in step:
+                if key not in columns and key != 'duration':
+                    columns.append(key)
+        columns += ['duration (s)', 'start (s)']
+        elapsed = 0.0
+        with open(filename, "w", newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for step in self.steps:
+                row = [step.get(column, '') for column in columns[:-2]]
+                writer.writerow(row + [round(step['duration'], 2), round(elapsed, 2)])
+                elapsed += step['duration']
+
+
+def _temperature_steps(plan, temperatures, temperature_rate, init_temperature_rate, start_temperature,
+                       max_settle, costs, completed=None, **params):
+    """
+    Add the zero-field and temperature approach steps shared by the ETO and ST-FMR loops
+
+    Temperatures for which completed(temperature) is true are skipped without an approach,
+    as the workers do on resume.
+    """
+    previous_temperature = start_temperature
+    for i, temperature in enumerate(temperatures):
+        if completed is not None and completed(temperature):
+            continue
+        rate = init_temperature_rate if i == 0 else temperature_rate
+        ramp = 0.0
+        if previous_temperature is not None and rate:
+            ramp = abs(temperature - previous_temperature) / rate * 60
+        plan.add('zero_field', wait_for_holding(0.0, 10, 15), temperature=temperature, **params)
+        settle = min(costs['temperature_settle'], max_settle(i))
+        plan.add('temperature', 4 + wait_for_holding(ramp, 0, 1.5) + settle, temperature=temperature, **params)
+        previous_temperature = temperature
+        yield temperature
+
+
+def compile_eto_plan(temperatures, currents, top_field, bot_field, step_rule, field_mode_fixed, temperature_rate,
+                     init_temperature_rate, demag_field, read_time, record_zero_field=False, number_of_avg=1,
+                     lockin_connected=False, start_temperature=None, journal=None, journal_currents=None,
+                     costs=None):
+    """
+    Expand the ETO schedule of run_ETO into a step table
+
+    Args:
+        temperatures: Temperature set points in K
+        currents: Source currents (labels are kept as given)
+        top_field: Top field of the sweep in Oe
+        bot_field: Bottom field of the sweep in Oe
+        step_rule: Callable mapping a field to (step in Oe, rate in Oe/s), see eto_field_step_rule
+        field_mode_fixed: Fixed-field stepping (True) or continuous sweep (False)
+        temperature_rate: Temperature rate between set points in K/min
+        init_temperature_rate: Temperature rate to the first set point in K/min
+        demag_field: Demagnetization field in Oe
+        read_time: Instrument read time of one field point in s, see eto_point_read_time
+        record_zero_field: Zero-field readings are recorded before each sweep
+        number_of_avg: Readings per point (used for the zero-field record)
+        lockin_connected: The lock-in waits of the loop apply
+        start_temperature: Current sample temperature in K, or None to skip the first approach
+        journal: RunJournal of a resumed run; its completed sweeps and points are left out
+        journal_currents: Current values the worker records in the journal, one per entry of
+            currents (defaults to currents)
+        costs: Optional overrides of DEFAULT_COSTS
+
+    Returns:
+        MeasurementPlan
+    """
+    costs = {**DEFAULT_COSTS, **(costs or {})}
+    fast_rate = costs['fast_field_rate']
+    query = 2 * costs['ppms_query']
+    plan = MeasurementPlan('ETO')
+    keys = list(journal_currents) if journal_currents is not None else list(currents)
+
+    def completed(temperature):
+        return journal is not None and journal.all_done({'temperature': temperature, 'current': key}
+                                                        for key in keys)
+
+    if start_temperature is None:
+        plan.notes.append('The approach to the first temperature is not included.')
+    if journal is not None and journal.count:
+        plan.notes.append(f'Resumed run: points completed in the run journal ({journal.count} entries) '
+                          f'are not included.')
+
+    # The field schedule is the same for every (temperature, current) pair
+    down_fields = []
+    field = top_field
+    while field >= bot_field:
+        down_fields.append(field)
+        field -= step_rule(field)[0]
+    up_fields = []
+    field = bot_field
+    while field <= top_field:
+        up_fields.append(field)
+        field += step_rule(field)[0]
+
+    for temperature in _temperature_steps(plan, temperatures, temperature_rate, init_temperature_rate,
+                                          start_temperature, lambda i: 60 if i == 0 else 300, costs,
+                                          completed=completed):
+        for current, key in zip(currents, keys):
+            if journal is not None and journal.is_done(temperature=temperature, current=key):
+                continue
+            demagnetize = 5 + wait_for_holding(abs(demag_field) / fast_rate, 10, 15, costs['field_settle'])
+            demagnetize += wait_for_holding(abs(demag_field) / fast_rate, 10, 15, costs['field_settle']) + 2
+            if lockin_connected:
+                demagnetize += 15
+            plan.add('demagnetize', demagnetize, temperature=temperature, current=current, field=demag_field)
+            if record_zero_field:
+                plan.add('zero_field_record', number_of_avg * 0.2 + read_time, temperature=temperature,
+                         current=current, field=0)
+
+            if field_mode_fixed:
+                previous_field = 0
+                for direction, fields in (('down', down_fields), ('up', up_fields)):
+                    for field in fields:
+                        if journal is not None and journal.is_done(temperature=temperature, current=key,
+                                                                   direction=direction, field=field):
+                            continue
+                        ramp = abs(field - previous_field) / step_rule(field)[1]
+                        # The next set point is issued before the reads, so 4 s is the floor of each point
+                        duration = max(4.0, ramp + costs['field_settle']) + 0.5 + 2 * query + read_time
+                        plan.add('field_point', duration, temperature=temperature, current=current,
+                                 direction=direction, field=field)
+                        previous_field = field
+            else:
+                rate = step_rule(top_field)[1]
+                sweep = abs(top_field - bot_field) / rate
+                plan.add('field_approach', wait_for_holding(abs(top_field) / fast_rate, 4, 1.5) + 20,
+                         temperature=temperature, current=current, field=top_field)
+                plan.add('field_sweep', sweep, temperature=temperature, current=current, direction='down',
+                         field=bot_field)
+                plan.add('field_sweep', 4 + 1 + 20 + sweep, temperature=temperature, current=current,
+                         direction='up', field=top_field)
+    return plan
+
+
+def _continuous_sweep_time(continuous_list):
+    """Sweep time of a ST-FMR continuous field setting ('final_continuous_list') in s"""
+    sweep = 0.0
+    for region_index in range(1, continuous_list.get('zone_count', 0) + 1):
+        region = continuous_list.get(f'region{region_index}', {})
+        rate = region.get('rate') or 1
+        for start_key, end_key in (('from', 'to'), ('from_start', 'to_start'), ('from_end', 'to_end')):
+            if start_key in region and end_key in region:
+                sweep += abs(region[start_key] - region[end_key]) / rate
+    return sweep
+
+
+def compile_st_fmr_plan(temperatures, frequencies, powers, repetitions, field_setting, temperature_rate,
+                        init_temperature_rate, settling_time=None, rf_connected=True, rf_list_mode=True,
+                        start_temperature=None, journal=None, costs=None):
+    """
+    Expand the ST-FMR schedule of ST_FMR_Worker into a step table
+
+    Args:
+        temperatures: Temperature set points in K
+        frequencies: RF frequencies in Hz
+        powers: RF powers in dBm
+        repetitions: Number of repetitions per (frequency, power)
+        field_setting: ppms_setting['field_setting'] as passed to the worker
+        temperature_rate: Temperature rate between set points in K/min
+        init_temperature_rate: Temperature rate to the first set point in K/min
+        settling_time: Lock-in settling time per field point in s
+        rf_connected: The BNC 845 set-up waits apply
+        rf_list_mode: The (frequency, power) table is uploaded once and stepped in LIST mode; otherwise
+            each point pays the CW set-up of the fallback path
+        start_temperature: Current sample temperature in K, or None to skip the first approach
+        journal: RunJournal of a resumed run; its completed repetitions and points are left out
+        costs: Optional overrides of DEFAULT_COSTS
+
+    Returns:
+        MeasurementPlan
+    """
+    costs = {**DEFAULT_COSTS, **(costs or {})}
+    fast_rate = costs['fast_field_rate']
+    query = 2 * costs['ppms_query']
+    read_time = (settling_time or 0) + 4 * costs['instrument_overhead']
+    plan = MeasurementPlan('ST-FMR')
+    if start_temperature is None:
+        plan.notes.append('The approach to the first temperature is not included.')
+    if journal is not None and journal.count:
+        plan.notes.append(f'Resumed run: points completed in the run journal ({journal.count} entries) '
+                          f'are not included.')
+
+    stepped = field_setting.get('field_mode') != 'continuous'
+    field_list = field_setting.get('final_step_list') or []
+    field_rate = field_setting.get('final_rate') or fast_rate
+    last_field = field_list[-1] if stepped and field_list else 0
+    repetition_list = list(range(1, repetitions + 1))
+
+    def completed(temperature):
+        return journal is not None and journal.all_done({'temperature': temperature, 'frequency': frequency,
+                                                         'power': power, 'repetition': repetition}
+                                                        for frequency in frequencies for power in powers
+                                                        for repetition in repetition_list)
+
+    if rf_connected and rf_list_mode:
+        # One LIST table upload and mode switch (7 commands per 3501-point window) before the first temperature
+        windows = max(1, math.ceil(len(frequencies) * len(powers) / 3501))
+        plan.add('rf_list_load', 7 * costs['instrument_overhead'] * windows)
+    # Selecting a LIST point is one write plus *OPC?, then the FREQ? / POW? read-back
+    rf_setup = 4 * costs['instrument_overhead'] if rf_list_mode else costs['rf_cw_setup']
+
+    for temperature in _temperature_steps(plan, temperatures, temperature_rate, init_temperature_rate,
+                                          start_temperature, lambda i: 30, costs, completed=completed):
+        for frequency in frequencies:
+            for power in powers:
+                if journal is not None and journal.all_done(
+                        {'temperature': temperature, 'frequency': frequency, 'power': power,
+                         'repetition': repetition} for repetition in repetition_list):
+                    continue
+                if rf_connected:
+                    plan.add('rf_setup', rf_setup, temperature=temperature, frequency=frequency, power=power)
+                for repetition in repetition_list:
+                    params = {'temperature': temperature, 'frequency': frequency, 'power': power,
+                              'repetition': repetition}
+                    if journal is not None and journal.is_done(**params):
+                        continue
+                    plan.add('sweep_setup', 5 + 2, **params)
+                    if stepped:
+                        previous_field = 0
+                        for field_index, field in enumerate(field_list):
+                            if journal is not None and journal.is_done(field_index=field_index, **params):
+                                continue
+                            ramp = abs(field - previous_field) / field_rate
+                            duration = wait_for_holding(ramp, 4, 1, costs['field_settle']) + 5 + 2 * query + read_time
+                            plan.add('field_point', duration, field=field, **params)
+                            previous_field = field
+                    else:
+                        continuous_list = field_setting.get('final_continuous_list') or {}
+                        start_field = continuous_list.get('region1', {}).get(
+                            'from', continuous_list.get('region1', {}).get('from_start', 0))
+                        plan.add('field_approach', wait_for_holding(abs(start_field) / fast_rate, 4, 1) + 60,
+                                 field=start_field, **params)
+                        plan.add('field_sweep', _continuous_sweep_time(continuous_list), **params)
+                    plan.add('return_to_zero', 2 + wait_for_holding(abs(last_field) / fast_rate, 2, 1) + 5 + 2,
+                             field=0, **params)
+    return plan
@@ -0,0 +1,182 @@
+"""
+Shared MultiVu process watcher
+
+One process-wide watcher replaces the per-page tasklist/pgrep polling. It
+caches the PID of the MultiVu (or Dynacool / PpmsMvu) process, so a check
+while MultiVu runs is a single psutil.pid_exists() call; the process table
+is only scanned again once that PID has gone away. The periodic check runs
+on a background thread so a process-table scan never stalls the GUI, and
+status changes are broadcast to every subscribed page through one Qt signal.
+"""
+
+import os
+import threading
+import time
+
+import psutil
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Executable names of the Quantum Design control programs (compared case-insensitively)
+MULTIVU_PROCESS_NAMES = ('multivu.exe', 'dynacool.exe', 'ppmsmvu.exe')
+
+
+class MultiVuProcessCache:
+    """
+    Cached lookup of the MultiVu process (no Qt, safe to call from any thread)
+    """
+
+    def __init__(self, rescan_interval=5.0):
+        """
+        Args:
+            rescan_interval: Minimum time in seconds between two full process-table scans
+                while MultiVu is not running
+        """
+        self.rescan_interval = rescan_interval
+        self.lock = threading.Lock()
+        self.pid = None
+        self.create_time = None
+        self.last_scan = None
+        self.last_status = False
+
+    @staticmethod
+    def _matches(info):
+        """Check whether a psutil process info dict belongs to MultiVu"""
+        name = info.get('name') or ''
+        if os.name == 'nt':
+            return name.lower() in MULTIVU_PROCESS_NAMES
+        # Same criterion as 'pgrep -f MultiVu' on Linux/Mac
+        cmdline = ' '.join(info.get('cmdline') or [])
+        return 'MultiVu' in name or 'MultiVu' in cmdline
+
+    def _pid_alive(self):
+        """Check the cached PID (guarding against PID reuse by comparing the creation time)"""
+        if self.pid is None or not psutil.pid_exists(self.pid):
+            return False
+        try:
+            return psutil.Process(self.pid).create_time() == self.create_time
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def _scan(self):
+        """Scan the process table for MultiVu"""
+        self.last_scan = time.monotonic()
+        attrs = ['pid', 'name', 'create_time'] + ([] if os.name == 'nt' else ['cmdline'])
+        for process in psutil.process_iter(attrs):
+            try:
+                if self._matches(process.info) and process.info['pid'] != os.getpid():
+                    self.pid = process.info['pid']
+                    self.create_time = process.info['create_time']
+                    return True
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.pid = self.create_time = None
+        return False
+
+    def is_running(self, force=False):
+        """
+        Check whether MultiVu is running
+
+        Args:
+            force: Scan the process table even if the last scan is recent
+
+        Returns:
+            bool: True if MultiVu is running
+        """
+        with self.lock:
+            try:
+                if self._pid_alive():
+                    self.last_status = True
+                elif force or self.last_scan is None or time.monotonic() - self.last_scan >= self.rescan_interval:
+                    self.last_status = self._scan()
+                else:
+                    self.last_status = False
+            except Exception as e:
+                print(f"⚠ Error checking for MultiVu: {e}")
+                self.last_status = False
+            return self.last_status
+
+
+_process_cache = MultiVuProcessCache()
+
+
+def is_multivu_running(force=False):
+    """
+    Check if MultiVu application is running
+    Returns True if detected, False otherwise
+    """
+    return _process_cache.is_running(force)
+
+
+class MultiVuWatcher(QObject):
+    """
+    Process-wide MultiVu status broadcaster (singleton, lives in the GUI thread)
+
+    Pages subscribe a slot instead of running their own status thread; the slot is called
+    once with the current status and then on every change. The timer only starts a
+    background check; its result comes back to the GUI thread through a queued signal.
+    """
+
+    status_changed = pyqtSignal(bool)  # True if running, False if not
+    _checked = pyqtSignal(bool)  # Result of a background check
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MultiVuWatcher, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, interval_ms=2000):
+        if self._initialized:
+            return
+
+        super().__init__()
+        self._initialized = True
+        self.subscribers = []
+        self.status = None
+        self.check_thread = None
+        self._checked.connect(self._apply_status)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check_in_background)
+
+    def subscribe(self, slot):
+        """Connect slot to status changes, call it with the current status and start watching"""
+        self.status_changed.connect(slot)
+        self.subscribers.append(slot)
+        if self.status is None:
+            self.status = is_multivu_running()
+        slot(self.status)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def unsubscribe(self, slot):
+        """Disconnect slot; the watcher stops when nobody listens"""
+        if slot in self.subscribers:
+            self.subscribers.remove(slot)
+            try:
+                self.status_changed.disconnect(slot)
+            except TypeError:
+                pass
+        if not self.subscribers:
+            self.timer.stop()
+
+    def check_in_background(self):
+        """Start a status check on a worker thread, unless the previous one is still running"""
+        if self.check_thread is not None and self.check_thread.is_alive():
+            return
+        self.check_thread = threading.Thread(target=lambda: self._checked.emit(is_multivu_running()),
+                                             name='MultiVu watcher', daemon=True)
+        self.check_thread.start()
+
+    def check(self, force=False):
+        """Check the status now (blocking, for explicit refreshes) and broadcast it if it changed"""
+        return self._apply_status(is_multivu_running(force))
+
+    def _apply_status(self, status):
+        """Store a check result and broadcast it if it changed (GUI thread)"""
+        if status != self.status:
+            self.status = status
+            self.status_changed.emit(status)
+        return status
@@ -0,0 +1,97 @@
+"""
+Process-wide MultiPyVu client registry
+
+The PPMS page and the Measurement page both connect to the MultiVu server.
+With a client each, they also had a command worker and a telemetry cache
+each, so the PPMS page poller and the measurement worker queried MultiVu
+side by side. The registry keeps one open client per (host, port): every
+page asking for the same server gets the same client, and with it the same
+PPMSCommandWorker and PPMSTelemetry. The client is closed, after its poller
+and worker are stopped, when the last page releases it.
+"""
+
+import threading
+
+try:
+    from QuDAP.misc.ppms_command_worker import PPMSCommandWorker
+    from QuDAP.misc.ppms_telemetry import PPMSTelemetry
+except ImportError:
+    from misc.ppms_command_worker import PPMSCommandWorker
+    from misc.ppms_telemetry import PPMSTelemetry
+
+
+class PPMSClientRegistry:
+    """
+    Owner of the shared MultiPyVu clients (singleton, thread safe)
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PPMSClientRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.lock = threading.Lock()
+        self.entries = {}  # (host, port) -> [client, number of users]
+
+    def open(self, host, port, factory):
+        """
+        Get the shared client of a MultiVu server, connecting on first use
+
+        Args:
+            host: Server host name or address
+            port: Server port
+            factory: Client class called as factory(host=host, port=port) (mpv.Client,
+                SimulatedMultiVuClient)
+
+        Returns:
+            Opened client (give it back with release())
+        """
+        key = (host, int(port))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                client = factory(host=host, port=int(port))
+                client.open()
+                entry = [client, 0]
+                self.entries[key] = entry
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, client):
+        """
+        Release one use of a client; the last release stops its poller and worker and closes it
+
+        Returns:
+            bool: True if the client was closed
+        """
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry[0] is client:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return False
+                    del self.entries[key]
+                    break
+        PPMSTelemetry.release(client)
+        PPMSCommandWorker.release(client)
+        client.close_client()
+        return True
+
+    def users(self, client):
+        """Number of pages using a client"""
+        with self.lock:
+            for entry in self.entries.values():
+                if entry[0] is client:
+                    return entry[1]
+        return 0
+
+
+ppms_clients = PPMSClientRegistry()
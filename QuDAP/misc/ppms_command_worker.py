@@ -0,0 +1,270 @@
+"""
+Persistent single-owner PPMS command worker
+
+One long-lived thread owns the MultiPyVu client and executes the commands
+taken from a queue, so polling loops that talk to the PPMS every second for
+days no longer start a thread per call. Every request gets its own Future and
+timeout. A request that times out before it was started is cancelled, so a
+stale set point is never sent late. Reads submitted with a coalesce key share
+the result of an identical request that is already queued or running.
+
+A MultiPyVu call that never returns would block every later command, the
+telemetry polling and the recorder behind it. Each submit therefore checks
+how long the running command has been executing. Past STUCK_TIMEOUT the
+client is taken out of service: the hung command fails with TimeoutError,
+the queued ones with ConnectionError, and a recovery thread closes the
+client so the hung call returns. Only once the old owner thread has exited
+is the client opened again and a new owner thread started, so the client
+never has two users; until then submit() fails fast with ConnectionError.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future, InvalidStateError, TimeoutError as FutureTimeoutError
+
+_STOP = object()
+
+
+class PPMSCommandWorker:
+    """
+    Queue-fed worker thread that is the only user of one MultiPyVu client
+    """
+
+    _workers = {}
+    _workers_lock = threading.Lock()
+
+    # A command running longer than this (in s) is considered hung and the client is reconnected
+    STUCK_TIMEOUT = 60.0
+    # Time (in s) the recovery waits for the hung owner thread to exit after the client was closed
+    RECONNECT_WAIT = 10.0
+
+    def __init__(self, client, name='PPMS I/O'):
+        """
+        Args:
+            client: MultiPyVu client instance owned by this worker
+            name: Thread name
+        """
+        self.client = client
+        self.name = name
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.in_flight = {}  # coalesce key -> Future of a queued or running read
+        self.running = None  # (Future, coalesce key, start time) of the command being executed
+        self.generation = 0
+        self.usable = True  # False while the client is reconnected after a hung command
+        self.recovery_thread = None
+        self.reconnects = 0  # Number of reconnections because of a hung command
+        self.stopped = False
+        self.thread = None
+        self._start_thread()
+
+    def _start_thread(self):
+        """Start the owner thread (call with self.lock)"""
+        self.generation += 1
+        self.running = None
+        self.thread = threading.Thread(target=self._run, args=(self.generation,), name=self.name, daemon=True)
+        self.thread.start()
+
+    def check_stuck(self):
+        """
+        Watchdog: take the client out of service if its current command hangs
+
+        A command running longer than STUCK_TIMEOUT fails with TimeoutError, the queued commands
+        fail with ConnectionError, and the client is reconnected on a recovery thread.
+
+        Returns:
+            bool: True if the client is usable
+        """
+        with self.lock:
+            if self.stopped or not self.usable:
+                return False
+            if self.running is None:
+                return True
+            future, _, started = self.running
+            elapsed = time.monotonic() - started
+            if elapsed < self.STUCK_TIMEOUT:
+                return True
+            self.usable = False
+            # The owner thread leaves its loop as soon as the hung call returns
+            self.generation += 1
+            self.running = None
+            self.in_flight.clear()
+            pending = self._take_queued()
+            hung_thread = self.thread
+            self.recovery_thread = threading.Thread(target=self._recover, args=(hung_thread,),
+                                                    name=f'{self.name} recovery', daemon=True)
+        print(f"⚠ PPMS command hung for {elapsed:.0f} s, reconnecting the client")
+        self._resolve(future, exception=TimeoutError(f"PPMS command hung for {elapsed:.0f} s"))
+        for queued in pending:
+            self._resolve(queued, exception=ConnectionError("PPMS client is being reconnected"))
+        self.recovery_thread.start()
+        return False
+
+    def _recover(self, hung_thread):
+        """Close the client, wait for the hung owner thread to exit, then reopen it with a new owner thread"""
+        try:
+            self.client.close_client()
+        except BaseException as e:
+            print(f"⚠ Error closing the hung PPMS client: {e}")
+        hung_thread.join(timeout=self.RECONNECT_WAIT)
+        if hung_thread.is_alive():
+            print("⚠ PPMS command still blocked after closing the client, the client stays out of service")
+            return
+        try:
+            self.client.open()
+        except BaseException as e:
+            print(f"⚠ Could not reconnect the PPMS client: {e}")
+            return
+        with self.lock:
+            if self.stopped:
+                return
+            self.reconnects += 1
+            self._start_thread()
+            self.usable = True
+        print("✓ PPMS client reconnected")
+
+    def _take_queued(self):
+        """Remove the commands not started yet from the queue and return their futures"""
+        futures = []
+        while True:
+            try:
+                future, *_ = self.requests.get_nowait()
+            except queue.Empty:
+                return futures
+            if future is not _STOP:
+                futures.append(future)
+
+    @classmethod
+    def for_client(cls, client):
+        """Return the worker owning client, starting one on first use"""
+        with cls._workers_lock:
+            worker = cls._workers.get(id(client))
+            # A worker reconnecting its client is kept: a second owner would use the client alongside it
+            if worker is None or worker.client is not client or worker.stopped:
+                worker = cls(client)
+                cls._workers[id(client)] = worker
+            return worker
+
+    @classmethod
+    def release(cls, client):
+        """Stop the worker owning client (call before the client is closed)"""
+        with cls._workers_lock:
+            worker = cls._workers.pop(id(client), None)
+        if worker is not None:
+            worker.shutdown()
+
+    def submit(self, func, args=(), kwargs=None, coalesce_key=None) -> Future:
+        """
+        Queue a command for the worker thread
+
+        Args:
+            func: Function to execute (normally a closure around the client)
+            args: Positional arguments
+            kwargs: Keyword arguments
+            coalesce_key: Requests with the same key share one queued or running execution
+
+        Returns:
+            Future holding the result of func (failed with ConnectionError while the client is
+            out of service)
+        """
+        if not self.check_stuck():
+            future = Future()
+            future.set_exception(ConnectionError("PPMS client is being reconnected" if not self.stopped
+                                                 else "PPMS command worker is stopped"))
+            return future
+        with self.lock:
+            if coalesce_key is not None:
+                future = self.in_flight.get(coalesce_key)
+                if future is not None and not future.done():
+                    return future
+            future = Future()
+            if coalesce_key is not None:
+                self.in_flight[coalesce_key] = future
+            self.requests.put((future, func, args, kwargs or {}, coalesce_key))
+        return future
+
+    def execute(self, func, args=(), kwargs=None, timeout=30, coalesce_key=None):
+        """
+        Run a command on the worker thread and wait for it
+
+        Args:
+            func: Function to execute
+            args: Positional arguments
+            kwargs: Keyword arguments
+            timeout: Timeout in seconds
+            coalesce_key: Optional key used to share identical reads
+
+        Returns:
+            Result of func
+
+        Raises:
+            TimeoutError: If the command did not finish in time; a command that was not started yet
+                is cancelled (shared reads are left for the other callers)
+            Exception: Whatever func raised
+        """
+        future = self.submit(func, args, kwargs, coalesce_key)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if coalesce_key is None:
+                future.cancel()
+            self.check_stuck()
+            raise TimeoutError(f"Command timeout after {timeout} seconds")
+        except CancelledError:
+            raise TimeoutError("Command cancelled before it was executed")
+
+    def shutdown(self, timeout=5):
+        """Cancel the commands not started yet and stop the worker thread"""
+        with self.lock:
+            self.stopped = True
+            pending = self._take_queued()
+        for future in pending:
+            future.cancel()
+        self.requests.put((_STOP, None, None, None, None))
+        self.thread.join(timeout=timeout)
+
+    def _run(self, generation):
+        """Worker loop, the only place where the client is used"""
+        # After a hung command the thread leaves the loop once the call returns
+        while generation == self.generation:
+            future, func, args, kwargs, coalesce_key = self.requests.get()
+            if future is _STOP:
+                return
+            if not future.set_running_or_notify_cancel():
+                self._forget(coalesce_key, future)
+                continue
+            running = (future, coalesce_key, time.monotonic())
+            with self.lock:
+                self.running = running
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                # SystemExit from MultiPyVu must not kill the worker thread
+                self._forget(coalesce_key, future)
+                self._resolve(future, exception=e)
+            else:
+                self._forget(coalesce_key, future)
+                self._resolve(future, result=result)
+            with self.lock:
+                if self.running is running:
+                    self.running = None
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        """Set the outcome of a future unless the watchdog already failed it"""
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _forget(self, coalesce_key, future):
+        """Drop a finished read from the coalescing table"""
+        if coalesce_key is None:
+            return
+        with self.lock:
+            if self.in_flight.get(coalesce_key) is future:
+                del self.in_flight[coalesce_key]
@@ -0,0 +1,182 @@
+"""
+Timestamped PPMS telemetry recorder
+
+Logs the PPMS field and temperature in the background with monotonic
+timestamps, so a measurement loop can time-stamp its own instrument samples
+and look up the field/temperature at that instant afterwards, instead of
+querying the PPMS before every sample. During a continuous sweep the field
+keeps moving while the lock-in is read; interpolating at the middle of the
+lock-in read removes that skew and the PPMS round trip from the hot loop.
+
+Every reading is timestamped at the middle of its PPMS round trip and is also
+stored in the shared PPMSTelemetry cache, so GUI label reads are served from it.
+"""
+
+import bisect
+import threading
+import time
+
+try:
+    from QuDAP.misc.logger import logger
+    from QuDAP.misc.ppms_telemetry import READERS
+except ImportError:
+    from misc.logger import logger
+    from misc.ppms_telemetry import READERS
+
+
+class PPMSTelemetryRecorder:
+    """
+    Background logger of (timestamp, value, status) records with interpolated lookups
+    """
+
+    def __init__(self, telemetry, quantities=('field', 'temperature'), interval=0.25, history=36000):
+        """
+        Args:
+            telemetry: PPMSTelemetry of the connected client
+            quantities: Quantities to record ('field', 'temperature')
+            interval: Time between two recording rounds in seconds
+            history: Number of records kept per quantity
+        """
+        self.telemetry = telemetry
+        self.quantities = tuple(quantities)
+        self.interval = interval
+        self.history = history
+        self.condition = threading.Condition()
+        self.records = {quantity: ([], [], []) for quantity in self.quantities}  # times, values, statuses
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    # ========================================================================================
+    # Recording
+    # ========================================================================================
+
+    def start(self):
+        """Start recording"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._record, name='PPMS recorder', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop recording (the records are kept)"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=max(1.0, 4 * self.interval))
+        self.thread = None
+        with self.condition:
+            self.condition.notify_all()
+
+    def _record(self):
+        """Recorder loop"""
+        worker = self.telemetry.worker
+        client = self.telemetry.client
+        while not self.stop_event.is_set():
+            round_start = time.monotonic()
+            for quantity in self.quantities:
+                generation = self.telemetry.generation
+                try:
+                    query_start = time.monotonic()
+                    reading = worker.execute(READERS[quantity], (client,), timeout=max(5.0, self.interval),
+                                             coalesce_key=quantity)
+                    timestamp = (query_start + time.monotonic()) / 2
+                except (Exception, SystemExit) as e:
+                    logger.warning(f'PPMS recorder {quantity} read failed: {e}')
+                    continue
+                self.telemetry.store(quantity, reading, generation, timestamp)
+                self._append(quantity, timestamp, reading[0], reading[1])
+            self.stop_event.wait(max(0.0, self.interval - (time.monotonic() - round_start)))
+
+    def _append(self, quantity, timestamp, value, status):
+        """Add a record, dropping the oldest ones beyond the history length"""
+        with self.condition:
+            times, values, statuses = self.records[quantity]
+            if times and timestamp <= times[-1]:
+                return
+            times.append(timestamp)
+            values.append(value)
+            statuses.append(status)
+            if len(times) > self.history:
+                excess = len(times) - self.history
+                del times[:excess], values[:excess], statuses[:excess]
+            self.condition.notify_all()
+
+    # ========================================================================================
+    # Lookups
+    # ========================================================================================
+
+    def latest(self, quantity):
+        """
+        Newest record of a quantity
+
+        Returns:
+            Tuple (timestamp, value, status), or None if nothing was recorded yet
+        """
+        with self.condition:
+            times, values, statuses = self.records[quantity]
+            if not times:
+                return None
+            return times[-1], values[-1], statuses[-1]
+
+    def wait_until(self, quantity, timestamp, timeout=None):
+        """
+        Wait for a record at or after timestamp
+
+        Args:
+            quantity: Recorded quantity
+            timestamp: time.monotonic() value
+            timeout: Maximum wait in seconds (defaults to a few recording rounds)
+
+        Returns:
+            bool: True if such a record exists
+        """
+        timeout = 4 * self.interval + 1 if timeout is None else timeout
+        times = self.records[quantity][0]
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: (times and times[-1] >= timestamp) or self.stop_event.is_set(), timeout
+            ) and bool(times) and times[-1] >= timestamp
+
+    def value_at(self, quantity, timestamp, timeout=None):
+        """
+        Value at a monotonic timestamp, linearly interpolated between the two nearest records
+
+        Waits for the recorder to log a record after timestamp; if none arrives in time the
+        newest value is returned.
+
+        Args:
+            quantity: Recorded quantity
+            timestamp: time.monotonic() value of the instrument sample
+            timeout: Maximum wait for a later record in seconds
+
+        Returns:
+            Tuple (value, status), or (None, None) if nothing was recorded
+        """
+        self.wait_until(quantity, timestamp, timeout)
+        with self.condition:
+            times, values, statuses = self.records[quantity]
+            if not times:
+                return None, None
+            index = bisect.bisect_left(times, timestamp)
+            if index == 0:
+                return values[0], statuses[0]
+            if index == len(times):
+                return values[-1], statuses[-1]
+            t0, t1 = times[index - 1], times[index]
+            fraction = (timestamp - t0) / (t1 - t0)
+            value = values[index - 1] + (values[index] - values[index - 1]) * fraction
+            status = statuses[index - 1] if fraction < 0.5 else statuses[index]
+            return value, status
+
+    def series(self, quantity, since=None, until=None):
+        """
+        Recorded timestamps and values inside a time window
+
+        Returns:
+            Tuple (times, values) of lists, suitable for numpy.interp
+        """
+        with self.condition:
+            times, values, _ = self.records[quantity]
+            start = 0 if since is None else bisect.bisect_left(times, since)
+            end = len(times) if until is None else bisect.bisect_right(times, until)
+            return times[start:end], values[start:end]
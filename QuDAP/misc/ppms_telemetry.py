@@ -0,0 +1,220 @@
+"""
+Shared PPMS telemetry cache
+
+Keeps the last temperature, field and chamber reading of a MultiPyVu client
+together with the time it was taken, so GUI pages and measurement workers can
+ask for "a value no older than max_age seconds" instead of each sending their
+own query. An optional poller refreshes the cache at a configurable rate
+through the client's PPMSCommandWorker. Set-point commands invalidate the
+cache so a status from before the command is never reported after it.
+
+Services are kept per client; the pages get their client from
+misc.ppms_client_registry, so every page talking to one MultiVu server
+shares one service.
+
+Cached values use the canonical reading format shared by all PPMS readers:
+temperature and field as (value, status, unit), chamber as the status string.
+"""
+
+import threading
+import time
+
+try:
+    from QuDAP.misc.logger import logger
+    from QuDAP.misc.ppms_command_worker import PPMSCommandWorker
+except ImportError:
+    from misc.logger import logger
+    from misc.ppms_command_worker import PPMSCommandWorker
+
+QUANTITIES = ('temperature', 'field', 'chamber')
+
+
+def read_temperature(client):
+    """Canonical temperature reading (value, status, unit)"""
+    temperature, status = client.get_temperature()
+    return temperature, status, client.temperature.units
+
+
+def read_field(client):
+    """Canonical field reading (value, status, unit)"""
+    field, status = client.get_field()
+    return field, status, client.field.units
+
+
+def read_chamber(client):
+    """Canonical chamber reading (status)"""
+    return client.get_chamber()
+
+
+READERS = {
+    'temperature': read_temperature,
+    'field': read_field,
+    'chamber': read_chamber,
+}
+
+
+class PPMSTelemetry:
+    """
+    Timestamped cache of the PPMS readings of one client, optionally kept fresh by a poller
+    """
+
+    _services = {}
+    _services_lock = threading.Lock()
+
+    def __init__(self, client):
+        """
+        Args:
+            client: MultiPyVu client instance
+        """
+        self.client = client
+        self.worker = PPMSCommandWorker.for_client(client)
+        self.lock = threading.Lock()
+        self.cache = {}  # quantity -> (monotonic timestamp, value)
+        self.generation = 0
+        self.poll_interval = None
+        self.poll_users = 0
+        self.poll_thread = None
+        self.poll_stop = threading.Event()
+
+    @classmethod
+    def for_client(cls, client):
+        """Return the telemetry service of client, creating it on first use"""
+        with cls._services_lock:
+            service = cls._services.get(id(client))
+            if service is None or service.client is not client:
+                service = cls(client)
+                cls._services[id(client)] = service
+            return service
+
+    @classmethod
+    def release(cls, client):
+        """Stop the poller of client and forget its cache (call before the client is closed)"""
+        with cls._services_lock:
+            service = cls._services.pop(id(client), None)
+        if service is not None:
+            service.poll_users = 0
+            service._stop_poller()
+
+    # ========================================================================================
+    # Cache
+    # ========================================================================================
+
+    def cached(self, quantity, max_age):
+        """
+        Cached value of a quantity if it is not older than max_age
+
+        Args:
+            quantity: 'temperature', 'field' or 'chamber'
+            max_age: Maximum age in seconds (0 or None never uses the cache)
+
+        Returns:
+            Cached value, or None if there is no fresh enough value
+        """
+        if not max_age:
+            return None
+        with self.lock:
+            entry = self.cache.get(quantity)
+        if entry is not None and time.monotonic() - entry[0] <= max_age:
+            return entry[1]
+        return None
+
+    def age(self, quantity):
+        """Age of the cached value in seconds, or None if nothing is cached"""
+        with self.lock:
+            entry = self.cache.get(quantity)
+        return None if entry is None else time.monotonic() - entry[0]
+
+    def store(self, quantity, value, generation=None, timestamp=None):
+        """
+        Store a reading
+
+        Args:
+            quantity: 'temperature', 'field' or 'chamber'
+            value: Reading in the canonical format
+            generation: Generation observed before the read was issued; the reading is dropped
+                if the cache was invalidated since
+            timestamp: time.monotonic() of the reading (defaults to now)
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.cache[quantity] = (time.monotonic() if timestamp is None else timestamp, value)
+
+    def invalidate(self, *quantities):
+        """Drop cached values (all if no quantity is given), e.g. after a set-point command"""
+        with self.lock:
+            self.generation += 1
+            for quantity in quantities or QUANTITIES:
+                self.cache.pop(quantity, None)
+
+    def read(self, quantity, max_age=0.0, timeout=10):
+        """
+        Cached value if fresh enough, otherwise a new (coalesced) reading from the PPMS
+
+        Args:
+            quantity: 'temperature', 'field' or 'chamber'
+            max_age: Maximum age of a cached value in seconds
+            timeout: Timeout of the PPMS query in seconds
+
+        Returns:
+            Reading in the canonical format
+
+        Raises:
+            TimeoutError: If the PPMS did not answer in time
+            Exception: Whatever the MultiPyVu client raised
+        """
+        value = self.cached(quantity, max_age)
+        if value is not None:
+            return value
+        generation = self.generation
+        value = self.worker.execute(READERS[quantity], (self.client,), timeout=timeout, coalesce_key=quantity)
+        self.store(quantity, value, generation)
+        return value
+
+    # ========================================================================================
+    # Poller
+    # ========================================================================================
+
+    def start_polling(self, interval=1.0):
+        """
+        Keep the cache fresh by polling every quantity; shared by all callers
+
+        Args:
+            interval: Polling interval in seconds; the fastest requested interval is used
+        """
+        with self.lock:
+            self.poll_users += 1
+            if self.poll_interval is None or interval < self.poll_interval:
+                self.poll_interval = interval
+            if self.poll_thread is not None and self.poll_thread.is_alive():
+                return
+            self.poll_stop.clear()
+            self.poll_thread = threading.Thread(target=self._poll, name='PPMS telemetry', daemon=True)
+            self.poll_thread.start()
+
+    def stop_polling(self):
+        """Release one start_polling call; the poller stops when nobody uses it"""
+        with self.lock:
+            self.poll_users = max(0, self.poll_users - 1)
+            if self.poll_users:
+                return
+        self._stop_poller()
+
+    def _stop_poller(self):
+        """Stop the poller thread"""
+        self.poll_stop.set()
+        if self.poll_thread is not None and self.poll_thread is not threading.current_thread():
+            self.poll_thread.join(timeout=self.poll_interval or 1)
+        self.poll_thread = None
+        self.poll_interval = None
+
+    def _poll(self):
+        """Poller loop"""
+        while not self.poll_stop.is_set():
+            interval = self.poll_interval or 1.0
+            for quantity in QUANTITIES:
+                try:
+                    self.read(quantity, max_age=interval / 2, timeout=max(5.0, interval))
+                except (Exception, SystemExit) as e:
+                    logger.warning(f'PPMS telemetry {quantity} read failed: {e}')
+            self.poll_stop.wait(interval)
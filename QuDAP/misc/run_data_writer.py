@@ -0,0 +1,169 @@
+"""
+Buffered run-data writer shared by the acquisition workers
+
+Keeps every CSV output of a sweep open for the lifetime of the sweep, batches
+rows in memory and flushes them on a row-count / time policy. At sweep
+boundaries the files are fsync'ed so completed data is on disk even if the
+GUI or the PPMS client dies afterwards. Flush callbacks (the run journal)
+run after every flush, so a point is journaled only once its rows are written.
+"""
+
+import csv
+import os
+import threading
+import time
+
+
+class BufferedCSVFile:
+    """
+    A single CSV output file held open with an in-memory row buffer
+    """
+
+    def __init__(self, filename, header=None, flush_rows=50, flush_interval=5.0):
+        """
+        Args:
+            filename: Path of the CSV file (appended to if it already exists)
+            header: Column names written once when the file is empty
+            flush_rows: Number of buffered rows that triggers a flush
+            flush_interval: Maximum time in seconds a row stays in memory
+        """
+        self.filename = filename
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.last_flush = time.monotonic()
+
+        self.file = open(filename, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if header is not None and self.file.tell() == 0:  # Check if file is empty
+            self.writer.writerow(header)
+
+    def write_row(self, row):
+        """
+        Buffer one row and flush if the size or time limit is reached
+
+        Returns:
+            bool: True if the buffer was flushed
+        """
+        self.rows.append(row)
+        if (len(self.rows) >= self.flush_rows or
+                time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+            return True
+        return False
+
+    def flush(self, sync=False):
+        """
+        Write the buffered rows to the file
+
+        Args:
+            sync: Also fsync the file so the data survives a crash
+        """
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Flush, fsync and close the file"""
+        if self.file.closed:
+            return
+        try:
+            self.flush(sync=True)
+        finally:
+            self.file.close()
+
+
+class RunDataWriter:
+    """
+    Thread-safe collection of buffered CSV outputs for one measurement run
+
+    Files are opened on first use and stay open until close() / close_all(),
+    so a sweep pays for one open() per output instead of one per data point.
+    """
+
+    def __init__(self, flush_rows=50, flush_interval=5.0):
+        """
+        Args:
+            flush_rows: Rows buffered per file before they are written
+            flush_interval: Maximum seconds between writes of a file
+        """
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.files = {}
+        self.flush_callbacks = []
+        self.lock = threading.Lock()
+
+    def add_flush_callback(self, callback):
+        """
+        Call callback() after every flush of the writer
+
+        A batch flush of one file writes the buffers of every open file, so when the callback
+        runs, every row written before it is in the files. It runs with the writer locked.
+        """
+        with self.lock:
+            self.flush_callbacks.append(callback)
+
+    def _flushed(self):
+        """Run the flush callbacks (call with self.lock)"""
+        for callback in self.flush_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠ Flush callback failed: {e}")
+
+    def write_row(self, filename, header, row):
+        """
+        Append a row to a CSV file, opening it (and writing the header) if needed
+
+        Args:
+            filename: Path of the CSV file
+            header: Column names written when the file is empty
+            row: Sequence of values for the new row
+        """
+        with self.lock:
+            output = self.files.get(filename)
+            if output is None:
+                output = BufferedCSVFile(filename, header, self.flush_rows, self.flush_interval)
+                self.files[filename] = output
+            if output.write_row(row):
+                for other in self.files.values():
+                    if other is not output:
+                        other.flush()
+                self._flushed()
+
+    def flush(self, sync=False):
+        """Write the buffered rows of every open file"""
+        with self.lock:
+            for output in self.files.values():
+                output.flush(sync=sync)
+            self._flushed()
+
+    def sync(self):
+        """Flush and fsync every open file (call at sweep boundaries)"""
+        self.flush(sync=True)
+
+    def close(self, filename):
+        """Flush, fsync and close a single file"""
+        with self.lock:
+            output = self.files.pop(filename, None)
+            if output is not None:
+                output.close()
+            # Rows of other files may still be buffered, so only a full flush runs the callbacks
+            if not self.files:
+                self._flushed()
+
+    def close_all(self):
+        """Flush, fsync and close every open file"""
+        with self.lock:
+            outputs = list(self.files.values())
+            self.files = {}
+            for output in outputs:
+                try:
+                    output.close()
+                except Exception as e:
+                    print(f"⚠ Error closing {output.filename}: {e}")
+            self._flushed()
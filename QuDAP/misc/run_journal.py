@@ -0,0 +1,136 @@
+"""
+Crash-safe run journal for long measurement matrices
+
+Every completed measurement point (and every completed sweep) is appended to
+a JSON-lines file in the run folder and fsync'ed, so after a GUI crash or a
+MultiVu hiccup a new run in the same folder can skip what is already on disk
+and append to the existing CSV files. The first record keeps the file name
+prefix of the run, because the prefix contains a random number and the date.
+
+Field points are not fsync'ed one by one: mark_pending() queues them and
+commit_pending() journals the queue in one write, called by the run's
+RunDataWriter after it has flushed the rows of those points.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Journal file names inside a run folder
+ETO_JOURNAL_NAME = 'eto_run_journal.jsonl'
+ST_FMR_JOURNAL_NAME = 'st_fmr_run_journal.jsonl'
+
+
+class RunJournal:
+    """
+    Append-only record of completed (temperature, source, repetition, field) points
+    """
+
+    def __init__(self, filename):
+        """
+        Args:
+            filename: Path of the journal file (created on first write)
+        """
+        self.filename = filename
+        self.file_name = None
+        self.finished = False
+        self.completed = set()
+        self.pending = []
+        self.lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(**coords):
+        """Build the lookup key of a point; floats are rounded so repeated set points compare equal"""
+        normalised = {}
+        for name, value in coords.items():
+            if isinstance(value, float):
+                value = round(value, 6)
+            normalised[name] = str(value)
+        return json.dumps(normalised, sort_keys=True)
+
+    def _load(self):
+        """Read an existing journal, ignoring a torn last line"""
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, "r") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'run':
+                    self.file_name = record.get('file_name')
+                elif record.get('type') == 'done':
+                    self.completed.add(self.key(**record['point']))
+                elif record.get('type') == 'finished':
+                    self.finished = True
+
+    def _append(self, *records):
+        """Append records and fsync them"""
+        with open(self.filename, "a") as file:
+            for record in records:
+                file.write(json.dumps(record, default=str) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    @property
+    def count(self):
+        """Number of completed entries"""
+        return len(self.completed)
+
+    def start(self, file_name):
+        """
+        Start a fresh journal, keeping the previous one as a timestamped backup
+
+        Args:
+            file_name: File name prefix used by the run's CSV files
+        """
+        with self.lock:
+            if os.path.exists(self.filename):
+                os.replace(self.filename, f"{self.filename}.{time.strftime('%Y%m%d_%H%M%S')}.bak")
+            self.file_name = file_name
+            self.finished = False
+            self.completed = set()
+            self.pending = []
+            self._append({'type': 'run', 'file_name': file_name, 'time': time.time()})
+
+    def is_done(self, **coords):
+        """Check whether a point (or a whole sweep) was already completed"""
+        with self.lock:
+            return self.key(**coords) in self.completed
+
+    def all_done(self, points):
+        """Check whether every point of an iterable of coordinate dicts was completed"""
+        with self.lock:
+            return all(self.key(**coords) in self.completed for coords in points)
+
+    def mark_done(self, **coords):
+        """Record a completed point (or a whole sweep)"""
+        with self.lock:
+            self.completed.add(self.key(**coords))
+            self._append({'type': 'done', 'point': {name: value for name, value in coords.items()},
+                          'time': time.time()})
+
+    def mark_pending(self, **coords):
+        """Queue a completed point whose rows may still be buffered; commit_pending() journals it"""
+        with self.lock:
+            self.pending.append(coords)
+
+    def commit_pending(self):
+        """Journal the queued points (call once their rows are flushed, e.g. as a RunDataWriter callback)"""
+        with self.lock:
+            if not self.pending:
+                return
+            now = time.time()
+            records = [{'type': 'done', 'point': dict(coords), 'time': now} for coords in self.pending]
+            self.pending = []
+            self._append(*records)
+            self.completed.update(self.key(**record['point']) for record in records)
+
+    def finish(self):
+        """Mark the whole run as finished so it is not offered for resume"""
+        with self.lock:
+            self.finished = True
+            self._append({'type': 'finished', 'time': time.time()})
@@ -0,0 +1,216 @@
+"""
+Write-deduplicating SCPI session
+
+Wraps a PyVISA resource and remembers the settings written through it, so a
+measurement loop that resends its configuration on every point (function,
+NPLC, channel, range, output state, ...) only puts a command on the bus when
+it would actually change the instrument. Everything else (query, read,
+timeout, close, serial settings, ...) is passed straight to the resource.
+
+Rules:
+- "HEADER value" commands are settings: identical repeats are skipped
+- commands without a value (INIT, ABOR, *TRG, ...) are actions and
+  always sent
+- *RST, *RCL, SYST:PRES, *CLS, clear() and compound commands drop the
+  whole cache
+- write(command, cache=False) and the volatile header list opt out for
+  commands with side effects
+- "HEADER?" answers are remembered as the current setting, so a later
+  write of the same value is skipped as well
+
+Headers are compared in SCPI short form with the optional SENSe/SOURce root
+removed, so 'SENS:VOLT:DC:NPLC 5' and 'VOLT:DC:NPLC 5.0' are the same setting.
+Changes made on the front panel are not seen; call invalidate() after them.
+
+Only SCPI instruments (Keithley 2182A, 6221) are wrapped. Command sets like
+the DSP 7265's have actions that change other settings (AS/ASM set SEN and
+TC, AQN sets REFP, IMODE/VMODE rescale SEN) and several spellings of one
+setting (OA / OA.), which this cache cannot follow.
+The same holds for writes from other pages sharing the session through the
+VISA registry: they bypass this cache.
+
+On a shared session (misc.visa_registry) the cache uses the session lock, so
+`lock` is the lock every page of the instrument serializes on.
+"""
+
+import re
+import threading
+
+# Commands that reset (part of) the instrument state
+RESET_HEADERS = ('*RST', '*RCL', 'SYST:PRES', '*CLS', 'SYST:POS')
+# Setting commands whose repeats have side effects and are always sent
+# (LIST:MANual selects a list point, which may have been reloaded under the same index)
+VOLATILE_HEADERS = ('DISP:TEXT', 'SYST:KEY', 'SYST:BEEP', 'DIAG', 'LIST:MAN')
+# Optional SCPI roots that may be omitted from a header
+DEFAULT_ROOTS = ('SENS', 'SOUR')
+
+_MNEMONIC = re.compile(r'^([A-Z*]+?)(\d*)$')
+_VOWELS = 'AEIOU'
+
+
+def short_form(mnemonic):
+    """SCPI short form of one mnemonic (SENSe -> SENS, VOLTage -> VOLT, CHANnel2 -> CHAN2)"""
+    match = _MNEMONIC.match(mnemonic.upper())
+    if not match:
+        return mnemonic.upper()
+    word, suffix = match.groups()
+    if len(word) > 4:
+        word = word[:3] if word[3] in _VOWELS else word[:4]
+    return word + suffix
+
+
+def normalize_header(header):
+    """Canonical cache key of a command header"""
+    header = header.strip().upper()
+    if header.startswith('*'):
+        return header
+    nodes = [short_form(node) for node in header.lstrip(':').replace('[', '').replace(']', '').split(':') if node]
+    if len(nodes) > 1 and nodes[0] in DEFAULT_ROOTS:
+        nodes = nodes[1:]
+    return ':'.join(nodes)
+
+
+def _same_value(old, new):
+    """Compare two setting values, numerically when both are numbers"""
+    if old is None:
+        return False
+    if old.upper() == new.upper():
+        return True
+    try:
+        return float(old) == float(new)
+    except ValueError:
+        return old.strip("'\"").upper() == new.strip("'\"").upper()
+
+
+class SCPISession:
+    """
+    PyVISA resource wrapper skipping writes that would not change the instrument
+    """
+
+    _OWN_ATTRIBUTES = ('resource', 'name', 'state', 'lock', 'sent', 'skipped', 'volatile')
+
+    def __init__(self, resource, name=None, volatile=VOLATILE_HEADERS):
+        """
+        Args:
+            resource: Opened PyVISA resource
+            name: Name used in log messages (defaults to the VISA resource name)
+            volatile: Headers whose writes are never skipped
+        """
+        self.resource = resource
+        self.name = name or getattr(resource, 'resource_name', 'VISA')
+        self.state = {}
+        # Share the session lock if the resource has one, so there is a single lock order
+        lock = getattr(resource, 'lock', None)
+        self.lock = lock if hasattr(lock, '__enter__') else threading.RLock()
+        self.sent = 0
+        self.skipped = 0
+        self.volatile = {normalize_header(header) for header in volatile}
+
+    # ========================================================================================
+    # Pass-through
+    # ========================================================================================
+
+    def __getattr__(self, name):
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        if name in self._OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resource, name, value)
+
+    def __repr__(self):
+        return f"<SCPISession {self.name}: {self.sent} sent, {self.skipped} skipped>"
+
+    # ========================================================================================
+    # Cache
+    # ========================================================================================
+
+    @staticmethod
+    def split(command):
+        """Split a command into (header, value); value is None for actions and queries"""
+        command = command.strip()
+        header, _, value = command.partition(' ')
+        value = value.strip()
+        return header, (value if value else None)
+
+    def invalidate(self, header=None):
+        """Forget one setting (by header) or every setting"""
+        with self.lock:
+            if header is None:
+                self.state.clear()
+            else:
+                self.state.pop(normalize_header(header), None)
+
+    def known(self, header):
+        """Setting last written or read through this session, or None"""
+        with self.lock:
+            return self.state.get(normalize_header(header))
+
+    # ========================================================================================
+    # I/O
+    # ========================================================================================
+
+    def write(self, command, cache=True, **kwargs):
+        """
+        Write a command unless it repeats the known setting
+
+        Args:
+            command: SCPI command
+            cache: False always sends the command (and forgets the setting)
+            **kwargs: Passed to the resource's write
+
+        Returns:
+            Result of the resource's write, or 0 if the command was skipped
+        """
+        header, value = self.split(command)
+        key = normalize_header(header)
+        with self.lock:
+            if ';' in command or any(key == normalize_header(reset) for reset in RESET_HEADERS):
+                self.state.clear()
+            elif value is not None and cache and key not in self.volatile:
+                if _same_value(self.state.get(key), value):
+                    self.skipped += 1
+                    return 0
+            result = self.resource.write(command, **kwargs)
+            self.sent += 1
+            if value is not None and ';' not in command:
+                if cache and key not in self.volatile:
+                    self.state[key] = value
+                else:
+                    self.state.pop(key, None)
+            return result
+
+    def query(self, command, cache=False, **kwargs):
+        """
+        Query the instrument
+
+        Args:
+            command: SCPI query
+            cache: Answer a 'HEADER?' query from the known setting instead of the bus
+            **kwargs: Passed to the resource's query
+
+        Returns:
+            Answer string
+        """
+        header, value = self.split(command)
+        with self.lock:
+            if header.endswith('?') and value is None and not header.startswith('*'):
+                key = normalize_header(header[:-1])
+                if cache and key in self.state:
+                    self.skipped += 1
+                    return self.state[key]
+                answer = self.resource.query(command, **kwargs)
+                self.sent += 1
+                if answer.strip() and key not in self.volatile:
+                    self.state[key] = answer.strip()
+                return answer
+            if any(normalize_header(header) == normalize_header(reset) for reset in RESET_HEADERS):
+                self.state.clear()
+            self.sent += 1
+            return self.resource.query(command, **kwargs)
+
+    def clear(self):
+        """Device clear; the cached settings are dropped"""
+        self.invalidate()
+        return self.resource.clear()
@@ -0,0 +1,119 @@
+"""
+Adaptive temperature-stability detection for PPMS temperature steps
+
+Replaces the fixed post-'Stable' stabilization sleeps: readings from
+ThreadSafePPMSCommands.read_temperature are kept in a rolling time window and
+the temperature is declared settled once the linear drift and the scatter
+around that trend are both below their thresholds. A maximum wait bounds the
+time spent if the thresholds are never met.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    from QuDAP.misc.logger import logger
+except ImportError:
+    from misc.logger import logger
+
+
+class TemperatureStabilityDetector:
+    """
+    Rolling-window drift / noise detector built on ThreadSafePPMSCommands
+    """
+
+    def __init__(self, ppms, window=20.0, drift_limit=0.02, noise_limit=0.01, tolerance=None, set_point=None,
+                 min_wait=0.0, max_wait=300.0, poll_interval=1.0):
+        """
+        Args:
+            ppms: ThreadSafePPMSCommands instance used to read the temperature
+            window: Length of the rolling window in seconds
+            drift_limit: Maximum |slope| of the window in K/min
+            noise_limit: Maximum standard deviation around the linear trend in K
+            tolerance: Maximum |mean - set_point| in K (None disables the check)
+            set_point: Target temperature in K, used with tolerance
+            min_wait: Minimum time to wait before declaring stability in seconds
+            max_wait: Time after which the wait ends even if not stable in seconds
+            poll_interval: Time between temperature readings in seconds
+        """
+        self.ppms = ppms
+        self.window = window
+        self.drift_limit = drift_limit
+        self.noise_limit = noise_limit
+        self.tolerance = tolerance
+        self.set_point = set_point
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.readings = deque()
+
+    def add_reading(self, timestamp, temperature):
+        """Add a reading and drop the ones that fell out of the window"""
+        self.readings.append((timestamp, temperature))
+        while self.readings and timestamp - self.readings[0][0] > self.window:
+            self.readings.popleft()
+
+    def statistics(self):
+        """
+        Drift and noise of the current window
+
+        Returns:
+            Tuple (drift in K/min, noise in K, mean in K), or None if the window is not full yet
+        """
+        if len(self.readings) < 3 or self.readings[-1][0] - self.readings[0][0] < self.window * 0.9:
+            return None
+        times = np.array([reading[0] for reading in self.readings])
+        temperatures = np.array([reading[1] for reading in self.readings])
+        slope, intercept = np.polyfit(times - times[0], temperatures, 1)
+        residuals = temperatures - (slope * (times - times[0]) + intercept)
+        return slope * 60, float(np.std(residuals)), float(np.mean(temperatures))
+
+    def is_stable(self):
+        """Check the current window against the drift, noise and tolerance thresholds"""
+        stats = self.statistics()
+        if stats is None:
+            return False
+        drift, noise, mean = stats
+        if abs(drift) > self.drift_limit or noise > self.noise_limit:
+            return False
+        if self.tolerance is not None and self.set_point is not None and abs(mean - self.set_point) > self.tolerance:
+            return False
+        return True
+
+    def wait(self, running=lambda: True, on_reading=None):
+        """
+        Poll the temperature until it is stable, the maximum wait passes or running() turns False
+
+        Args:
+            running: Callable returning False to abort the wait
+            on_reading: Optional callback(temperature, status, unit) for every reading
+
+        Returns:
+            Tuple (settled: bool, settle_time: float, temperature: float)
+        """
+        self.readings.clear()
+        start_time = time.monotonic()
+        temperature = None
+        while running():
+            success, reading, status, unit = self.ppms.read_temperature(timeout=10)
+            now = time.monotonic()
+            if success:
+                temperature = reading
+                self.add_reading(now, temperature)
+                if on_reading is not None:
+                    on_reading(temperature, status, unit)
+
+            elapsed = now - start_time
+            if elapsed >= self.min_wait and self.is_stable():
+                drift, noise, mean = self.statistics()
+                logger.info(f'Temperature settled at {mean:.4f} K after {elapsed:.1f} s '
+                            f'(drift {drift:.4f} K/min, noise {noise:.4f} K)')
+                return True, elapsed, temperature
+            if elapsed >= self.max_wait:
+                logger.warning(f'Temperature not stable after {elapsed:.1f} s, continuing with the measurement')
+                return False, elapsed, temperature
+            time.sleep(self.poll_interval)
+
+        return False, time.monotonic() - start_time, temperature
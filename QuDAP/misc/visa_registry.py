@@ -0,0 +1,250 @@
+"""
+Process-wide VISA resource registry
+
+One registry owns the pyvisa ResourceManager and keeps at most one open
+session per VISA resource. Pages ask it for a handle instead of calling
+open_resource themselves: the first open creates the session, later opens
+of the same resource (the Lock-in page while a measurement runs, the
+Dashboard, the instrument detector, ...) share it, and the session is only
+closed when the last handle is closed. Every handle of a session shares one
+lock, which serializes the pages' I/O on the same GPIB address.
+
+A handle behaves like the PyVISA resource it wraps (query, write, timeout,
+baud_rate, close, ...). Single I/O calls take the lock themselves, so a
+query is atomic; a write followed by separate reads is not and must hold
+the lock for the whole exchange. Drivers use session_lock(), which also
+accepts plain PyVISA resources and SCPISession/TracedResource wrappers:
+
+    with session_lock(instrument):
+        instrument.write('DC. 1')
+        answer = instrument.read()
+
+Settings such as timeout or termination belong to the shared session, so a
+page changing them changes them for every other user of the instrument.
+"""
+
+import threading
+from contextlib import nullcontext
+
+import pyvisa
+
+# Resource methods holding the session lock while they run
+LOCKED_METHODS = ('write', 'write_raw', 'query', 'read', 'read_raw', 'read_bytes', 'query_ascii_values',
+                  'query_binary_values', 'write_ascii_values', 'write_binary_values', 'clear', 'assert_trigger',
+                  'read_stb', 'flush')
+
+
+def session_lock(instrument):
+    """
+    Lock serializing a multi-step exchange with an instrument
+
+    Args:
+        instrument: SharedSession, a wrapper forwarding its lock (SCPISession, TracedResource),
+            or a plain PyVISA resource
+
+    Returns:
+        The shared session lock, or a no-op context for resources nobody shares
+    """
+    lock = getattr(instrument, 'lock', None)
+    # A plain PyVISA resource has a lock() method (VISA exclusive lock), not a context manager
+    return lock if hasattr(lock, '__enter__') else nullcontext()
+
+
+class _SharedEntry:
+    """One open session and the number of handles using it"""
+
+    def __init__(self, name, resource):
+        self.name = name
+        self.resource = resource
+        self.lock = threading.RLock()
+        self.references = 0
+
+
+class SharedSession:
+    """
+    Handle to a shared VISA session; close() releases this handle only
+    """
+
+    _OWN_ATTRIBUTES = ('_entry', '_registry')
+
+    def __init__(self, registry, entry):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_entry', entry)
+
+    @property
+    def lock(self):
+        """Lock shared by every handle of this session"""
+        return self._resource_entry().lock
+
+    @property
+    def closed(self):
+        return self._entry is None
+
+    def _resource_entry(self):
+        entry = self._entry
+        if entry is None:
+            raise pyvisa.errors.InvalidSession()
+        return entry
+
+    def __getattr__(self, name):
+        entry = self._resource_entry()
+        attribute = getattr(entry.resource, name)
+        if name not in LOCKED_METHODS:
+            return attribute
+
+        def locked(*args, **kwargs):
+            with entry.lock:
+                return attribute(*args, **kwargs)
+
+        return locked
+
+    def __setattr__(self, name, value):
+        if name in self._OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+            return
+        entry = self._resource_entry()
+        with entry.lock:
+            setattr(entry.resource, name, value)
+
+    def close(self):
+        """Release this handle; the session closes with its last handle (closing twice is harmless)"""
+        if self._entry is not None:
+            self._registry.release(self)
+
+    def __del__(self):
+        # A dropped handle releases its reference, as a dropped PyVISA resource closes itself
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        if self._entry is None:
+            return "<SharedSession (closed)>"
+        return f"<SharedSession {self._entry.name}: {self._entry.references} handle(s)>"
+
+
+class VisaRegistry:
+    """
+    Owner of the ResourceManager and of the shared sessions (singleton, thread safe)
+    """
+
+    _instance = None
+
+    def __new__(cls, backend=''):
+        if cls._instance is None:
+            cls._instance = super(VisaRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, backend=''):
+        """
+        Args:
+            backend: PyVISA backend of the ResourceManager ('' for the default VISA library,
+                '@py' for pyvisa-py, 'file.yaml@sim' for pyvisa-sim); only the first call counts
+        """
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.rm = None
+        self.entries = {}
+
+    def resource_manager(self):
+        """The process-wide ResourceManager (created on first use)"""
+        with self.lock:
+            if self.rm is None:
+                self.rm = pyvisa.ResourceManager(self.backend)
+            return self.rm
+
+    def list_resources(self, query='?*::INSTR'):
+        """
+        List the VISA resources
+
+        Args:
+            query: VISA resource query
+
+        Returns:
+            tuple: Resource strings
+        """
+        return self.resource_manager().list_resources(query)
+
+    def open(self, resource_name, **settings):
+        """
+        Get a handle to the shared session of a resource, opening it if nobody uses it yet
+
+        Args:
+            resource_name: VISA resource string
+            **settings: Resource attributes (timeout, read_termination, baud_rate, ...) applied
+                to the session, as open_resource would
+
+        Returns:
+            SharedSession: New handle (close it when done)
+        """
+        rm = self.resource_manager()
+        with self.lock:
+            entry = self.entries.get(resource_name)
+            if entry is None:
+                entry = _SharedEntry(resource_name, rm.open_resource(resource_name, **settings))
+                self.entries[resource_name] = entry
+                settings = {}
+            entry.references += 1
+        handle = SharedSession(self, entry)
+        try:
+            for name, value in settings.items():
+                setattr(handle, name, value)
+        except Exception:
+            handle.close()
+            raise
+        return handle
+
+    def release(self, handle):
+        """Release a handle (SharedSession.close calls this)"""
+        with self.lock:
+            entry = handle._entry
+            if entry is None:
+                return
+            handle._entry = None
+            entry.references -= 1
+            if entry.references > 0 or self.entries.get(entry.name) is not entry:
+                # Still used, or already closed by close_all
+                return
+            del self.entries[entry.name]
+        with entry.lock:
+            try:
+                entry.resource.close()
+            except Exception as e:
+                print(f"⚠ Error closing {entry.name}: {e}")
+
+    def in_use(self, resource_name):
+        """Check whether a session to the resource is open"""
+        with self.lock:
+            return resource_name in self.entries
+
+    def sessions(self):
+        """Open resources and their number of handles"""
+        with self.lock:
+            return {name: entry.references for name, entry in self.entries.items()}
+
+    def close_all(self):
+        """Close every session (application exit); outstanding handles become invalid"""
+        with self.lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+        for entry in entries:
+            with entry.lock:
+                try:
+                    entry.resource.close()
+                except Exception as e:
+                    print(f"⚠ Error closing {entry.name}: {e}")
+
+
+visa_registry = VisaRegistry()
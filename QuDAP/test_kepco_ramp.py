@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+try:
+    from QuDAP.instrument.kepco import KepcoRampEngine
+except ImportError:
+    from instrument.kepco import KepcoRampEngine
+
+
+def test_staircase_up_and_down():
+    assert KepcoRampEngine.staircase(0, 1, 0.25) == [0, 0.25, 0.5, 0.75, 1]
+    # The sign of the step follows the direction of the ramp
+    assert KepcoRampEngine.staircase(1, 0, 0.5) == [1, 0.5, 0]
+    assert KepcoRampEngine.staircase(1, 0, -0.5) == [1, 0.5, 0]
+
+
+def test_staircase_ends_at_stop():
+    assert KepcoRampEngine.staircase(0, 1, 0.3) == [0, 0.3, 0.6, 0.9, 1]
+    assert KepcoRampEngine.staircase(0, 0.3, 0.1) == [0, 0.1, 0.2, 0.3]
+    assert KepcoRampEngine.staircase(2, 2, 0.1) == [2]
+
+
+def test_staircase_zero_step():
+    with pytest.raises(ValueError):
+        KepcoRampEngine.staircase(0, 1, 0)
+
+
+def test_compile_splits_segments():
+    engine = KepcoRampEngine(instrument=None, command=object())
+    segments = engine.compile(KepcoRampEngine.staircase(0, 6, 0.01), 0.1)
+    assert [len(levels) for levels, _ in segments] == [250, 250, 101]
+    assert engine.duration() == pytest.approx(60.1)
+    with pytest.raises(ValueError):
+        engine.compile([0, 1], 0.001)
+
+
+class _StatusCommand:
+    """Command stub answering STAT:OPER:COND? and VOLT? only"""
+
+    def __init__(self, condition):
+        self.condition = condition
+
+    def get_operation_condition(self, instrument):
+        return f"{self.condition}\n"
+
+    def get_voltage(self, instrument):
+        return "12.5\n"
+
+
+def test_progress_follows_the_instrument():
+    command = _StatusCommand(KepcoRampEngine.OPER_LIST_RUNNING)
+    engine = KepcoRampEngine(instrument=None, command=command)
+    engine.compile([0.0, 0.5, 1.0], 0.1)
+    engine.segment, engine.segment_start = 0, time.monotonic()
+    assert engine.progress() == (0, 0, 0.0, False)
+    # Past the dwell table the last step is reported while the list still runs
+    engine.segment_start -= 0.5
+    assert engine.progress() == (0, 2, 1.0, False)
+    command.condition |= KepcoRampEngine.OPER_CV
+    assert engine.progress()[3] is True
+    command.condition = 0
+    assert engine.progress() is None
+
+
+def test_progress_detects_stop_and_stall():
+    command = _StatusCommand(0)
+    engine = KepcoRampEngine(instrument=None, command=command)
+    engine.compile([0.0, 0.5, 1.0], 1.0)
+    engine.segment, engine.segment_start = 0, time.monotonic()
+    with pytest.raises(RuntimeError):
+        engine.progress()
+    command.condition = KepcoRampEngine.OPER_LIST_RUNNING
+    engine.segment_start -= 3 + KepcoRampEngine.STALL_MARGIN + 1
+    with pytest.raises(RuntimeError):
+        engine.progress()
+
+
+def test_static_limit_when_no_limit_given():
+    engine = KepcoRampEngine(instrument=None, command=_StatusCommand(0))
+    engine.compile([0.0, 1.0], 0.1, limit=None)
+    assert engine._static_limit() == 12.5
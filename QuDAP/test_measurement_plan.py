@@ -0,0 +1,76 @@
+import pytest
+
+try:
+    from QuDAP.misc.measurement_plan import (DEFAULT_COSTS, compile_eto_plan, compile_st_fmr_plan,
+                                             eto_field_step_rule, format_duration, wait_for_holding)
+    from QuDAP.misc.run_journal import RunJournal
+except ImportError:
+    from misc.measurement_plan import (DEFAULT_COSTS, compile_eto_plan, compile_st_fmr_plan, eto_field_step_rule,
+                                       format_duration, wait_for_holding)
+    from misc.run_journal import RunJournal
+
+STEPPED_FIELDS = {'field_mode': 'stepped', 'final_step_list': [100, 50, 0], 'final_rate': 10}
+
+
+def one_zone_rule():
+    return eto_field_step_rule(True, False, False, (50, 0, 0), (100, 0, 0), (10, 0, 0))
+
+
+def test_format_duration():
+    assert format_duration(5) == '5s'
+    assert format_duration(65) == '1min 5s'
+    assert format_duration(90061) == '1d 1h 1min 1s'
+
+
+def test_wait_for_holding():
+    # Ramp finished before the first poll: one poll after the initial wait
+    assert wait_for_holding(0, 10, 15) == 25
+    # 30 s left after the initial wait, polled every 15 s
+    assert wait_for_holding(40, 10, 15) == 40
+
+
+def test_eto_field_step_rule():
+    assert one_zone_rule()(-80) == (50, 10)
+    with pytest.raises(ValueError):
+        eto_field_step_rule(False, False, False, (50, 0, 0), (100, 0, 0), (10, 0, 0))(0)
+
+
+def test_compile_eto_plan_fixed_field():
+    plan = compile_eto_plan([300, 10], ['1', '2'], 100, -100, one_zone_rule(), True, 5, 5, 1000, 0.1)
+    # 5 fields down and 5 up per (temperature, current)
+    assert plan.number_of_points == 2 * 2 * 10
+    assert sum(1 for step in plan.steps if step['stage'] == 'demagnetize') == 4
+    assert plan.total_duration > 0
+
+
+def test_compile_eto_plan_skips_journaled_points(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.jsonl'))
+    journal.start('run')
+    journal.mark_done(temperature=300, current='1e-3')
+    journal.mark_done(temperature=10, current='1e-3', direction='down', field=100)
+    plan = compile_eto_plan([300, 10], ['1'], 100, -100, one_zone_rule(), True, 5, 5, 1000, 0.1,
+                            journal=journal, journal_currents=['1e-3'])
+    assert {step['temperature'] for step in plan.steps} == {10}
+    assert plan.number_of_points == 9
+
+
+def test_compile_st_fmr_plan_rf_cost():
+    args = ([300], [1e9, 2e9], [0], 1, STEPPED_FIELDS, 5, 5)
+    list_mode = compile_st_fmr_plan(*args)
+    cw_mode = compile_st_fmr_plan(*args, rf_list_mode=False)
+    rf_setup = [step['duration'] for step in list_mode.steps if step['stage'] == 'rf_setup']
+    assert rf_setup == [4 * DEFAULT_COSTS['instrument_overhead']] * 2
+    assert [step['duration'] for step in cw_mode.steps if step['stage'] == 'rf_setup'] == [8.0, 8.0]
+    assert sum(1 for step in list_mode.steps if step['stage'] == 'rf_list_load') == 1
+    assert list_mode.number_of_points == 6
+
+
+def test_compile_st_fmr_plan_skips_journaled_points(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.jsonl'))
+    journal.start('run')
+    for repetition in (1, 2):
+        journal.mark_done(temperature=300, frequency=1e9, power=0, repetition=repetition)
+    journal.mark_done(temperature=10, frequency=1e9, power=0, repetition=1, field_index=0)
+    plan = compile_st_fmr_plan([300, 10], [1e9], [0], 2, STEPPED_FIELDS, 5, 5, journal=journal)
+    assert {step['temperature'] for step in plan.steps if 'temperature' in step} == {10}
+    assert plan.number_of_points == 5
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+try:
+    from QuDAP.misc.ppms_recorder import PPMSTelemetryRecorder
+except ImportError:
+    from misc.ppms_recorder import PPMSTelemetryRecorder
+
+
+@pytest.fixture
+def recorder():
+    recorder = PPMSTelemetryRecorder(telemetry=None, quantities=('field',))
+    recorder._append('field', 10.0, 0.0, 'Ramping')
+    recorder._append('field', 11.0, 100.0, 'Ramping')
+    recorder._append('field', 12.0, 200.0, 'Holding (driven)')
+    return recorder
+
+
+def test_value_at_interpolates(recorder):
+    assert recorder.value_at('field', 10.25, timeout=0) == (25.0, 'Ramping')
+    assert recorder.value_at('field', 11.75, timeout=0) == (175.0, 'Holding (driven)')
+
+
+def test_value_at_outside_the_records(recorder):
+    assert recorder.value_at('field', 5.0, timeout=0) == (0.0, 'Ramping')
+    # Nothing recorded after the sample yet: the newest value is returned
+    assert recorder.value_at('field', 20.0, timeout=0) == (200.0, 'Holding (driven)')
+
+
+def test_value_at_without_records():
+    recorder = PPMSTelemetryRecorder(telemetry=None, quantities=('field',))
+    assert recorder.value_at('field', 1.0, timeout=0) == (None, None)
+
+
+def test_out_of_order_and_history(recorder):
+    recorder.history = 2
+    recorder._append('field', 11.5, 150.0, 'Ramping')
+    recorder._append('field', 13.0, 300.0, 'Holding (driven)')
+    assert recorder.series('field') == ([12.0, 13.0], [200.0, 300.0])
@@ -0,0 +1,73 @@
+try:
+    from QuDAP.misc.run_journal import RunJournal
+except ImportError:
+    from misc.run_journal import RunJournal
+
+
+def test_points_survive_a_restart(tmp_path):
+    filename = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(filename)
+    journal.start('sample_run')
+    journal.mark_done(temperature=300, current='1e-3', direction='down', field=100.0)
+    journal.mark_done(temperature=300, current='1e-3')
+
+    reloaded = RunJournal(filename)
+    assert reloaded.file_name == 'sample_run'
+    assert reloaded.count == 2
+    assert not reloaded.finished
+    # Floats are rounded, so a recomputed set point matches
+    assert reloaded.is_done(temperature=300, current='1e-3', direction='down', field=100.0000000001)
+    assert not reloaded.is_done(temperature=300, current='1e-3', direction='up', field=100.0)
+
+
+def test_all_done(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.jsonl'))
+    journal.start('run')
+    journal.mark_done(repetition=1)
+    journal.mark_done(repetition=2)
+    assert journal.all_done({'repetition': repetition} for repetition in (1, 2))
+    assert not journal.all_done({'repetition': repetition} for repetition in (1, 2, 3))
+
+
+def test_start_keeps_a_backup(tmp_path):
+    filename = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(filename)
+    journal.start('first')
+    journal.mark_done(temperature=10)
+    journal.finish()
+    assert RunJournal(filename).finished
+
+    journal.start('second')
+    assert journal.count == 0
+    reloaded = RunJournal(filename)
+    assert reloaded.file_name == 'second' and not reloaded.finished
+    assert len(list(tmp_path.glob('journal.jsonl.*.bak'))) == 1
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    filename = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(filename)
+    journal.start('run')
+    journal.mark_done(temperature=10)
+    with open(filename, 'a') as file:
+        file.write('{"type": "done", "poi')
+    assert RunJournal(filename).count == 1
+
+
+def test_pending_points_are_journaled_on_writer_flush(tmp_path):
+    try:
+        from QuDAP.misc.run_data_writer import RunDataWriter
+    except ImportError:
+        from misc.run_data_writer import RunDataWriter
+    journal = RunJournal(str(tmp_path / 'journal.jsonl'))
+    journal.start('run')
+    writer = RunDataWriter(flush_rows=2, flush_interval=1e9)
+    writer.add_flush_callback(journal.commit_pending)
+    writer.write_row(str(tmp_path / 'data.csv'), ['Field (Oe)'], [100])
+    journal.mark_pending(field=100)
+    assert not journal.is_done(field=100)
+    writer.write_row(str(tmp_path / 'data.csv'), ['Field (Oe)'], [50])
+    assert journal.is_done(field=100)
+    journal.mark_pending(field=50)
+    writer.close_all()
+    assert RunJournal(str(tmp_path / 'journal.jsonl')).count == 2
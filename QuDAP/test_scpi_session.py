@@ -0,0 +1,72 @@
+try:
+    from QuDAP.misc.scpi_session import SCPISession, _same_value, normalize_header, short_form
+except ImportError:
+    from misc.scpi_session import SCPISession, _same_value, normalize_header, short_form
+
+
+class FakeResource:
+    """Records the commands written to it"""
+
+    def __init__(self):
+        self.written = []
+
+    def write(self, command):
+        self.written.append(command)
+        return len(command)
+
+
+def test_short_form():
+    assert short_form('SENSe') == 'SENS'
+    assert short_form('VOLTage') == 'VOLT'
+    assert short_form('CHANnel2') == 'CHAN2'
+    # A vowel as fourth letter is dropped
+    assert short_form('TRIGger') == 'TRIG'
+    assert short_form('DELay') == 'DEL'
+    assert short_form('*RST') == '*RST'
+
+
+def test_normalize_header():
+    assert normalize_header('SENS:VOLT:DC:NPLC') == 'VOLT:DC:NPLC'
+    assert normalize_header(':sense:voltage:dc:nplc') == 'VOLT:DC:NPLC'
+    assert normalize_header('[SOURce]:CURRent:RANGe') == 'CURR:RANG'
+    assert normalize_header('OUTPut') == 'OUTP'
+    assert normalize_header('*rst') == '*RST'
+
+
+def test_same_value():
+    assert not _same_value(None, '1')
+    assert _same_value('5', '5.0')
+    assert _same_value('1e-3', '0.001')
+    assert _same_value('on', 'ON')
+    assert _same_value("'VOLT'", 'volt')
+    assert not _same_value('5', '6')
+
+
+def test_repeated_setting_is_skipped():
+    resource = FakeResource()
+    session = SCPISession(resource, name='test')
+    session.write('SENS:VOLT:DC:NPLC 5')
+    session.write('VOLT:DC:NPLC 5.0')
+    session.write('VOLT:DC:NPLC 1')
+    assert resource.written == ['SENS:VOLT:DC:NPLC 5', 'VOLT:DC:NPLC 1']
+    assert session.skipped == 1
+
+
+def test_actions_and_reset_are_always_sent():
+    resource = FakeResource()
+    session = SCPISession(resource, name='test')
+    session.write('OUTP ON')
+    session.write('INIT')
+    session.write('INIT')
+    session.write('*RST')
+    session.write('OUTP ON')
+    assert resource.written == ['OUTP ON', 'INIT', 'INIT', '*RST', 'OUTP ON']
+
+
+def test_cache_opt_out():
+    resource = FakeResource()
+    session = SCPISession(resource, name='test')
+    session.write('CURR 1e-3')
+    session.write('CURR 1e-3', cache=False)
+    session.write('CURR 1e-3')
+    assert len(resource.written) == 3